@@ -1,13 +1,161 @@
-from django.contrib import admin
-from .models import Course, Lesson, Video, Test, Question, Choice, StudentProgress,Certificate
+from django.conf import settings
+from django.contrib import admin, messages
+from django.core.paginator import Paginator
+from django.db.models import Max
+from django.utils.functional import cached_property
+from .models import Course, Lesson, Video, Test, Question, Choice, StudentProgress,Certificate, LessonAttention, VideoWatch, UploadSession, FaceEnrollment, Attendance, LessonStats
+from .forms import ChunkedFileField
+from .jobs import enqueue_certificates
+from .progress import mark_attended, reset_tests
+
+COUNT_ESTIMATE_THRESHOLD = getattr(settings, 'ADMIN_COUNT_ESTIMATE_THRESHOLD', 50000)
+
+
+class EstimatedCountPaginator(Paginator):
+    # Filtrsiz katta jadvalda COUNT(*) butun jadvalni o'qiydi — MAX(id) indeksdan bir qadamda.
+    # O'chirilgan qatorlar sababli ko'proq chiqishi mumkin (oxirgi sahifalar bo'sh bo'ladi)
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = queryset.model._default_manager.aggregate(n=Max('pk'))['n'] or 0
+            if estimate > COUNT_ESTIMATE_THRESHOLD:
+                return estimate
+        return super().count
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    # Katta jadvallar: taxminiy son, ikkinchi (filtrsiz) COUNT yo'q, pk bo'yicha tartib (indeks)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    ordering = ('-pk',)
+
+
+class ChunkedUploadAdmin(admin.ModelAdmin):
+    # FileField nomi -> courses/uploads.py TARGETS kaliti (bo'laklab yuklash vidjeti)
+    chunked_fields = {}
+
+    def formfield_for_dbfield(self, db_field, request, **kwargs):
+        target = self.chunked_fields.get(db_field.name)
+        if target:
+            return db_field.formfield(form_class=ChunkedFileField, target=target, user=request.user)
+        return super().formfield_for_dbfield(db_field, request, **kwargs)
+
+
+@admin.register(Lesson)
+class LessonAdmin(ChunkedUploadAdmin):
+    chunked_fields = {'file': 'lesson'}
+    list_display = ('title', 'course', 'date', 'start_time', 'order')
+    list_filter = ('course',)
+    list_select_related = ('course',)
+
+
+@admin.register(Video)
+class VideoAdmin(ChunkedUploadAdmin):
+    # Video.__str__ dars nomini o'qiydi — darslar bitta JOIN bilan
+    chunked_fields = {'video_file': 'video'}
+    list_display = ('__str__', 'order', 'duration')
+    list_filter = ('lesson__course',)
+    list_select_related = ('lesson',)
+    search_fields = ('title', 'lesson__title')
+    raw_id_fields = ('lesson',)
+
+
+class ChoiceInline(admin.TabularInline):
+    model = Choice
+    extra = 0
+
+
+@admin.register(Question)
+class QuestionAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'test')
+    list_filter = ('test__lesson__course',)
+    list_select_related = ('test',)
+    search_fields = ('text',)
+    raw_id_fields = ('test',)
+    inlines = (ChoiceInline,)
+
+
+@admin.register(StudentProgress)
+class StudentProgressAdmin(LargeTableAdmin):
+    list_display = ('student', 'lesson', 'watched_count', 'test_passed', 'test_score', 'attended')
+    # Guruh va kurs filtrlari FK indekslari (profile_group_user_idx, lesson_course_order_idx) orqali
+    list_filter = ('student__profile__group', 'lesson__course', 'test_passed', 'attended')
+    list_select_related = ('student', 'lesson')
+    # '=' — aniq moslik: username unikal indeksidan, LIKE '%...%' skanerlashsiz
+    search_fields = ('=student__username',)
+    raw_id_fields = ('student', 'lesson')
+    actions = ('reset_test_attempts', 'mark_lesson_attended')
+
+    @admin.action(description="Test natijasini bekor qilish (qayta topshirish)")
+    def reset_test_attempts(self, request, queryset):
+        updated = reset_tests(queryset)
+        self.message_user(request, f"{updated} ta yozuvda test natijasi bekor qilindi", messages.SUCCESS)
+
+    @admin.action(description="Darsda qatnashgan deb belgilash")
+    def mark_lesson_attended(self, request, queryset):
+        # StudentProgress.attended (dashboard, analitika); jadval davomati — ScheduleAdmin da
+        updated = mark_attended(queryset)
+        self.message_user(request, f"{updated} ta yozuv qatnashgan deb belgilandi", messages.SUCCESS)
+
+
+@admin.register(Certificate)
+class CertificateAdmin(LargeTableAdmin):
+    list_display = ('__str__', 'test_score', 'status', 'issued_at')
+    list_filter = ('status', 'course')
+    # Certificate.__str__ talaba va kursni o'qiydi
+    list_select_related = ('student', 'course')
+    search_fields = ('=student__username', '=certificate_id')
+    raw_id_fields = ('student', 'course')
+    readonly_fields = ('certificate_id',)
+    actions = ('reissue',)
+
+    @admin.action(description="PDF ni qayta yaratish (navbatga qo'yish)")
+    def reissue(self, request, queryset):
+        queued = enqueue_certificates(queryset)
+        self.message_user(request, f"{queued} ta sertifikat navbatga qo'yildi", messages.SUCCESS)
+
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ('filename', 'target', 'user', 'offset', 'size', 'completed', 'updated_at')
+    list_filter = ('target', 'completed')
+    readonly_fields = ('name', 'crc32')
+
+
+@admin.register(FaceEnrollment)
+class FaceEnrollmentAdmin(admin.ModelAdmin):
+    list_display = ('student', 'frames', 'consistency', 'updated_at')
+    exclude = ('descriptor',)
+    readonly_fields = ('frames', 'consistency')
+
+
+@admin.register(Attendance)
+class AttendanceAdmin(admin.ModelAdmin):
+    list_display = ('student', 'schedule', 'date', 'similarity', 'checked_in_at')
+    list_filter = ('date', 'schedule__group')
+    list_select_related = ('student', 'schedule__group', 'schedule__lesson')
+
+
+@admin.register(LessonStats)
+class LessonStatsAdmin(admin.ModelAdmin):
+    # Signal va rebuild_analytics yangilaydi — qo'lda tahrirlanmaydi
+    list_display = ('group', 'lesson', 'students', 'attempts', 'passed', 'attended', 'updated_at')
+    list_filter = ('group',)
+    list_select_related = ('group', 'lesson')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 admin.site.register(Course)
-admin.site.register(Lesson)
-admin.site.register(Video)
 admin.site.register(Test)
-admin.site.register(Question)
 admin.site.register(Choice)
-admin.site.register(StudentProgress)
-admin.site.register(Certificate)
+admin.site.register(LessonAttention)
+admin.site.register(VideoWatch)
 # admin.py
 
 from django.contrib import admin
@@ -33,12 +181,21 @@ admin.site.register(Profile)
 
 from django.contrib import admin
 from .models import Course, Lesson, Video, Test, Question, Choice, StudentProgress, Profile, Schedule
+from .facematch import mark_present
 
 @admin.register(Schedule)
 class ScheduleAdmin(admin.ModelAdmin):
     list_display = ('group', 'lesson', 'get_day', 'start_time', 'end_time', 'room')
     list_filter = ('group', 'day_of_week')
-    search_fields = ('lesson__title', 'group__name')
+    list_select_related = ('group', 'lesson')
+    search_fields = ('lesson__title', 'group__title')
+    actions = ('mark_attendance_today',)
+
+    @admin.action(description="Bugungi davomatni butun guruhga belgilash")
+    def mark_attendance_today(self, request, queryset):
+        # Attendance jadvaliga (yuz bo'yicha check-in bilan bir joy); StudentProgress.attended ga tegmaydi
+        marked = mark_present(queryset)
+        self.message_user(request, f"{marked} ta talaba uchun davomat belgilandi", messages.SUCCESS)
 
     def get_day(self, obj):
         return obj.get_day_of_week_display()
@@ -0,0 +1,255 @@
+# courses/analytics.py — guruh × dars bo'yicha tayyor (materiallashtirilgan) statistikalar
+#
+# LessonStats qatori: faol talabalar soni, test urinishlari, o'tganlar, darsda
+# qatnashganlar, ballar yig'indisi, 1 ballik gistogramma (mediana shundan)
+# va video voronkasi. StudentProgress o'zgarganda bitta qator o'qilib-yoziladi
+# (signal; watched_count ni .update() bilan o'zgartiradigan joylar
+# watched_changed() ni o'zlari chaqiradi). `rebuild_analytics` buyrug'i
+# hammasini uchta GROUP BY so'rovi bilan noldan quradi. O'qituvchi sahifasi
+# (views.group_analytics) faqat shu tayyor qatorlardan chiziladi.
+
+import math
+from collections import namedtuple
+
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Cast, Coalesce, Floor, Greatest, Least
+
+from .models import CourseCompletion, Lesson, LessonStats, Profile, StudentProgress, Video
+
+BUCKETS = 101
+
+# Bitta StudentProgress qatorining statistikaga hissasi
+State = namedtuple('State', 'watched passed score attended')
+# Hali tegilmagan qator (progress_for_lessons bulk_create bilan signalsiz yaratadi) —
+# hisobga kirmaydi, shuning uchun yaratilishini kuzatish shart emas
+EMPTY = State(0, False, None, False)
+
+
+def bucket(score):
+    return min(max(int(math.floor(score)), 0), BUCKETS - 1)
+
+
+def _group_subquery(student_id):
+    return Subquery(Profile.objects.filter(user_id=student_id).values('group_id')[:1])
+
+
+def group_of(student_id):
+    # Talaba guruhi bazadan (jarayon keshi emas — guruh boshqa ishchida o'zgargan bo'lishi mumkin)
+    return Profile.objects.filter(user_id=student_id).values_list('group_id', flat=True).first()
+
+
+def _apply(stats, state, sign):
+    stats.students += sign
+    if state.passed:
+        stats.passed += sign
+    if state.attended:
+        stats.attended += sign
+    if state.score is not None:
+        stats.attempts += sign
+        stats.score_sum += sign * state.score
+        if len(stats.score_buckets) < BUCKETS:
+            stats.score_buckets += [0] * (BUCKETS - len(stats.score_buckets))
+        stats.score_buckets[bucket(state.score)] += sign
+    if len(stats.funnel) <= state.watched:
+        stats.funnel += [0] * (state.watched + 1 - len(stats.funnel))
+    stats.funnel[state.watched] += sign
+
+
+def apply_change(student_id, lesson_id, old, new):
+    """
+    old/new — State yoki None (qator yo'q edi / o'chirildi). Guruh × dars
+    qatori tranzaksiya ichida o'qiladi va yoziladi.
+    """
+    old = None if old == EMPTY else old
+    new = None if new == EMPTY else new
+    if old == new:
+        return
+    # savepoint=False: odatda submit_test / signal tranzaksiyasi ichida. Guruh statistika
+    # qatori bilan bitta so'rovda (subquery) o'qiladi — group_changed bilan bir tranzaksiya tartibida
+    with transaction.atomic(savepoint=False):
+        stats = (
+            LessonStats.objects.select_for_update()
+            .filter(group_id=_group_subquery(student_id), lesson_id=lesson_id).first()
+        )
+        if stats is None:
+            group_id = group_of(student_id)
+            if group_id is None:
+                return
+            if old is not None:
+                # Qator yo'q, lekin eski hissa bor — faqat shu katakni qayta hisoblaymiz
+                rebuild(group_ids=[group_id], lesson_ids=[lesson_id])
+                return
+            stats = LessonStats(group_id=group_id, lesson_id=lesson_id, score_buckets=[0] * BUCKETS)
+        if old is not None:
+            _apply(stats, old, -1)
+        if new is not None:
+            _apply(stats, new, +1)
+        stats.save()
+
+
+def state_of(progress):
+    return State(progress.watched_count, progress.test_passed, progress.test_score, progress.attended)
+
+
+def progress_saved(instance, created):
+    loaded = None if created else getattr(instance, '_loaded_stats', None)
+    new = state_of(instance)
+    instance._loaded_stats = tuple(new)
+    if loaded is not None and None in (loaded[0], loaded[1], loaded[3]):
+        loaded = None  # only()/defer() bilan yuklangan — eski qiymat noma'lum
+    if not created and loaded is None:
+        group_id = group_of(instance.student_id)
+        if group_id:
+            rebuild(group_ids=[group_id], lesson_ids=[instance.lesson_id])
+        return
+    apply_change(instance.student_id, instance.lesson_id, State(*loaded) if loaded else None, new)
+
+
+def progress_deleted(instance):
+    loaded = getattr(instance, '_loaded_stats', None)
+    old = State(*loaded) if loaded and None not in (loaded[0], loaded[1], loaded[3]) else state_of(instance)
+    apply_change(instance.student_id, instance.lesson_id, old, None)
+
+
+def watched_changed(progress, old_count, new_count):
+    # watched_count shartli UPDATE bilan o'zgartirilganda (signal yo'q)
+    old = state_of(progress)._replace(watched=old_count)
+    apply_change(progress.student_id, progress.lesson_id, old, old._replace(watched=new_count))
+    progress._loaded_stats = tuple(old._replace(watched=new_count))
+
+
+def group_changed(student_id, old_group_id, new_group_id):
+    # Talabaning hissasi eski guruhdan yangisiga o'tadi — faqat uning darslari qayta hisoblanadi
+    group_ids = [gid for gid in (old_group_id, new_group_id) if gid]
+    lesson_ids = list(StudentProgress.objects.filter(student_id=student_id).values_list('lesson_id', flat=True))
+    if group_ids and lesson_ids:
+        rebuild(group_ids=group_ids, lesson_ids=lesson_ids)
+
+
+def rebuild(group_ids=None, lesson_ids=None, batch_size=1000):
+    """
+    Statistikani noldan quradi: uchta GROUP BY (hisoblagichlar, gistogramma,
+    voronka) va to'plamli INSERT. group_ids/lesson_ids bilan qismini.
+    """
+    group = 'student__profile__group_id'
+    progress = StudentProgress.objects.filter(student__profile__group__isnull=False).filter(
+        Q(watched_count__gt=0) | Q(test_passed=True) | Q(test_score__isnull=False) | Q(attended=True)
+    )
+    stats = LessonStats.objects.all()
+    if group_ids is not None:
+        progress = progress.filter(student__profile__group_id__in=group_ids)
+        stats = stats.filter(group_id__in=group_ids)
+    if lesson_ids is not None:
+        progress = progress.filter(lesson_id__in=lesson_ids)
+        stats = stats.filter(lesson_id__in=lesson_ids)
+
+    rows = {}
+    # Uchala so'rov bitta tranzaksiyada — bir xil holatni ko'radi
+    with transaction.atomic():
+        counters = progress.values(group, 'lesson_id').annotate(
+            n=Count('id'),
+            n_attempts=Count('id', filter=Q(test_score__isnull=False)),
+            n_passed=Count('id', filter=Q(test_passed=True)),
+            n_attended=Count('id', filter=Q(attended=True)),
+            total=Sum('test_score', default=0.0),
+        ).order_by()
+        for row in counters.iterator():
+            rows[row[group], row['lesson_id']] = LessonStats(
+                group_id=row[group], lesson_id=row['lesson_id'], students=row['n'], attempts=row['n_attempts'],
+                passed=row['n_passed'], attended=row['n_attended'], score_sum=row['total'],
+                score_buckets=[0] * BUCKETS, funnel=[],
+            )
+
+        score_bucket = Cast(Least(Greatest(Floor('test_score'), 0), BUCKETS - 1), IntegerField())
+        histogram = (
+            progress.filter(test_score__isnull=False).annotate(bucket=score_bucket)
+            .values(group, 'lesson_id', 'bucket').annotate(n=Count('id')).order_by()
+        )
+        for row in histogram.iterator():
+            rows[row[group], row['lesson_id']].score_buckets[row['bucket']] = row['n']
+
+        funnel = progress.values(group, 'lesson_id', 'watched_count').annotate(n=Count('id')).order_by()
+        for row in funnel.iterator():
+            levels = rows[row[group], row['lesson_id']].funnel
+            levels += [0] * (row['watched_count'] + 1 - len(levels))
+            levels[row['watched_count']] = row['n']
+
+        stats.delete()
+        LessonStats.objects.bulk_create(rows.values(), batch_size=batch_size)
+    return len(rows)
+
+
+def median(buckets):
+    # 1 ballik gistogrammadan mediana (bucket ichida chiziqli interpolyatsiya)
+    total = sum(buckets)
+    if not total:
+        return None
+    half, seen = total / 2, 0
+    for b, n in enumerate(buckets):
+        if n and seen + n >= half:
+            return round(b + (half - seen) / n, 1)
+        seen += n
+    return None
+
+
+def deciles(buckets):
+    # Sahifa uchun 10 ballik ustunlar: [0-10), ..., [90-100]
+    buckets = list(buckets) + [0] * (BUCKETS - len(buckets))
+    return [sum(buckets[i:i + 10]) for i in range(0, 90, 10)] + [sum(buckets[90:])]
+
+
+def lesson_report(stats, videos):
+    # Sahifa uchun bitta dars qatori: o'rtacha, mediana, o'tish ulushi, decil ustunlari va voronka
+    funnel = list(stats.funnel) + [0] * max(0, videos + 1 - len(stats.funnel))
+    # reached[k-1] — kamida k ta video ko'rganlar; stuck — k-videoni ko'rmay to'xtaganlar
+    reached, remaining = [], stats.students
+    for k in range(videos):
+        remaining -= funnel[k]
+        reached.append(remaining)
+    stuck = max(range(videos), key=lambda k: funnel[k], default=None)
+    return {
+        'stats': stats,
+        'average': round(stats.score_sum / stats.attempts, 1) if stats.attempts else None,
+        'median': median(stats.score_buckets),
+        'pass_rate': round(100 * stats.passed / stats.students) if stats.students else 0,
+        'deciles': deciles(stats.score_buckets),
+        'reached': reached,
+        'stuck_video': stuck + 1 if stuck is not None and funnel[stuck] else None,
+        'stuck_count': funnel[stuck] if stuck is not None else 0,
+    }
+
+
+def group_report(group_id):
+    """
+    Guruh sahifasi uchun ma'lumotlar — guruh hajmidan qat'i nazar uchta so'rov:
+    talabalar soni, LessonStats (+ video soni) va kurslar bo'yicha yakunlash.
+    """
+    students = Profile.objects.filter(group_id=group_id).count()
+    video_count = Subquery(
+        Video.objects.filter(lesson_id=OuterRef('lesson_id')).order_by()
+        .values('lesson_id').annotate(n=Count('id')).values('n')
+    )
+    rows = (
+        LessonStats.objects.filter(group_id=group_id).select_related('lesson')
+        .annotate(videos=Coalesce(video_count, 0))
+        .order_by('lesson__date', 'lesson__order', 'lesson_id')
+    )
+    lesson_total = Subquery(
+        Lesson.objects.filter(course_id=OuterRef('course_id')).order_by()
+        .values('course_id').annotate(n=Count('id')).values('n')
+    )
+    courses = list(
+        CourseCompletion.objects.filter(student__profile__group_id=group_id)
+        .annotate(total=lesson_total)
+        .values('course_id', 'course__title')
+        .annotate(started=Count('id'), completed=Count('id', filter=Q(lessons_passed__gte=F('total'))))
+        .order_by('course__title')
+    )
+    for course in courses:
+        course['rate'] = round(100 * course['completed'] / students) if students else 0
+    return {
+        'students': students,
+        'lessons': [lesson_report(stats, stats.videos) for stats in rows],
+        'courses': courses,
+    }
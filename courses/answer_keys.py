@@ -0,0 +1,70 @@
+# courses/answer_keys.py — test javoblari kaliti (keshlangan) va bir o'tishda baholash
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+
+from .models import Test, Question
+
+PASS_SCORE = 60  # 60% va undan yuqori o‘tdi
+# Eski versiyalar yozuvi ham shu muddatda tozalanadi
+CACHE_TIMEOUT = getattr(settings, 'ANSWER_KEY_CACHE_TIMEOUT', 86400)
+
+
+def _cache_key(test):
+    return f"answer_key:{test.id}:v{test.answers_version}"
+
+
+def build_answer_key(test):
+    # 2 ta so'rov: savollar + ularning variantlari
+    questions = []
+    correct = {}
+    valid = {}
+    for q in test.questions.prefetch_related('choices').order_by('id'):
+        choices = list(q.choices.all())
+        questions.append({
+            'id': q.id,
+            'text': q.text,
+            'choices': [{'id': ch.id, 'text': ch.text} for ch in choices],
+        })
+        correct[q.id] = frozenset(ch.id for ch in choices if ch.is_correct)
+        valid[q.id] = frozenset(ch.id for ch in choices)
+    return {'questions': questions, 'correct': correct, 'valid': valid}
+
+
+def get_answer_key(test):
+    """
+    {questions: [...], correct: {qid: {choice_id}}, valid: {qid: {choice_id}}}.
+    Kalit Test.answers_version bilan versiyalanadi — signallar versiyani
+    oshirgach, eski yozuv o'z-o'zidan ishlatilmay qoladi.
+    """
+    key = _cache_key(test)
+    answer_key = cache.get(key)
+    if answer_key is None:
+        answer_key = build_answer_key(test)
+        cache.set(key, answer_key, CACHE_TIMEOUT)
+    return answer_key
+
+
+def grade(answer_key, answers):
+    # answers — request.POST (savol id -> tanlangan variant id); bazaga murojaat yo'q
+    total = len(answer_key['questions'])
+    correct = 0
+    for qid, valid_ids in answer_key['valid'].items():
+        try:
+            selected = int(answers.get(str(qid), ''))
+        except ValueError:
+            continue
+        if selected in valid_ids and selected in answer_key['correct'][qid]:
+            correct += 1
+    score = (correct / total) * 100 if total > 0 else 0
+    return score, score >= PASS_SCORE
+
+
+def bump_answers_version(test_id):
+    if test_id is not None:
+        Test.objects.filter(pk=test_id).update(answers_version=F('answers_version') + 1)
+
+
+def bump_for_question(question_id):
+    bump_answers_version(Question.objects.filter(pk=question_id).values_list('test_id', flat=True).first())
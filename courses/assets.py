@@ -0,0 +1,144 @@
+# courses/assets.py — o'z serverimizdagi statik fayllar: MediaPipe (face.html), xeshli nomlar, siqilgan nusxalar
+#
+# MediaPipe fayllari CDN dan emas, static/vendor/mediapipe dan beriladi
+# (`vendor_mediapipe` buyrug'i belgilangan versiyalarni bir marta yuklab
+# oladi). CDN ga zaxira yo'q: fayl joyida bo'lmasa (yuklab olinmagan yoki
+# collectstatic qilinmagan) /face/ sahifasi aniq xato ko'rsatadi va kamera
+# ishga tushmaydi. collectstatic har faylni mazmun xeshi bilan nomlaydi va yoniga
+# .gz (hamda brotli o'rnatilgan bo'lsa .br) nusxasini yozadi — server
+# ularni har so'rovda siqmaydi, xeshli nom esa `immutable` keshlanadi.
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.templatetags.static import static
+
+try:
+    import brotli
+except ImportError:  # ixtiyoriy: bo'lmasa faqat gzip
+    brotli = None
+
+CDN_URL = 'https://cdn.jsdelivr.net/npm/@mediapipe/{package}@{version}/{name}'
+VENDOR_DIR = 'vendor/mediapipe'
+VENDOR_ROOT = Path(settings.BASE_DIR) / 'static'
+# paket -> (versiya, fayllar). face.html faqat Camera va FaceMesh ni ishlatadi
+MEDIAPIPE = {
+    'camera_utils': ('0.3.1675466862', ['camera_utils.js']),
+    'face_mesh': ('0.4.1633559619', [
+        'face_mesh.js',
+        'face_mesh.binarypb',
+        'face_mesh_solution_packed_assets.data',
+        'face_mesh_solution_packed_assets_loader.js',
+        'face_mesh_solution_simd_wasm_bin.js',
+        'face_mesh_solution_simd_wasm_bin.wasm',
+        'face_mesh_solution_wasm_bin.js',
+        'face_mesh_solution_wasm_bin.wasm',
+    ]),
+}
+
+MAX_AGE = getattr(settings, 'STATIC_MAX_AGE', 365 * 86400)
+COMPRESS_MIN_SIZE = getattr(settings, 'STATIC_COMPRESS_MIN_SIZE', 1024)
+COMPRESS_EXTENSIONS = {'.js', '.css', '.wasm', '.data', '.binarypb', '.svg', '.json', '.txt', '.map', '.ttf'}
+# (kodlash, kengaytma) — afzallik tartibida
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+mimetypes.add_type('application/wasm', '.wasm')
+mimetypes.add_type('text/javascript', '.js')
+
+
+def vendor_files():
+    # (static ichidagi yo'l, CDN manzili)
+    for package, (version, names) in MEDIAPIPE.items():
+        for name in names:
+            yield f'{VENDOR_DIR}/{package}/{name}', CDN_URL.format(package=package, version=version, name=name)
+
+
+def _local_url(path):
+    # Static dagi fayl URL i; fayl yo'q bo'lsa None (DEBUG da 404, aks holda manifest xatosi bo'lardi)
+    if settings.DEBUG:
+        return static(path) if finders.find(path) else None
+    try:
+        return static(path)
+    except ValueError:
+        return None
+
+
+def mediapipe_urls():
+    # {fayl nomi: xeshli URL} — FaceMesh locateFile va service worker uchun; faqat joyidagi fayllar
+    urls = {path.rsplit('/', 1)[1]: _local_url(path) for path, _ in vendor_files()}
+    return {name: url for name, url in urls.items() if url}
+
+
+def missing_mediapipe():
+    # static/vendor/mediapipe da (yoki manifestda) yo'q fayllar — bo'sh bo'lmasa /face/ ishlamaydi
+    return [path for path, _ in vendor_files() if not _local_url(path)]
+
+
+def cache_name(urls):
+    # Service worker keshi nomi: URL lar (demak mazmun) o'zgarsa — yangi kesh
+    return 'face-assets-' + hashlib.sha256(json.dumps(sorted(urls)).encode()).hexdigest()[:12]
+
+
+def compress(path):
+    """Fayl yoniga .gz / .br nusxa (kichraymasa yozilmaydi). Yozilgan kengaytmalar ro'yxati."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    variants = [('.gz', gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append(('.br', brotli.compress(data, quality=11)))
+    written = []
+    for suffix, body in variants:
+        if len(body) >= len(data) * 0.95:
+            continue
+        tmp = f'{path}{suffix}.tmp'
+        with open(tmp, 'wb') as out:
+            out.write(body)
+        os.replace(tmp, path + suffix)
+        written.append(suffix)
+    return written
+
+
+class PrecompressedManifestStorage(ManifestStaticFilesStorage):
+    # JS ichidagi sourceMappingURL/import lar qayta yozilmaydi: MediaPipe .map fayllarsiz tarqatiladi
+    patterns = tuple(pattern for pattern in ManifestStaticFilesStorage.patterns if pattern[0] == '*.css')
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in set(self.hashed_files.values()):
+            if os.path.splitext(name)[1] not in COMPRESS_EXTENSIONS:
+                continue
+            path = self.path(name)
+            if os.path.getsize(path) >= COMPRESS_MIN_SIZE:
+                compress(path)
+
+
+@lru_cache(maxsize=1)
+def _hashed_names():
+    return frozenset(getattr(staticfiles_storage, 'hashed_files', {}).values())
+
+
+def is_hashed(name):
+    return name in _hashed_names()
+
+
+def pick_encoding(path, accept_encoding):
+    """(ochiladigan fayl yo'li, Content-Encoding | None) — mijoz qabul qilsa siqilgan nusxa."""
+    accepted = {
+        token.split(';')[0].strip() for token in accept_encoding.lower().split(',')
+        if not re.search(r';\s*q=0(\.0*)?\s*$', token)
+    }
+    for encoding, suffix in ENCODINGS:
+        if encoding in accepted and os.path.isfile(path + suffix):
+            return path + suffix, encoding
+    return path, None
@@ -0,0 +1,93 @@
+# courses/attention.py — face.html dagi diqqat hisobining NumPy (vektorli) varianti
+#
+# Kirish: (kadrlar, 478, 3) shakldagi MediaPipe face-mesh nuqtalari
+# (refineLandmarks=True). Yuz topilmagan kadrlar NaN bilan to'ldiriladi.
+
+import numpy as np
+
+from .telemetry import LOOKING_THRESHOLD, CENTER_TOLERANCE
+
+NUM_LANDMARKS = 478
+NOSE_TIP = 1
+
+# face.html: getEyeVector() dagi ro'yxatlar
+LEFT_EYE = [33, 7, 163, 144, 145, 153, 154, 155, 133, 173, 157, 158, 159, 160, 161, 246]
+RIGHT_EYE = [362, 382, 381, 380, 374, 373, 390, 249, 263, 466, 388, 387, 386, 385, 384, 398]
+LEFT_IRIS = [468, 469, 470, 471, 472]
+RIGHT_IRIS = [473, 474, 475, 476, 477]
+
+# (2, 5) — [chap, o'ng] ko'z qorachig'i indekslari
+_IRIS = np.array([LEFT_IRIS, RIGHT_IRIS])
+# (2, 2) — eyeIndices[0] va eyeIndices[8] (ko'z chetlari)
+_EYE_CORNERS = np.array([[LEFT_EYE[0], LEFT_EYE[8]], [RIGHT_EYE[0], RIGHT_EYE[8]]])
+
+
+def _as_batch(landmarks):
+    arr = np.asarray(landmarks, dtype=np.float32)
+    if arr.ndim != 3 or arr.shape[1] != NUM_LANDMARKS or arr.shape[2] < 2:
+        raise ValueError(f"(frames, {NUM_LANDMARKS}, 3) shakl kutilgan, {arr.shape} berildi")
+    return arr[..., :2]
+
+
+def iris_centers(landmarks):
+    # (frames, 2, 2): har kadr, [chap, o'ng], (x, y)
+    xy = _as_batch(landmarks)
+    return xy[:, _IRIS].mean(axis=2)
+
+
+def eye_centers(landmarks):
+    xy = _as_batch(landmarks)
+    return xy[:, _EYE_CORNERS].mean(axis=2)
+
+
+def gaze_angles(landmarks):
+    # (frames, 2): har ko'z uchun |atan2(dy, dx)| gradusda
+    delta = iris_centers(landmarks) - eye_centers(landmarks)
+    return np.abs(np.degrees(np.arctan2(delta[..., 1], delta[..., 0])))
+
+
+def face_present(landmarks):
+    xy = _as_batch(landmarks)
+    return ~np.isnan(xy[:, NOSE_TIP]).any(axis=1)
+
+
+def centered_mask(landmarks, tolerance=CENTER_TOLERANCE):
+    nose = _as_batch(landmarks)[:, NOSE_TIP]
+    with np.errstate(invalid='ignore'):
+        return (np.abs(nose - 0.5) < tolerance).all(axis=1)
+
+
+def window_scores(mask, window):
+    # Har `window` kadrlik oyna uchun True ulushi; oxirgi to'liq bo'lmagan oyna ham hisoblanadi
+    mask = np.asarray(mask, dtype=np.float32)
+    if window <= 0:
+        raise ValueError("window musbat bo'lishi kerak")
+    n = mask.shape[0]
+    if n == 0:
+        return np.zeros(0, dtype=np.float32)
+    starts = np.arange(0, n, window)
+    sums = np.add.reduceat(mask, starts)
+    counts = np.minimum(starts + window, n) - starts
+    return sums / counts
+
+
+def score_batch(landmarks, window=30, threshold=LOOKING_THRESHOLD, tolerance=CENTER_TOLERANCE):
+    """
+    Butun kadrlar to'plamini bir o'tishda baholaydi.
+    Qaytaradi: angles (frames, 2), avg_angle, present, centered, looking
+    (markazda va ekranga qaragan) va har oyna uchun scores.
+    """
+    angles = gaze_angles(landmarks)
+    avg_angle = angles.mean(axis=1)
+    present = face_present(landmarks)
+    centered = centered_mask(landmarks, tolerance) & present
+    with np.errstate(invalid='ignore'):
+        looking = centered & (avg_angle < threshold)
+    return {
+        'angles': angles,
+        'avg_angle': avg_angle,
+        'present': present,
+        'centered': centered,
+        'looking': looking,
+        'scores': window_scores(looking, window),
+    }
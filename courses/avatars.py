@@ -0,0 +1,109 @@
+# courses/avatars.py — profil rasmlarining kichraytirilgan nusxalari
+#
+# Yuklangan rasm bir marta o'qiladi: EXIF bo'yicha buriladi, kvadratga
+# kesiladi va AVATAR_SIZES o'lchamlarida WebP + JPEG (zaxira) sifatida
+# yoziladi. Metama'lumot (EXIF, GPS) nusxalarga o'tmaydi. Fayl nomi asl
+# rasm mazmunining xeshi — mazmun o'zgarmasa nom ham o'zgarmaydi, shuning
+# uchun ular `immutable` bilan keshlanadi (views.avatar_thumbnail).
+
+import hashlib
+import io
+import os
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from PIL import Image, ImageOps
+
+SIZES = tuple(sorted(getattr(settings, 'AVATAR_SIZES', (48, 96, 192))))
+QUALITY = getattr(settings, 'AVATAR_QUALITY', 82)
+MAX_AGE = getattr(settings, 'AVATAR_MAX_AGE', 365 * 86400)
+THUMB_DIR = 'avatars/thumbs'
+# format -> (kengaytma, Pillow saqlash parametrlari)
+FORMATS = {
+    'webp': ('webp', {'format': 'WEBP', 'quality': QUALITY, 'method': 4}),
+    'jpeg': ('jpg', {'format': 'JPEG', 'quality': QUALITY, 'optimize': True, 'progressive': True}),
+}
+
+
+def thumb_name(digest, size, fmt):
+    return f"{THUMB_DIR}/{digest}-{size}.{FORMATS[fmt][0]}"
+
+
+def content_hash(f):
+    h = hashlib.sha256()
+    f.seek(0)
+    for chunk in iter(lambda: f.read(1024 * 1024), b''):
+        h.update(chunk)
+    f.seek(0)
+    return h.hexdigest()[:16]
+
+
+def _missing(digest):
+    return [
+        (size, fmt) for size in SIZES for fmt in FORMATS
+        if not os.path.exists(default_storage.path(thumb_name(digest, size, fmt)))
+    ]
+
+
+def _write(name, image, options):
+    path = default_storage.path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    buf = io.BytesIO()
+    image.save(buf, **options)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as out:
+        out.write(buf.getvalue())
+    os.replace(tmp, path)  # yarim yozilgan fayl hech qachon berilmaydi
+
+
+def make_thumbnails(f):
+    """
+    Fayl obyektidan nusxalarni yaratadi (borlari qayta yaratilmaydi);
+    mazmun xeshini qaytaradi. Rasm bo'lmasa — PIL xatosi.
+    """
+    digest = content_hash(f)
+    missing = _missing(digest)
+    if not missing:
+        return digest
+    with Image.open(f) as image:
+        # JPEG ni kerakli o'lchamga yaqin masshtabda dekodlash (telefon rasmlarida ancha tez)
+        image.draft('RGB', (SIZES[-1] * 2, SIZES[-1] * 2))
+        image = ImageOps.exif_transpose(image)
+        if image.mode != 'RGB':
+            # Shaffof joylar JPEG da qora bo'lib qolmasin — oq fonga qo'yamiz
+            rgba = image.convert('RGBA')
+            image = Image.new('RGB', rgba.size, 'white')
+            image.paste(rgba, mask=rgba.getchannel('A'))
+        square = ImageOps.fit(image, (SIZES[-1], SIZES[-1]), Image.LANCZOS)
+    for size in sorted({size for size, _ in missing}, reverse=True):
+        resized = square if size == SIZES[-1] else square.resize((size, size), Image.LANCZOS)
+        for fmt in FORMATS:
+            if (size, fmt) in missing:
+                _write(thumb_name(digest, size, fmt), resized, FORMATS[fmt][1])
+    f.seek(0)
+    return digest
+
+
+def thumbnails_for_path(path):
+    # backfill_avatars jarayonlari uchun: faqat fayl bilan ishlaydi, bazaga murojaat yo'q
+    with open(path, 'rb') as f:
+        return make_thumbnails(f)
+
+
+def pick_size(px):
+    # So'ralgan o'lchamdan kichik bo'lmagan eng kichik nusxa
+    return next((size for size in SIZES if size >= px), SIZES[-1])
+
+
+def urls(digest, px):
+    # {'webp': '... 1x, ... 2x', 'jpeg': '...', 'jpeg_2x': '...'} — <picture> uchun
+    one, two = pick_size(px), pick_size(px * 2)
+
+    def url(size, fmt):
+        return reverse('courses:avatar_thumbnail', args=[os.path.basename(thumb_name(digest, size, fmt))])
+    return {
+        'webp': f"{url(one, 'webp')} 1x, {url(two, 'webp')} 2x",
+        'jpeg': url(one, 'jpeg'),
+        'jpeg_2x': url(two, 'jpeg'),
+    }
@@ -0,0 +1,128 @@
+# courses/completion.py — kurs bo'yicha yakunlash hisoblagichlari (CourseCompletion)
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+
+from .models import CourseCompletion, Lesson, StudentProgress
+
+
+def contribution(passed, score):
+    # (lessons_passed, score_sum, scored_count) — avvalgi tsikldagi qoida bilan bir xil:
+    # o'tilgan dars hisoblanadi, ball esa faqat bo'sh/0 bo'lmasa qo'shiladi
+    if not passed:
+        return 0, 0.0, 0
+    if score:
+        return 1, score, 1
+    return 1, 0.0, 0
+
+
+def _bump(student_id, course_id, passed, score_sum, scored):
+    return CourseCompletion.objects.filter(student_id=student_id, course_id=course_id).update(
+        lessons_passed=F('lessons_passed') + passed,
+        score_sum=F('score_sum') + score_sum,
+        scored_count=F('scored_count') + scored,
+    )
+
+
+def apply_delta(student_id, course_id, old, new):
+    delta = [n - o for n, o in zip(contribution(*new), contribution(*old))]
+    if course_id is None or not any(delta):
+        return
+    # savepoint=False: odatda submit_test tranzaksiyasi ichida — ortiqcha SAVEPOINT/RELEASE siz
+    with transaction.atomic(savepoint=False):
+        # Qator yo'q va qiymat kamaysa (masalan, kurs o'chirilmoqda) — yaratmaymiz
+        if not _bump(student_id, course_id, *delta) and delta[0] > 0:
+            CourseCompletion.objects.bulk_create(
+                [CourseCompletion(student_id=student_id, course_id=course_id)], ignore_conflicts=True
+            )
+            _bump(student_id, course_id, *delta)
+
+
+def _aggregate(progress):
+    return (
+        progress.filter(test_passed=True, lesson__course__isnull=False)
+        .values('student_id', 'lesson__course_id')
+        .annotate(
+            passed=Count('id'),
+            total=Sum('test_score', filter=Q(test_score__gt=0), default=0.0),
+            scored=Count('id', filter=Q(test_score__gt=0)),
+        )
+        .order_by()
+    )
+
+
+def rebuild(course_ids=None, student_id=None, batch_size=1000):
+    """
+    Hisoblagichlarni noldan qayta quradi: bitta GROUP BY so'rovi va
+    to'plamli INSERT. course_ids/student_id bilan qismini qayta hisoblash mumkin.
+    """
+    progress = StudentProgress.objects.all()
+    completions = CourseCompletion.objects.all()
+    if course_ids is not None:
+        progress = progress.filter(lesson__course_id__in=course_ids)
+        completions = completions.filter(course_id__in=course_ids)
+    if student_id is not None:
+        progress = progress.filter(student_id=student_id)
+        completions = completions.filter(student_id=student_id)
+
+    with transaction.atomic():
+        completions.delete()
+        rows = [
+            CourseCompletion(
+                student_id=row['student_id'],
+                course_id=row['lesson__course_id'],
+                lessons_passed=row['passed'],
+                score_sum=row['total'],
+                scored_count=row['scored'],
+            )
+            for row in _aggregate(progress).iterator()
+        ]
+        CourseCompletion.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+def course_status(student, course):
+    """
+    (hamma darslar o'tilganmi, o'tilgan darslar, jami darslar, o'rtacha ball) —
+    darslar sonidan qat'i nazar ikki so'rov.
+    """
+    total = course.lessons.count()
+    completion = CourseCompletion.objects.filter(student=student, course=course).first()
+    passed = completion.lessons_passed if completion else 0
+    average = completion.average_score if completion else None
+    return total > 0 and passed >= total, passed, total, average
+
+
+def _course_id(progress):
+    if StudentProgress.lesson.is_cached(progress):
+        return progress.lesson.course_id
+    return Lesson.objects.filter(pk=progress.lesson_id).values_list('course_id', flat=True).first()
+
+
+def progress_saved(instance, created):
+    old = (False, None) if created else getattr(instance, '_loaded_result', None)
+    new = (instance.test_passed, instance.test_score)
+    instance._loaded_result = new
+    if old is not None and contribution(*old) == contribution(*new):
+        return
+
+    course_id = _course_id(instance)
+    if old is None:
+        # Eski qiymat noma'lum (qo'lda yaratilgan obyekt) — faqat shu talaba/kursni qayta hisoblaymiz
+        if course_id is not None:
+            rebuild(course_ids=[course_id], student_id=instance.student_id)
+    else:
+        apply_delta(instance.student_id, course_id, old, new)
+
+
+def progress_deleted(instance):
+    old = getattr(instance, '_loaded_result', (instance.test_passed, instance.test_score))
+    if any(contribution(*old)):
+        apply_delta(instance.student_id, _course_id(instance), old, (False, None))
+
+
+def lesson_moved(old_course_id, new_course_id):
+    # Dars boshqa kursga o'tkazilganda ikkala kurs ham qayta hisoblanadi
+    course_ids = [cid for cid in (old_course_id, new_course_id) if cid is not None]
+    if course_ids and old_course_id != new_course_id:
+        rebuild(course_ids=course_ids)
@@ -0,0 +1,213 @@
+# courses/exports.py — guruh × dars matritsasini (davomat, test, ball) oqim bilan eksport qilish
+#
+# Talabalar, StudentProgress va Attendance qatorlari student_id bo'yicha
+# tartiblangan .iterator() lardan birlashtiriladi (merge join): xotirada
+# faqat darslar ro'yxati va bitta talabaning qatori turadi. Davomat —
+# StudentProgress.attended yoki shu dars jadvalida kelganlik (Attendance,
+# istalgan sana). CSV ham, XLSX ham qatorma-qator hosil qilinadi.
+
+import csv
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+from django.utils.dateparse import parse_date
+
+from .models import Attendance, Lesson, Profile, StudentProgress
+
+CHUNK_SIZE = 2000
+# Shuncha qatordan keyin to'plangan baytlar tashqariga beriladi
+FLUSH_ROWS = 200
+# Jadval dasturlari formula deb o'qiydigan boshlanishlar (CSV injection)
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def parse_day(value):
+    # '' / None -> None; YYYY-MM-DD bo'lmasa ValueError
+    if not value:
+        return None
+    day = parse_date(value)
+    if day is None:
+        raise ValueError(f"Sana noto'g'ri: {value}")
+    return day
+
+
+def group_lessons(group_id, date_from=None, date_to=None):
+    lessons = Lesson.objects.filter(course_id=group_id)
+    if date_from:
+        lessons = lessons.filter(date__gte=date_from)
+    if date_to:
+        lessons = lessons.filter(date__lte=date_to)
+    return list(lessons.order_by('date', 'start_time', 'order', 'id').values_list('id', 'date', 'title'))
+
+
+def header(lessons):
+    columns = ['Login', "To'liq ism"]
+    for _, day, title in lessons:
+        label = f"{day:%d.%m.%Y} {title}" if day else title
+        columns += [f"{label}: davomat", f"{label}: test", f"{label}: ball"]
+    return columns
+
+
+def progress_matrix(group_id, date_from=None, date_to=None):
+    """
+    Sarlavha, so'ng har talaba uchun bitta qator: login, ism va har dars uchun
+    (davomat 1/0, test 1/0, ball). Davomat: StudentProgress.attended yoki
+    Attendance (jadval bo'yicha kelganlik). Yozuv bo'lmagan katakchalar bo'sh.
+    """
+    lessons = group_lessons(group_id, date_from, date_to)
+    yield header(lessons)
+    position = {lesson_id: i for i, (lesson_id, _, _) in enumerate(lessons)}
+
+    students = (
+        Profile.objects.filter(group_id=group_id).order_by('user_id')
+        .values_list('user_id', 'user__username', 'full_name').iterator(chunk_size=CHUNK_SIZE)
+    )
+    progress = (
+        StudentProgress.objects.filter(student__profile__group_id=group_id, lesson_id__in=list(position))
+        .order_by('student_id', 'lesson_id')
+        .values_list('student_id', 'lesson_id', 'attended', 'test_passed', 'test_score')
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    present = (
+        Attendance.objects.filter(student__profile__group_id=group_id, schedule__lesson_id__in=list(position))
+        .order_by('student_id', 'schedule__lesson_id')
+        .values_list('student_id', 'schedule__lesson_id').distinct()
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    pending = next(progress, None)
+    pending_present = next(present, None)
+    for user_id, username, full_name in students:
+        cells = [''] * (3 * len(lessons))
+        # Tartib bir xil: oldingi talabalarning (guruhdan chiqqan) qatorlari o'tkazib yuboriladi
+        while pending is not None and pending[0] < user_id:
+            pending = next(progress, None)
+        while pending is not None and pending[0] == user_id:
+            _, lesson_id, attended, passed, score = pending
+            i = 3 * position[lesson_id]
+            cells[i:i + 3] = [int(attended), int(passed), score if score is not None else '']
+            pending = next(progress, None)
+        while pending_present is not None and pending_present[0] < user_id:
+            pending_present = next(present, None)
+        while pending_present is not None and pending_present[0] == user_id:
+            cells[3 * position[pending_present[1]]] = 1
+            pending_present = next(present, None)
+        yield [username, full_name] + cells
+
+
+class _Buffer:
+    # Yozilganini yig'ib, so'ralganda qaytaradi (csv.writer va zipfile uchun)
+    def __init__(self):
+        self.parts = []
+
+    def write(self, data):
+        self.parts.append(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = self.parts[0][:0].join(self.parts) if self.parts else b''
+        self.parts.clear()
+        return data
+
+
+def csv_cell(value):
+    # Foydalanuvchi matni (login, ism, dars nomi) formula bo'lib ochilmasin — oldiga '
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def csv_stream(rows):
+    # Excel UTF-8 ni to'g'ri ochishi uchun BOM
+    buf = _Buffer()
+    writer = csv.writer(buf)
+    buf.write('\ufeff')
+    for i, row in enumerate(rows, 1):
+        writer.writerow([csv_cell(value) for value in row])
+        if i % FLUSH_ROWS == 0:
+            yield buf.drain().encode()
+    tail = buf.drain()
+    if tail:
+        yield tail.encode()
+
+
+_XLSX_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Natijalar" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+_XML_INVALID = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def _xlsx_cell(value):
+    if value == '' or value is None:
+        return '<c/>'
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f'<c><v>{value}</v></c>'
+    text = escape(_XML_INVALID.sub('', str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def xlsx_stream(rows):
+    """
+    Minimal XLSX (bitta varaq, inline satrlar) — openpyxl siz. zipfile
+    izlanmaydigan (non-seekable) oqimga data descriptor bilan yozadi,
+    shuning uchun arxiv ham qatorma-qator beriladi.
+    """
+    buf = _Buffer()
+    archive = zipfile.ZipFile(buf, 'w', zipfile.ZIP_DEFLATED)
+    for name, body in _XLSX_PARTS.items():
+        archive.writestr(name, body)
+    yield buf.drain()
+    with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+        sheet.write(
+            b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+        )
+        for i, row in enumerate(rows, 1):
+            sheet.write(('<row>' + ''.join(_xlsx_cell(v) for v in row) + '</row>').encode())
+            if i % FLUSH_ROWS == 0:
+                yield buf.drain()
+        sheet.write(b'</sheetData></worksheet>')
+    archive.close()
+    yield buf.drain()
+
+
+FORMATS = {
+    'csv': (csv_stream, 'text/csv; charset=utf-8'),
+    'xlsx': (xlsx_stream, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
@@ -0,0 +1,213 @@
+# courses/facematch.py — guruh bo'yicha yuz indeksi va davomat
+#
+# Har guruh uchun jarayon xotirasida bitta indeks: talabalar id lari va
+# deskriptorlari bitta uzluksiz (n, DIM) float32 matritsada. Tekshiruv —
+# bitta matritsa ko'paytmasi (probes @ matrix.T): butun sinfning yuzlari
+# bir o'tishda moslanadi. Ro'yxatga olish o'zgarsa, indeks qayta qurilmaydi —
+# qator almashtiriladi/qo'shiladi/o'chiriladi (nusxa ustida, o'quvchilar
+# eski holatni xavfsiz ko'radi). Versiya bazada (Course.face_version) —
+# boshqa jarayonlar uni har tekshiruvda o'qiydi va farq qilsa qayta quradi.
+
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import faces, timetable
+from .transactions import write_transaction
+from .models import Attendance, Course, FaceEnrollment, Profile
+
+THRESHOLD = getattr(settings, 'FACE_MATCH_THRESHOLD', 0.97)
+MARGIN = getattr(settings, 'FACE_MATCH_MARGIN', 0.005)
+EARLY_MINUTES = getattr(settings, 'ATTENDANCE_EARLY_MINUTES', 15)
+
+
+class GroupIndex:
+    __slots__ = ('user_ids', 'matrix', 'version')
+
+    def __init__(self, user_ids, matrix, version):
+        self.user_ids = np.asarray(user_ids, dtype=np.int64)
+        self.matrix = np.ascontiguousarray(matrix, dtype=np.float32).reshape(-1, faces.DIM)
+        self.version = version
+
+    def __len__(self):
+        return len(self.user_ids)
+
+    def match(self, probes):
+        """
+        probes: (m, DIM). Har biri uchun (user_id | None, o'xshashlik) —
+        eng yaqini THRESHOLD dan past yoki ikkinchisidan MARGIN ga yaqin bo'lsa None.
+        """
+        probes = np.asarray(probes, dtype=np.float32).reshape(-1, faces.DIM)
+        if not len(self):
+            return [(None, 0.0)] * len(probes)
+        sims = probes @ self.matrix.T
+        best = sims.argmax(axis=1)
+        top = sims[np.arange(len(probes)), best]
+        if len(self) > 1:
+            second = np.partition(sims, -2, axis=1)[:, -2]
+        else:
+            second = np.full(len(probes), -1.0, dtype=np.float32)
+        ok = (top >= THRESHOLD) & (top - second >= MARGIN)
+        return [
+            (int(self.user_ids[b]) if good else None, float(score))
+            for b, score, good in zip(best, top, ok)
+        ]
+
+    def with_row(self, student_id, vector, version):
+        positions = np.flatnonzero(self.user_ids == student_id)
+        if len(positions):
+            matrix = self.matrix.copy()
+            matrix[positions[0]] = vector
+            user_ids = self.user_ids
+        else:
+            matrix = np.vstack([self.matrix, vector[None, :]])
+            user_ids = np.append(self.user_ids, student_id)
+        return GroupIndex(user_ids, matrix, version)
+
+    def without(self, student_id, version):
+        keep = self.user_ids != student_id
+        return GroupIndex(self.user_ids[keep], self.matrix[keep], version)
+
+
+_indexes = {}
+_lock = threading.Lock()
+
+
+def _version(group_id):
+    return Course.objects.filter(pk=group_id).values_list('face_version', flat=True).first()
+
+
+def build_index(group_id, version):
+    rows = list(
+        FaceEnrollment.objects.filter(student__profile__group_id=group_id)
+        .order_by('student_id').values_list('student_id', 'descriptor')
+    )
+    matrix = np.zeros((len(rows), faces.DIM), dtype=np.float32)
+    for i, (_, data) in enumerate(rows):
+        matrix[i] = faces.from_bytes(data)
+    return GroupIndex([user_id for user_id, _ in rows], matrix, version)
+
+
+def get_index(group_id):
+    """Guruh indeksi: versiya bazadan (1 so'rov); eskirgan bo'lsa yana bitta so'rov bilan quriladi."""
+    version = _version(group_id)
+    index = _indexes.get(group_id)
+    if index is None or index.version != version:
+        index = build_index(group_id, version)
+        with _lock:
+            _indexes[group_id] = index
+    return index
+
+
+def _update(group_id, change):
+    # Versiya o'qish va oshirish bitta (IMMEDIATE) tranzaksiyada — oraga boshqa yozuv tushmaydi.
+    # Mahalliy indeks commit dan keyin: joriy bo'lsa o'zgarish qo'llanadi, aks holda keyingi get_index quradi
+    with transaction.atomic(savepoint=False):
+        old_version = _version(group_id)
+        if old_version is None:
+            return
+        Course.objects.filter(pk=group_id).update(face_version=F('face_version') + 1)
+    version = old_version + 1
+
+    def apply():
+        with _lock:
+            index = _indexes.get(group_id)
+            if index is not None and index.version == old_version:
+                _indexes[group_id] = change(index, version)
+            else:
+                _indexes.pop(group_id, None)
+
+    transaction.on_commit(apply)
+
+
+def enrollment_saved(student_id, group_id, vector):
+    if group_id:
+        _update(group_id, lambda index, version: index.with_row(student_id, vector, version))
+
+
+def enrollment_deleted(student_id, group_id):
+    if group_id:
+        _update(group_id, lambda index, version: index.without(student_id, version))
+
+
+def group_changed(student_id, old_group_id, new_group_id):
+    # Talaba boshqa guruhga o'tkazildi: eski indeksdan olib tashlash, yangisiga qo'shish
+    enrollment_deleted(student_id, old_group_id)
+    data = FaceEnrollment.objects.filter(student_id=student_id).values_list('descriptor', flat=True).first()
+    if data is not None:
+        enrollment_saved(student_id, new_group_id, faces.from_bytes(data))
+
+
+def current_slot(group_id, now=None):
+    # Hozir (yoki EARLY_MINUTES oldin) boshlanadigan dars — keshdagi jadvaldan, so'rovsiz
+    now = timezone.localtime(now)
+    day = timetable.DAY_ORDER[now.weekday()]
+    early = timedelta(minutes=EARLY_MINUTES)
+    for key, _, items in timetable.get_timetable(group_id)['week']:
+        if key != day:
+            continue
+        for item in items:
+            start = datetime.combine(now.date(), item['start_time'], tzinfo=now.tzinfo)
+            end = datetime.combine(now.date(), item['end_time'], tzinfo=now.tzinfo)
+            if start - early <= now <= end:
+                return item
+    return None
+
+
+def record(schedule_id, student_ids, scores, when=None):
+    # Allaqachon belgilanganlar o'zgarmaydi (birinchi kelish vaqti saqlanadi)
+    when = when or timezone.now()
+    day = timezone.localdate(when)
+    rows = [
+        Attendance(student_id=sid, schedule_id=schedule_id, date=day, similarity=score, checked_in_at=when)
+        for sid, score in zip(student_ids, scores)
+    ]
+    Attendance.objects.bulk_create(rows, ignore_conflicts=True)
+
+
+@write_transaction
+def mark_present(schedules, when=None):
+    """
+    Tanlangan darslar (Schedule) uchun guruhning barcha talabalarini qo'lda
+    belgilash — faqat id lar o'qiladi, to'plamli INSERT. Qaytaradi: haqiqatan
+    qo'shilgan qatorlar soni (avval belgilanganlar hisoblanmaydi).
+    """
+    when = when or timezone.now()
+    day = timezone.localdate(when)
+    marked = 0
+    for schedule_id, group_id in schedules.values_list('id', 'group_id'):
+        student_ids = list(Profile.objects.filter(group_id=group_id).values_list('user_id', flat=True))
+        # ignore_conflicts qaysi qatorlar o'tkazib yuborilganini aytmaydi — oldin/keyin sanaymiz
+        # (BEGIN IMMEDIATE ichida, shu orada boshqa yozuv tushmaydi)
+        existing = Attendance.objects.filter(schedule_id=schedule_id, date=day)
+        before = existing.count()
+        # Qo'lda belgilangan — o'xshashlik 1.0
+        record(schedule_id, student_ids, [1.0] * len(student_ids), when)
+        marked += existing.count() - before
+    return marked
+
+
+def check_in(group_id, probes, student_id=None, now=None):
+    """
+    Hozirgi dars uchun davomat: probes (m, DIM) bitta o'tishda moslanadi.
+    student_id berilsa (talaba o'zi belgilanmoqda) — faqat o'zi deb topilsa qayd etiladi.
+    Qaytaradi: (dars, [(user_id | None, o'xshashlik), ...]).
+    """
+    slot = current_slot(group_id, now)
+    if slot is None:
+        raise faces.FaceError("Hozir guruhda dars yo'q")
+    matches = get_index(group_id).match(probes)
+    if student_id is not None:
+        matches = [(user_id if user_id == student_id else None, score) for user_id, score in matches]
+    found = {}
+    for user_id, score in matches:
+        if user_id is not None:
+            found[user_id] = max(score, found.get(user_id, score))
+    if found:
+        record(slot['id'], list(found), list(found.values()), now)
+    return slot, matches
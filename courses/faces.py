@@ -0,0 +1,114 @@
+# courses/faces.py — face-mesh nuqtalaridan yuz deskriptori (ro'yxatga olish va davomat)
+#
+# Klient (face.html) MediaPipe face-mesh nuqtalarini ikkilik paketda yuboradi.
+# Deskriptor — yuzning qattiq (mimikada deyarli qimirlamaydigan) nuqtalari
+# orasidagi juft masofalar: ko'zlar orasidagi masofaga bo'linadi va
+# logarifmlanadi (burilish, siljish va masshtabga bog'liq emas), so'ng
+# markazlanib L2 bo'yicha normallanadi — ikki deskriptorning skalyar
+# ko'paytmasi kosinus o'xshashligi bo'ladi. Bu geometrik belgi: sinfdagi
+# talabalarni ajratish uchun, biometrik tasdiqlash o'rnini bosmaydi.
+
+import struct
+
+import numpy as np
+from django.conf import settings
+
+from .attention import NUM_LANDMARKS
+
+# Paket formati (little-endian):
+#   sarlavha: b'FM', versiya (u8), zaxira (u8), kadr eni/bo'yi (f32), kadrlar soni (u16), nuqtalar soni (u16)
+#   so'ng kadrlar * nuqtalar * 3 ta f32 (x, y, z — MediaPipe normallangan koordinatalari)
+MAGIC = b'FM'
+VERSION = 1
+HEADER = struct.Struct('<2sBBfHH')
+MAX_FRAMES = 120
+
+# Qattiq nuqtalar: peshona, burun ko'prigi va uchi, ko'z chetlari, qoshlar, yonoq/jag' chiziqlari
+# (og'iz va qovoqlar — mimika bilan o'zgaradi — kiritilmagan)
+KEYPOINTS = [
+    10, 151, 9, 8, 168, 6, 197, 195, 5, 4, 1, 2, 98, 327,
+    33, 133, 362, 263,
+    70, 105, 107, 336, 334, 300,
+    234, 454, 127, 356, 93, 323, 58, 288,
+]
+OUTER_EYES = (33, 263)
+_PAIRS = np.triu_indices(len(KEYPOINTS), k=1)
+DIM = len(_PAIRS[0])
+
+ENROLL_MIN_FRAMES = getattr(settings, 'FACE_ENROLL_MIN_FRAMES', 15)
+ENROLL_MIN_CONSISTENCY = getattr(settings, 'FACE_ENROLL_MIN_CONSISTENCY', 0.9)
+
+
+class FaceError(ValueError):
+    pass
+
+
+def decode_landmarks(data):
+    """
+    Paketni tekshiradi va (kadrlar, 478, 3) float32 massiv qaytaradi; x va z
+    kadr nisbatiga ko'paytiriladi (normallangan koordinatalar kvadrat bo'lmagan kadrda cho'ziladi).
+    """
+    if len(data) < HEADER.size:
+        raise FaceError("Paket juda qisqa")
+    magic, version, _, aspect, frames, points = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise FaceError("Noma'lum paket formati")
+    if not 0 < frames <= MAX_FRAMES or points != NUM_LANDMARKS:
+        raise FaceError("Kadrlar yoki nuqtalar soni noto'g'ri")
+    if not 0.2 < aspect < 5:
+        raise FaceError("Kadr nisbati noto'g'ri")
+    if len(data) != HEADER.size + frames * points * 3 * 4:
+        raise FaceError("Paket uzunligi kadrlar soniga mos emas")
+    landmarks = np.frombuffer(data, dtype='<f4', offset=HEADER.size).reshape(frames, points, 3).copy()
+    landmarks[..., 0] *= aspect
+    landmarks[..., 2] *= aspect
+    return landmarks
+
+
+def _normalize(vectors):
+    vectors = vectors - vectors.mean(axis=-1, keepdims=True)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return vectors / norms
+
+
+def frame_descriptors(landmarks):
+    # (kadrlar, DIM); yuz topilmagan yoki buzilgan kadrlar tashlab yuboriladi
+    pts = np.asarray(landmarks, dtype=np.float32)[:, KEYPOINTS]
+    dist = np.linalg.norm(pts[:, _PAIRS[0]] - pts[:, _PAIRS[1]], axis=-1)
+    eyes = np.linalg.norm(pts[:, KEYPOINTS.index(OUTER_EYES[0])] - pts[:, KEYPOINTS.index(OUTER_EYES[1])], axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        features = np.log(dist / eyes[:, None])
+    ok = np.isfinite(features).all(axis=1) & (eyes > 1e-3)
+    return _normalize(features[ok]).astype(np.float32)
+
+
+def descriptor(landmarks, min_frames=1):
+    """
+    Kadrlar to'plamidan bitta deskriptor (DIM,) va izchillik — kadrlarning
+    unga o'rtacha kosinus o'xshashligi (yuz qimirlagan/almashganini bildiradi).
+    """
+    frames = frame_descriptors(landmarks)
+    if len(frames) < min_frames:
+        raise FaceError(f"Yuz kamida {min_frames} kadrda aniq ko'rinishi kerak")
+    # Median — bir-ikki xato kadrga chidamli
+    vector = _normalize(np.median(frames, axis=0)).astype(np.float32)
+    return vector, float((frames @ vector).mean())
+
+
+def enrollment_descriptor(landmarks):
+    vector, consistency = descriptor(landmarks, ENROLL_MIN_FRAMES)
+    if consistency < ENROLL_MIN_CONSISTENCY:
+        raise FaceError("Kadrlar bir-biriga mos emas — boshingizni qimirlatmay, kameraga qarang")
+    return vector, consistency
+
+
+def to_bytes(vector):
+    return np.asarray(vector, dtype='<f4').tobytes()
+
+
+def from_bytes(data):
+    vector = np.frombuffer(bytes(data), dtype='<f4')
+    if vector.shape != (DIM,):
+        raise FaceError("Deskriptor uzunligi noto'g'ri")
+    return vector
@@ -24,4 +24,63 @@ class UserRegisterForm(forms.ModelForm):
 class ProfileUpdateForm(forms.ModelForm):
     class Meta:
         model = Profile
-        fields = ['bio', 'avatar']
\ No newline at end of file
+        fields = ['bio', 'avatar']
+
+# Admin: katta fayllar uchun bo'laklab yuklash (courses/uploads.py). Oddiy fayl
+# maydoni ham qoladi; JS yuklab bo'lgach, yashirin <name>__upload maydoniga
+# sessiya id si yoziladi va forma saqlanganda faqat fayl nomi biriktiriladi.
+
+from django.contrib.admin.widgets import AdminFileWidget
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.safestring import mark_safe
+from . import uploads
+
+
+class ChunkedUploadWidget(AdminFileWidget):
+    def __init__(self, target, attrs=None):
+        super().__init__(attrs)
+        self.target = target
+
+    def value_from_datadict(self, data, files, name):
+        upload_id = data.get(f'{name}__upload')
+        if upload_id:
+            return ChunkedUpload(upload_id)
+        return super().value_from_datadict(data, files, name)
+
+    def render(self, name, value, attrs=None, renderer=None):
+        html = super().render(name, value, attrs, renderer)
+        uploader = render_to_string('admin/courses/chunked_upload.html', {
+            'name': name,
+            'id': (attrs or {}).get('id') or f'id_{name}',
+            'target': self.target,
+            'create_url': reverse('courses:upload_create'),
+            'chunk_url': reverse('courses:upload_chunk', args=['00000000-0000-0000-0000-000000000000']),
+        })
+        return mark_safe(html + uploader)
+
+
+class ChunkedUpload(str):
+    # Widget qaytargan sessiya id si (oddiy UploadedFile dan ajratish uchun)
+    pass
+
+
+class ChunkedFileField(forms.FileField):
+    def __init__(self, *, target, user, **kwargs):
+        kwargs.setdefault('widget', ChunkedUploadWidget(target))
+        super().__init__(**kwargs)
+        self.target = target
+        # Faqat shu foydalanuvchi yuklagan sessiya qabul qilinadi
+        self.user = user
+
+    def to_python(self, data):
+        if isinstance(data, ChunkedUpload):
+            try:
+                name = uploads.completed_name(self.user, data, self.target)
+            except forms.ValidationError:
+                name = None
+            if not name:
+                raise forms.ValidationError("Yuklash yakunlanmagan yoki topilmadi.")
+            # Model FileField satr nomni qabul qiladi — fayl qayta saqlanmaydi
+            return name
+        return super().to_python(data)
@@ -0,0 +1,113 @@
+# courses/fragments.py — dashboard, lesson_detail va test_page ning tuzilma HTML qismlari keshi
+#
+# Qism faqat mazmunga (dars, videolar, savollar) va talabaning kichik
+# holatiga bog'liq: dars kartasida — nishon (3 xil), videolar ro'yxatida —
+# watched_count (qaysilari ko'rilgan/ochiq shundan kelib chiqadi). Shuning
+# uchun kalit talabaga emas, (dars, versiya, holat) ga bog'liq va barcha
+# talabalar uchun umumiy. Dars/video o'zgarsa signal Lesson.content_version
+# ni oshiradi (bazada — barcha jarayonlar bir xil versiyani ko'radi, dars
+# qatori bilan birga o'qiladi); test savollari Test.answers_version bilan.
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.template.loader import render_to_string
+
+from .answer_keys import get_answer_key
+from .models import Lesson
+from .progress import video_states
+
+ENABLED = getattr(settings, 'FRAGMENT_CACHE', True)
+TIMEOUT = getattr(settings, 'FRAGMENT_CACHE_TIMEOUT', 86400)
+
+STATE_ATTENDED = 'attended'
+STATE_PASSED = 'passed'
+STATE_PENDING = 'pending'
+
+
+def bump_lessons(lesson_ids):
+    # Eski qismlar o'chirilmaydi — yangi versiya bilan so'ralmay qoladi va muddati tugaydi.
+    # update() — Lesson signallari qayta ishga tushmaydi
+    Lesson.objects.filter(pk__in={lid for lid in lesson_ids if lid}).update(content_version=F('content_version') + 1)
+
+
+def card_state(progress):
+    if progress is None:
+        return STATE_PENDING
+    if progress.attended:
+        return STATE_ATTENDED
+    return STATE_PASSED if progress.test_passed else STATE_PENDING
+
+
+def lesson_cards(lessons, progress_map):
+    """
+    Dashboard kartalari (tartib saqlanadi): bitta get_many, yetishmaganlari
+    chiziladi va bitta set_many bilan yoziladi.
+    """
+    states = [card_state(progress_map.get(lesson.id)) for lesson in lessons]
+    if not ENABLED:
+        return [_render_card(lesson, state) for lesson, state in zip(lessons, states)]
+    keys = [
+        f'fragments:card:{lesson.id}:v{lesson.content_version}:{state}' for lesson, state in zip(lessons, states)
+    ]
+    found = cache.get_many(keys)
+    cards, new = [], {}
+    for lesson, state, key in zip(lessons, states, keys):
+        html = found.get(key)
+        if html is None:
+            html = new[key] = _render_card(lesson, state)
+        cards.append(html)
+    if new:
+        cache.set_many(new, TIMEOUT)
+    return cards
+
+
+def _render_card(lesson, state):
+    return render_to_string('courses/fragments/lesson_card.html', {'lesson': lesson, 'state': state})
+
+
+def lesson_videos(lesson, watched_count):
+    """
+    {'videos': html, 'sidebar': html, 'total': videolar soni} — watched_count
+    bo'yicha. Keshda bo'lsa videolar so'rovi ham bajarilmaydi.
+    """
+    if not ENABLED:
+        return _render_videos(lesson, watched_count)
+    key = f'fragments:videos:{lesson.id}:v{lesson.content_version}:{watched_count}'
+    parts = cache.get(key)
+    if parts is None:
+        parts = _render_videos(lesson, watched_count)
+        cache.set(key, parts, TIMEOUT)
+    return parts
+
+
+def _render_videos(lesson, watched_count):
+    videos = list(lesson.videos.all())
+    watched_ids, unlocked, _ = video_states(videos, watched_count)
+    context = {'lesson': lesson, 'videos': videos, 'watched_ids': watched_ids, 'unlocked': unlocked}
+    return {
+        'videos': render_to_string('courses/fragments/lesson_videos.html', context),
+        'sidebar': render_to_string('courses/fragments/lesson_video_list.html', context),
+        'total': len(videos),
+    }
+
+
+def test_questions(test):
+    """
+    {'html': savollar formasi, 'count': savollar soni} — Test.answers_version
+    bo'yicha (savol/variant signallari oshiradi). Keshda bo'lsa javoblar kaliti olinmaydi.
+    """
+    if not ENABLED:
+        return _render_questions(get_answer_key(test))
+    key = f'fragments:test:{test.id}:v{test.answers_version}'
+    parts = cache.get(key)
+    if parts is None:
+        parts = _render_questions(get_answer_key(test))
+        cache.set(key, parts, TIMEOUT)
+    return parts
+
+
+def _render_questions(answer_key):
+    questions = answer_key['questions']
+    html = render_to_string('courses/fragments/test_questions.html', {'questions': questions})
+    return {'html': html, 'count': len(questions)}
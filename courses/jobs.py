@@ -0,0 +1,126 @@
+# courses/jobs.py — sertifikat PDF navbati (ma'lumotlar bazasida, tashqi brokersiz)
+
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import (
+    Certificate, CertificateJob,
+    STATUS_PENDING, STATUS_GENERATING, STATUS_READY, STATUS_FAILED,
+)
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = getattr(settings, 'CERTIFICATE_JOB_MAX_ATTEMPTS', 5)
+BACKOFF_SECONDS = getattr(settings, 'CERTIFICATE_JOB_BACKOFF', 10)
+# Shu vaqtdan uzoq "generating" holida qolgan ish — ishchi o'lgan deb qayta olinadi
+LOCK_TIMEOUT = timedelta(seconds=getattr(settings, 'CERTIFICATE_JOB_LOCK_TIMEOUT', 600))
+
+
+def _reset_fields(now):
+    return dict(status=STATUS_PENDING, attempts=0, run_after=now, last_error='', locked_by='', locked_at=None)
+
+
+def enqueue_certificate(cert, force=False):
+    """
+    Sertifikat uchun PDF ishini navbatga qo'yadi. certificate_id bo'yicha
+    idempotent: navbatdagi yoki bajarilayotgan ish qayta qo'shilmaydi,
+    tugagan ishni faqat force=True qayta ochadi.
+    """
+    now = timezone.now()
+    job, created = CertificateJob.objects.get_or_create(certificate=cert)
+    if not created and (force or job.status == STATUS_FAILED):
+        CertificateJob.objects.filter(pk=job.pk).exclude(status=STATUS_GENERATING).update(**_reset_fields(now))
+    if not cert.pdf_file:
+        Certificate.objects.filter(pk=cert.pk).update(status=STATUS_PENDING)
+        cert.status = STATUS_PENDING
+    return job
+
+
+def enqueue_certificates(certificates=None):
+    # Ko'p sertifikatni to'plam bilan qayta navbatga qo'yish (masalan, shablon o'zgarganda)
+    certificates = Certificate.objects.all() if certificates is None else certificates
+    ids = list(certificates.values_list('certificate_id', flat=True))
+    CertificateJob.objects.bulk_create(
+        [CertificateJob(certificate_id=cid) for cid in ids], ignore_conflicts=True, batch_size=500
+    )
+    return (
+        CertificateJob.objects.filter(certificate_id__in=certificates.values('certificate_id'))
+        .exclude(status=STATUS_GENERATING)
+        .update(**_reset_fields(timezone.now()))
+    )
+
+
+def _claimable(now):
+    return Q(status=STATUS_PENDING, run_after__lte=now) | Q(status=STATUS_GENERATING, locked_at__lt=now - LOCK_TIMEOUT)
+
+
+def claim_next(worker_id):
+    # Shartli UPDATE (compare-and-set) — bir ishni ikki ishchi ololmaydi
+    now = timezone.now()
+    candidates = (
+        CertificateJob.objects.filter(_claimable(now))
+        .order_by('run_after')
+        .values_list('id', flat=True)[:10]
+    )
+    for job_id in candidates:
+        claimed = CertificateJob.objects.filter(_claimable(now), id=job_id).update(
+            status=STATUS_GENERATING, locked_by=worker_id, locked_at=now, attempts=F('attempts') + 1
+        )
+        if claimed:
+            return CertificateJob.objects.select_related(
+                'certificate__student__profile', 'certificate__course'
+            ).get(id=job_id)
+    return None
+
+
+def run_job(job):
+    from .utils import generate_certificate_pdf
+
+    cert = job.certificate
+    old_name = cert.pdf_file.name if cert.pdf_file else None
+    if not old_name:
+        Certificate.objects.filter(pk=cert.pk).update(status=STATUS_GENERATING)
+
+    try:
+        # generate_certificate_pdf sertifikatni save() qiladi — holat bir yozuvda yangilanadi
+        cert.status = STATUS_READY
+        generate_certificate_pdf(cert)
+    except Exception as e:
+        logger.exception("Sertifikat %s PDF xatosi (urinish %s)", cert.certificate_id, job.attempts)
+        final = job.attempts >= MAX_ATTEMPTS
+        CertificateJob.objects.filter(pk=job.pk).update(
+            status=STATUS_FAILED if final else STATUS_PENDING,
+            run_after=timezone.now() + timedelta(seconds=BACKOFF_SECONDS * 2 ** (job.attempts - 1)),
+            last_error=f"{type(e).__name__}: {e}",
+            locked_by='',
+            locked_at=None,
+        )
+        if not old_name:
+            Certificate.objects.filter(pk=cert.pk).update(status=STATUS_FAILED if final else STATUS_PENDING)
+        return False
+
+    # Qayta chiqarilganda eski faylni o'chiramiz
+    if old_name and old_name != cert.pdf_file.name:
+        cert.pdf_file.storage.delete(old_name)
+    # Tekshirish sahifasini certificate_saved signali yangilaydi (courses/signals.py)
+    CertificateJob.objects.filter(pk=job.pk).update(status=STATUS_READY, last_error='', locked_by='', locked_at=None)
+    return True
+
+
+def work(worker_id, poll_interval=2.0, burst=False):
+    # burst=True — navbat bo'shashi bilan chiqadi
+    processed = 0
+    while True:
+        job = claim_next(worker_id)
+        if job is None:
+            if burst:
+                return processed
+            time.sleep(poll_interval)
+            continue
+        run_job(job)
+        processed += 1
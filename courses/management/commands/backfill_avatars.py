@@ -0,0 +1,48 @@
+import multiprocessing
+import os
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from courses.avatars import thumbnails_for_path
+from courses.models import Profile
+
+
+def _thumbnails(item):
+    # Bola jarayon: faqat fayl o'qish/yozish, bazaga murojaat yo'q
+    profile_id, path = item
+    try:
+        return profile_id, thumbnails_for_path(path), None
+    except Exception as e:
+        # Bitta buzilgan/juda katta rasm (masalan, Image.DecompressionBombError) butun jarayonni to'xtatmasin
+        return profile_id, '', f"{type(e).__name__}: {e}"
+
+
+class Command(BaseCommand):
+    help = ("Mavjud profil rasmlari uchun kichraytirilgan nusxalarni (WebP + JPEG) parallel "
+            "yaratadi va avatar_hash ni yozadi. Tayyor nusxalar qayta yaratilmaydi.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--all', action='store_true', help="avatar_hash bor profillarni ham tekshirish")
+
+    def handle(self, *args, **opts):
+        profiles = Profile.objects.exclude(avatar='').exclude(avatar__isnull=True)
+        if not opts['all']:
+            profiles = profiles.filter(avatar_hash='')
+        items = [(p.id, p.avatar.path) for p in profiles.only('id', 'avatar')]
+        if not items:
+            self.stdout.write("Qayta ishlanadigan rasm yo'q")
+            return
+        connections.close_all()
+
+        done = 0
+        with multiprocessing.get_context('fork').Pool(max(1, opts['processes'])) as pool:
+            # Natijalar kelishi bilan yoziladi — to'xtatilsa ham tayyorlari saqlanib qoladi
+            for profile_id, digest, error in pool.imap_unordered(_thumbnails, items, chunksize=8):
+                if error:
+                    self.stdout.write(self.style.WARNING(f"profil {profile_id}: {error}"))
+                # update() — pre_save signali faylni qayta o'qimasin
+                Profile.objects.filter(pk=profile_id).update(avatar_hash=digest)
+                done += bool(digest)
+        self.stdout.write(self.style.SUCCESS(f"{done}/{len(items)} ta rasm qayta ishlandi"))
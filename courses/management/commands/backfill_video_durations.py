@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from courses.mediainfo import probe_path
+from courses.models import Video
+
+
+class Command(BaseCommand):
+    help = ("Mavjud videolar uchun Video.duration ni fayldan aniqlab yozadi (MP4 qutilari yoki ffprobe). "
+            "Davomiyligi noma'lum video ko'rilgan deb belgilanmaydi.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help="duration bor videolarni ham qayta aniqlash")
+
+    def handle(self, *args, **opts):
+        videos = Video.objects.exclude(video_file='')
+        if not opts['all']:
+            videos = videos.filter(duration__isnull=True)
+        done = missing = 0
+        for video_id, name in videos.values_list('id', 'video_file').iterator():
+            try:
+                duration = probe_path(Video(video_file=name).video_file.path)
+            except (ValueError, NotImplementedError):
+                duration = None
+            if duration is None:
+                missing += 1
+                self.stdout.write(self.style.WARNING(f"video {video_id}: davomiylik aniqlanmadi ({name})"))
+                continue
+            # update() — pre_save signali faylni qayta o'qimasin
+            Video.objects.filter(pk=video_id).update(duration=duration)
+            done += 1
+        self.stdout.write(self.style.SUCCESS(f"{done} ta video yangilandi, {missing} tasi aniqlanmadi"))
@@ -0,0 +1,34 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from courses.attention import NUM_LANDMARKS, score_batch
+
+
+class Command(BaseCommand):
+    help = "courses.attention uchun benchmark: bitta yadroda sekundiga kadrlar soni"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--frames', type=int, default=30 * 60 * 10, help="Bitta to'plamdagi kadrlar (standart: 10 daqiqa @30fps)")
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--window', type=int, default=30)
+
+    def handle(self, *args, **opts):
+        rng = np.random.default_rng(0)
+        landmarks = rng.normal(0.5, 0.05, size=(opts['frames'], NUM_LANDMARKS, 3)).astype(np.float32)
+        landmarks[::10] = np.nan  # har 10-kadrda yuz yo'q
+
+        score_batch(landmarks[:100], window=opts['window'])  # isitish
+        timings = []
+        for _ in range(opts['repeat']):
+            start = time.perf_counter()
+            result = score_batch(landmarks, window=opts['window'])
+            timings.append(time.perf_counter() - start)
+
+        best = min(timings)
+        fps = opts['frames'] / best
+        self.stdout.write(f"Kadrlar: {opts['frames']}, eng yaxshi vaqt: {best * 1000:.1f} ms")
+        self.stdout.write(f"Tezlik: {fps:,.0f} kadr/s (bitta yadro)")
+        self.stdout.write(f"Bir semestr (16 hafta x 10 soat @30fps): {16 * 10 * 3600 * 30 / fps / 60:.1f} daqiqa")
+        self.stdout.write(f"O'rtacha diqqat: {result['looking'].mean():.1%}")
@@ -0,0 +1,141 @@
+import multiprocessing
+import os
+import time
+from functools import lru_cache
+from io import BytesIO
+
+import qrcode
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from reportlab.lib.colors import HexColor
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+
+from courses.models import Certificate, Course, Profile
+
+
+def _fake_certificates(count):
+    # Bazaga yozilmaydigan (saqlanmagan) sertifikatlar
+    course = Course(title="Python dasturlash asoslari")
+    certificates = []
+    for i in range(count):
+        user = User(username=f"talaba{i}")
+        Profile(user=user, full_name=f"Talaba Familiyev {i}")
+        certificates.append(Certificate(student=user, course=course, test_score=60 + i % 40, issued_at=timezone.now()))
+    return certificates
+
+
+@lru_cache(maxsize=1)
+def _baseline_fonts():
+    # Avvalgi yo'l: to'liq TTF ('name' jadvali qisqartirilmagan), alohida nom bilan
+    font_dir = os.path.join(settings.BASE_DIR, 'static', 'fonts')
+    try:
+        pdfmetrics.registerFont(TTFont('DejaVu-Baseline', os.path.join(font_dir, 'DejaVuSans.ttf')))
+        pdfmetrics.registerFont(TTFont('DejaVu-Baseline-Bold', os.path.join(font_dir, 'DejaVuSans-Bold.ttf')))
+    except Exception:
+        return 'Helvetica', 'Helvetica-Bold'
+    return 'DejaVu-Baseline', 'DejaVu-Baseline-Bold'
+
+
+def render_baseline_pdf(certificate):
+    """
+    Taqqoslash uchun avvalgi monolit yo'l: har PDF da hamma narsa qaytadan
+    chiziladi (statik qatlam va XObject yo'q), QR — PNG rasm, oqimlar ASCII85 +
+    Flate, shriftlar to'liq.
+    """
+    regular, bold = _baseline_fonts()
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=landscape(A4))
+    width, height = landscape(A4)
+
+    c.setFillColor(HexColor("#f8f9fa"))
+    c.rect(0, 0, width, height, fill=1, stroke=0)
+    c.setStrokeColor(HexColor("#d4af37"))
+    c.setLineWidth(15)
+    c.rect(30, 30, width-60, height-60, stroke=1, fill=0)
+    c.setFillColor(HexColor("#b8860b"))
+    c.setFont(bold, 72)
+    c.drawCentredString(width/2, height - 140, "SERTIFIKAT")
+    c.setFillColor(HexColor("#333333"))
+    c.setFont(regular, 32)
+    c.drawCentredString(width/2, height - 200, "Muvaffaqiyatli yakunlaganligi uchun beriladi")
+
+    student_name = (
+        certificate.student.profile.full_name or
+        certificate.student.get_full_name() or
+        certificate.student.username
+    ).strip()
+    c.setFillColor(HexColor("#000080"))
+    c.setFont(bold, 56)
+    c.drawCentredString(width/2, height - 300, student_name.upper())
+    c.setFillColor(HexColor("#333333"))
+    c.setFont(bold, 40)
+    c.drawCentredString(width/2, height - 370, f'"{certificate.course.title}" kursi')
+    c.setFont(regular, 30)
+    c.setFillColor(HexColor("#006400"))
+    c.drawCentredString(width/2, height - 430, f"O'rtacha baho: {certificate.test_score}%")
+    c.setFillColor(HexColor("#333333"))
+    c.drawCentredString(width/2, height - 480, f"Berilgan sana: {certificate.issued_at.strftime('%d.%m.%Y')}")
+    c.setFont(regular, 16)
+    c.setFillColor(HexColor("#555555"))
+    c.drawString(80, 70, f"ID: {str(certificate.certificate_id)[:8].upper()}")
+
+    qr = qrcode.QRCode(version=1, box_size=10, border=4)
+    qr.add_data(f"https://phoenix-rapid-factually.ngrok-free.app/verify/{certificate.certificate_id}/")
+    qr.make(fit=True)
+    qr_buffer = BytesIO()
+    qr.make_image(fill_color="black", back_color="white").save(qr_buffer, format='PNG')
+    qr_buffer.seek(0)
+    c.drawImage(ImageReader(qr_buffer), width - 220, 40, width=140, height=140)
+
+    c.showPage()
+    c.save()
+    return buffer.getvalue()
+
+
+def _renderer(baseline):
+    if baseline:
+        return render_baseline_pdf
+    from courses.utils import render_certificate_pdf
+    return render_certificate_pdf
+
+
+def _render_chunk(count, baseline):
+    import django
+    django.setup()
+    render = _renderer(baseline)
+    return sum(len(render(cert)) for cert in _fake_certificates(count))
+
+
+class Command(BaseCommand):
+    help = "Sertifikat PDF benchmark: sekundiga sertifikatlar va o'rtacha fayl hajmi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=200)
+        parser.add_argument('--processes', type=int, default=1)
+        parser.add_argument('--baseline', action='store_true',
+                            help="avvalgi monolit yo'l bilan (statik qatlam, vektor QR va shrift qisqartirishsiz)")
+
+    def handle(self, *args, **opts):
+        count, processes, baseline = opts['count'], opts['processes'], opts['baseline']
+        render = _renderer(baseline)
+        render(_fake_certificates(1)[0])  # isitish (shriftlar, kesh)
+
+        start = time.perf_counter()
+        if processes <= 1:
+            total = sum(len(render(cert)) for cert in _fake_certificates(count))
+        else:
+            chunks = [count // processes + (1 if i < count % processes else 0) for i in range(processes)]
+            with multiprocessing.Pool(processes) as pool:
+                total = sum(pool.starmap(_render_chunk, [(chunk, baseline) for chunk in chunks]))
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(f"Yo'l: {'avvalgi (baseline)' if baseline else 'statik qatlam + ustki qatlam'}")
+        self.stdout.write(f"Sertifikatlar: {count}, jarayonlar: {processes}, vaqt: {elapsed:.2f} s")
+        self.stdout.write(f"Tezlik: {count / elapsed:.1f} sertifikat/s")
+        self.stdout.write(f"O'rtacha hajm: {total / count / 1024:.1f} KB")
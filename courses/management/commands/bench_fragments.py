@@ -0,0 +1,74 @@
+import re
+import statistics
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, F
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from courses import fragments
+from courses.models import StudentProgress
+
+TIMING = re.compile(r'(tpl|total);dur=([\d.]+)')
+
+
+class Command(BaseCommand):
+    help = ("Sahifa qismlari keshi (courses/fragments.py) benchmarki: dashboard, lesson_detail va "
+            "test_page keshsiz va iliq keshda (Server-Timing: shablon va umumiy vaqt, mediana). "
+            "Sintetik ma'lumotlarda ishlating (generate_synthetic_data).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=50)
+        parser.add_argument('--prefix', default='synth')
+
+    def handle(self, *args, **opts):
+        # Bugungi darsi bor, videolarini ko'rib bo'lgan (test sahifasi ochiq) talaba
+        progress = (
+            StudentProgress.objects
+            .filter(student__username__startswith=f"{opts['prefix']}_", lesson__date=timezone.localdate(),
+                    lesson__test__isnull=False)
+            .annotate(videos=Count('lesson__videos')).filter(watched_count__gte=F('videos'), videos__gt=0)
+            .select_related('lesson').first()
+        )
+        if progress is None:
+            raise CommandError("Mos talaba topilmadi — avval generate_synthetic_data ni ishga tushiring")
+        client = Client()
+        client.force_login(User.objects.get(pk=progress.student_id))
+        pages = {
+            'dashboard': reverse('courses:dashboard'),
+            'lesson_detail': reverse('courses:lesson_detail', args=[progress.lesson_id]),
+            'test_page': reverse('courses:test_page', args=[progress.lesson_id]),
+        }
+        self.stdout.write(f"{'sahifa':<15} {'shablon ms (keshsiz -> kesh)':>30} {'umumiy ms (keshsiz -> kesh)':>30}")
+        enabled = fragments.ENABLED
+        try:
+            for name, url in pages.items():
+                fragments.ENABLED = False
+                off = self._measure(client, url, opts['repeat'])
+                fragments.ENABLED = True
+                cache.clear()
+                client.get(url)  # isitish
+                on = self._measure(client, url, opts['repeat'])
+                self.stdout.write(
+                    f"{name:<15} {off['tpl']:>10.2f} -> {on['tpl']:<6.2f} ({self._saving(off['tpl'], on['tpl'])})"
+                    f" {off['total']:>9.2f} -> {on['total']:<6.2f} ({self._saving(off['total'], on['total'])})"
+                )
+        finally:
+            fragments.ENABLED = enabled
+
+    def _measure(self, client, url, repeat):
+        samples = {'tpl': [], 'total': []}
+        for _ in range(repeat):
+            response = client.get(url)
+            if response.status_code != 200:
+                raise CommandError(f"{url}: {response.status_code}")
+            for key, value in TIMING.findall(response['Server-Timing']):
+                samples[key].append(float(value))
+        return {key: statistics.median(values) for key, values in samples.items()}
+
+    @staticmethod
+    def _saving(before, after):
+        return f"-{100 * (before - after) / before:.0f}%" if before else '—'
@@ -0,0 +1,70 @@
+import time
+import tracemalloc
+import uuid
+from io import BytesIO
+
+import qrcode
+from django.core.management.base import BaseCommand
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+
+from courses.utils import PAGE_SIZE, QR_SIZE, VERIFY_BASE_URL, _draw_qr, qr_matrix
+
+
+def _draw_qr_png(c, verify_url, x, y, size=QR_SIZE):
+    # Avvalgi usul: PIL PNG -> ImageReader -> drawImage (taqqoslash uchun)
+    qr = qrcode.QRCode(version=1, box_size=10, border=4)
+    qr.add_data(verify_url)
+    qr.make(fit=True)
+    qr_img = qr.make_image(fill_color="black", back_color="white")
+    qr_buffer = BytesIO()
+    qr_img.save(qr_buffer, format='PNG')
+    qr_buffer.seek(0)
+    c.drawImage(ImageReader(qr_buffer), x, y, width=size, height=size)
+
+
+def _render(draw, url):
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=PAGE_SIZE)
+    draw(c, url, 40, 40)
+    c.showPage()
+    c.save()
+    return len(buffer.getvalue())
+
+
+def _measure(draw, urls, warm_cache):
+    # Vaqt va xotira alohida o'lchanadi — tracemalloc vaqtni buzadi
+    if not warm_cache:
+        qr_matrix.cache_clear()
+    start = time.perf_counter()
+    size = sum(_render(draw, url) for url in urls)
+    elapsed = time.perf_counter() - start
+
+    if not warm_cache:
+        qr_matrix.cache_clear()
+    tracemalloc.start()
+    for url in urls:
+        _render(draw, url)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed / len(urls) * 1000, peak / 1024, size / len(urls) / 1024
+
+
+class Command(BaseCommand):
+    help = "QR kod: PNG (rastr) va vektor usullarini taqqoslash (vaqt, xotira, PDF hajmi)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=100)
+
+    def handle(self, *args, **opts):
+        urls = [f"{VERIFY_BASE_URL}/verify/{uuid.uuid4()}/" for _ in range(opts['count'])]
+
+        rows = [
+            ('PNG', _measure(_draw_qr_png, urls, warm_cache=False)),
+            ('Vektor (sovuq kesh)', _measure(_draw_qr, urls, warm_cache=False)),
+            ('Vektor (issiq kesh)', _measure(_draw_qr, urls, warm_cache=True)),
+        ]
+
+        self.stdout.write(f"{'Usul':<22}{'ms/QR':>10}{'xotira KB':>12}{'PDF KB':>10}")
+        for name, (ms, peak, size) in rows:
+            self.stdout.write(f"{name:<22}{ms:>10.2f}{peak:>12.0f}{size:>10.1f}")
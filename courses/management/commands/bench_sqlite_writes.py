@@ -0,0 +1,102 @@
+import multiprocessing
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections, transaction
+from django.db.models import F
+
+from courses.models import CourseCompletion, StudentProgress
+from courses.transactions import is_locked_error, write_transaction
+
+# Avvalgi holat: DELETE jurnali, BEGIN (DEFERRED), qayta urinishsiz
+MODES = {
+    'oldin': {'journal': 'DELETE', 'options': {'timeout': 5}, 'retry': False},
+    'keyin': {'journal': 'WAL', 'options': settings.DATABASES['default'].get('OPTIONS', {}), 'retry': True},
+}
+
+
+def _submit(progress_id, score):
+    # submit_test ga o'xshash: o'qish, so'ng yozish (DEFERRED da o'qish→yozish qulfi shu yerda to'qnashadi)
+    progress = StudentProgress.objects.select_related('lesson').get(pk=progress_id)
+    StudentProgress.objects.filter(pk=progress_id).update(test_score=score, test_passed=True)
+    if progress.lesson.course_id:
+        CourseCompletion.objects.filter(student_id=progress.student_id, course_id=progress.lesson.course_id).update(
+            score_sum=F('score_sum') + 0
+        )
+
+
+def _worker(args):
+    path, mode, progress_ids, seed = args
+    conn = connections['default']
+    conn.close()
+    conn.settings_dict = {**conn.settings_dict, 'NAME': path, 'OPTIONS': dict(MODES[mode]['options'])}
+
+    submit = write_transaction(_submit) if MODES[mode]['retry'] else transaction.atomic()(_submit)
+    rng = random.Random(seed)
+    done = errors = 0
+    start = time.perf_counter()
+    for progress_id in progress_ids:
+        try:
+            submit(progress_id, round(rng.uniform(60, 100), 1))
+            done += 1
+        except OperationalError as e:
+            if not is_locked_error(e):
+                raise
+            errors += 1
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return done, errors, elapsed
+
+
+class Command(BaseCommand):
+    help = ("SQLite parallel yozish benchmarki: bazaning nusxasida bir nechta jarayon submit_test ga "
+            "o'xshash tranzaksiyalarni bajaradi — avvalgi (DELETE/DEFERRED) va hozirgi "
+            "(WAL/IMMEDIATE/qayta urinish) rejimlarda tx/s va 'database is locked' xatolari.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8)
+        parser.add_argument('--transactions', type=int, default=300, help="har jarayonda")
+
+    def handle(self, *args, **opts):
+        source = settings.DATABASES['default']['NAME']
+        if settings.DATABASES['default']['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError("Faqat SQLite uchun")
+        ids = list(StudentProgress.objects.values_list('id', flat=True)[:20000])
+        if not ids:
+            raise CommandError("StudentProgress bo'sh — avval generate_synthetic_data ni ishga tushiring")
+        connections['default'].close()
+
+        tmpdir = tempfile.mkdtemp(prefix='bench_sqlite_')
+        try:
+            for mode in MODES:
+                path = os.path.join(tmpdir, f'{mode}.sqlite3')
+                src, dst = sqlite3.connect(source), sqlite3.connect(path)
+                src.backup(dst)
+                dst.execute(f"PRAGMA journal_mode={MODES[mode]['journal']}")
+                src.close()
+                dst.close()
+
+                rng = random.Random(0)
+                jobs = [
+                    (path, mode, [rng.choice(ids) for _ in range(opts['transactions'])], i)
+                    for i in range(opts['workers'])
+                ]
+                start = time.perf_counter()
+                with multiprocessing.get_context('fork').Pool(opts['workers']) as pool:
+                    results = pool.map(_worker, jobs)
+                wall = time.perf_counter() - start
+
+                done = sum(r[0] for r in results)
+                errors = sum(r[1] for r in results)
+                self.stdout.write(
+                    f"{mode:<6} {MODES[mode]['journal']:<7} {opts['workers']} jarayon: "
+                    f"{done / wall:8.1f} tx/s, muvaffaqiyatli {done}, 'locked' xatolari {errors} ({wall:.2f} s)"
+                )
+        finally:
+            shutil.rmtree(tmpdir, ignore_errors=True)
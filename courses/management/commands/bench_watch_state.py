@@ -0,0 +1,85 @@
+import random
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from courses.models import Choice, Lesson, Question, StudentProgress, Test, Video, VideoWatch
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = ("watched_count (ketma-ket holat) benchmark: saqlash hajmi va so'rovlar soni "
+            "(ma'lumotlar tranzaksiyada yaratiladi va bekor qilinadi)")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=10000)
+        parser.add_argument('--videos', type=int, default=50)
+
+    def handle(self, *args, **opts):
+        try:
+            with transaction.atomic():
+                self._run(opts['students'], opts['videos'])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _run(self, students, videos):
+        rng = random.Random(0)
+        lesson = Lesson.objects.create(title="Benchmark darsi")
+        Video.objects.bulk_create(
+            [Video(lesson=lesson, title=f"Video {i}", video_file='videos/bench.mp4', order=i, duration=10)
+             for i in range(videos)]
+        )
+        users = User.objects.bulk_create([User(username=f"bench_watch_{i}") for i in range(students)], batch_size=1000)
+
+        start = time.perf_counter()
+        StudentProgress.objects.bulk_create(
+            [StudentProgress(student=u, lesson=lesson, watched_count=rng.randint(0, videos)) for u in users],
+            batch_size=1000,
+        )
+        elapsed = time.perf_counter() - start
+
+        watched_total = sum(StudentProgress.objects.filter(lesson=lesson).values_list('watched_count', flat=True))
+        self.stdout.write(f"Talabalar: {students}, videolar: {videos}")
+        self.stdout.write(f"StudentProgress qatorlari: {students} (yozish {elapsed:.2f} s)")
+        self.stdout.write(f"Avvalgi M2M join-jadvali bo'lganda: {watched_total} qator "
+                          f"(~{watched_total * 3 * 8 * 2 / 1024 / 1024:.1f} MB ma'lumot + indekslar)")
+        self.stdout.write("Hozir: 0 ta join-qator (bitta butun son ustuni)")
+
+        # O'lchanadigan talaba: oxirgi videodan boshqasi ko'rilgan, hammasi uchun to'liq
+        # heartbeat bor — mark_video_watched va test_page haqiqiy 200 yo'lidan o'tadi
+        student = users[rng.randrange(students)]
+        all_videos = list(Video.objects.filter(lesson=lesson).order_by('order', 'id'))
+        StudentProgress.objects.filter(student=student, lesson=lesson).update(watched_count=videos - 1)
+        VideoWatch.objects.bulk_create([
+            VideoWatch(student=student, video=video, duration=10, watched_seconds=10, completed=True)
+            for video in all_videos
+        ])
+        test = Test.objects.create(lesson=lesson, title="Benchmark testi")
+        for q in range(5):
+            question = Question.objects.create(test=test, text=f"Savol {q}")
+            Choice.objects.bulk_create([Choice(question=question, text=f"Variant {c}", is_correct=c == 0)
+                                        for c in range(4)])
+
+        client = Client()
+        client.force_login(student)
+        for name, method, url in [
+            ('lesson_detail', client.get, f'/lesson/{lesson.id}/'),
+            ('mark_video_watched', client.post, f'/video/{all_videos[-1].id}/watched/'),
+            ('test_page', client.get, f'/lesson/{lesson.id}/test/'),
+        ]:
+            start = time.perf_counter()
+            with CaptureQueriesContext(connection) as queries:
+                response = method(url)
+            elapsed = (time.perf_counter() - start) * 1000
+            # Xato yo'li (403/404) o'lchanib qolmasin
+            if response.status_code != 200:
+                raise CommandError(f"{name}: javob {response.status_code} (kutilgan 200)")
+            self.stdout.write(f"{name:<20} {len(queries):>3} ta so'rov {elapsed:7.1f} ms")
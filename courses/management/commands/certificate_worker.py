@@ -0,0 +1,50 @@
+import multiprocessing
+import os
+import socket
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+
+def _worker_main(worker_id, poll_interval, burst):
+    # spawn rejimida (Windows) Django bola jarayonda qayta sozlanadi
+    import django
+    django.setup()
+    from courses.jobs import work
+
+    return work(worker_id, poll_interval=poll_interval, burst=burst)
+
+
+def run_workers(processes, poll_interval=2.0, burst=False):
+    prefix = f"{socket.gethostname()}:{os.getpid()}"
+    if processes <= 1:
+        return _worker_main(f"{prefix}:0", poll_interval, burst)
+
+    # Ochiq ulanishlar bola jarayonlarga meros qolmasligi kerak
+    connections.close_all()
+    workers = [
+        multiprocessing.Process(target=_worker_main, args=(f"{prefix}:{i}", poll_interval, burst))
+        for i in range(processes)
+    ]
+    for p in workers:
+        p.start()
+    try:
+        for p in workers:
+            p.join()
+    except KeyboardInterrupt:
+        for p in workers:
+            p.terminate()
+
+
+class Command(BaseCommand):
+    help = "Sertifikat PDF navbatini bajaruvchi ishchi (N jarayon)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1, help="Parallel jarayonlar soni")
+        parser.add_argument('--poll-interval', type=float, default=2.0)
+        parser.add_argument('--burst', action='store_true', help="Navbat bo'shashi bilan to'xtash")
+
+    def handle(self, *args, **opts):
+        processes = opts['processes'] or os.cpu_count() or 1
+        self.stdout.write(f"{processes} ta ishchi ishga tushdi")
+        run_workers(processes, poll_interval=opts['poll_interval'], burst=opts['burst'])
@@ -0,0 +1,234 @@
+import datetime
+import io
+import tempfile
+import zlib
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from courses import faces, timetable, uploads
+from courses.models import (
+    STATUS_READY, Certificate, Choice, Course, Lesson, Question, Schedule, StudentProgress, Test, Video, VideoWatch,
+)
+from courses.querybudget import assert_query_budget, query_budgets
+from courses.telemetry import HEADER, MAGIC, SAMPLE, VERSION
+
+
+PASSWORD = 'query-budget-Parol-2024'
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = ("courses/urls.py dagi QUERY_BUDGETS ni tekshiradi: har bir URL sovuq keshda "
+            "chaqiriladi, byudjetdan oshsa xato bilan chiqadi (CI uchun). "
+            "Javob kodi ham tekshiriladi. Ma'lumotlar tranzaksiyada yaratiladi va bekor qilinadi, "
+            "fayllar (avatar, sertifikat PDF) vaqtinchalik MEDIA_ROOT ga yoziladi.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lessons', type=int, default=5)
+        parser.add_argument('--videos', type=int, default=3)
+        parser.add_argument('--questions', type=int, default=5)
+
+    def handle(self, *args, **opts):
+        failures = []
+        try:
+            with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root), \
+                    transaction.atomic():
+                failures = self._run(opts)
+                raise _Rollback
+        except _Rollback:
+            pass
+        if failures:
+            raise CommandError("Tekshiruvdan o'tmadi:\n" + '\n'.join(failures))
+        self.stdout.write(self.style.SUCCESS("Barcha URL lar byudjet ichida."))
+
+    def _fixture(self, opts):
+        today = timezone.localdate()
+        course = Course.objects.create(title="Byudjet kursi")
+        user = User.objects.create(username="query_budget_student")
+        user.set_password(PASSWORD)
+        user.save(update_fields=['password'])
+        user.profile.group = course
+        user.profile.save()
+        # Birinchi tashrif: StudentProgress qatori hali yo'q (sovuq yo'l)
+        newcomer = User.objects.create(username="query_budget_newcomer")
+        newcomer.profile.group = course
+        newcomer.profile.save()
+        lessons = [
+            Lesson.objects.create(course=course, title=f"Dars {i}", order=i, date=today)
+            for i in range(opts['lessons'])
+        ]
+        for lesson in lessons:
+            Video.objects.bulk_create([
+                Video(lesson=lesson, title=f"Video {j}", video_file='videos/budget.mp4', order=j, duration=10)
+                for j in range(opts['videos'])
+            ])
+            test = Test.objects.create(lesson=lesson, title=f"Test {lesson.order}")
+            for q in range(opts['questions']):
+                question = Question.objects.create(test=test, text=f"Savol {q}")
+                Choice.objects.bulk_create([
+                    Choice(question=question, text=f"Variant {c}", is_correct=c == 0) for c in range(4)
+                ])
+            hour = 8 + lesson.order // 7 % 12
+            Schedule.objects.create(group=course, lesson=lesson, day_of_week=timetable.DAY_ORDER[lesson.order % 7],
+                                    start_time=f'{hour}:00', end_time=f'{hour}:50')
+
+        # Yuz bo'yicha davomat uchun hozirgi vaqtga to'g'ri keladigan dars
+        now = timezone.localtime()
+        start = (now - datetime.timedelta(minutes=5)).replace(second=0, microsecond=0)
+        end = max(start, now.replace(hour=23, minute=59, second=0, microsecond=0)).time()
+        Schedule.objects.create(group=course, lesson=lessons[-1], day_of_week=timetable.DAY_ORDER[now.weekday()],
+                                start_time=start.time(), end_time=end)
+
+        first = lessons[0]
+        StudentProgress.objects.create(student=user, lesson=first, watched_count=opts['videos'])
+        second_video = lessons[1].videos.first()
+        VideoWatch.objects.create(student=user, video=second_video, duration=10, watched_seconds=10, completed=True)
+        # Haqiqiy javob yo'llari o'lchansin: 404/202 emas — tayyor PDF va avatar nusxalari
+        cert = Certificate.objects.create(student=user, course=course, test_score=90, status=STATUS_READY,
+                                          pdf_file=ContentFile(b'%PDF-1.4\n%%EOF\n', name='budget.pdf'))
+        image = io.BytesIO()
+        Image.new('RGB', (64, 64), (40, 120, 200)).save(image, 'JPEG')
+        user.profile.avatar = ContentFile(image.getvalue(), name='budget.jpg')
+        user.profile.save()
+        default_storage.save('videos/budget.mp4', ContentFile(b'\0' * 4096))
+        return course, user, newcomer, lessons, first, second_video, cert
+
+    def _uploads(self, staff_user):
+        # upload_chunk uchun yarim, upload_finalize uchun to'liq yuklangan sessiya
+        data = b'budget' * 1024
+        chunk = uploads.create_session(staff_user, 'lesson', 'budget.txt', len(data))
+        done = uploads.create_session(staff_user, 'lesson', 'budget.txt', len(data))
+        uploads.write_chunk(done, 0, len(data), len(data), io.BytesIO(data))
+        return data, chunk, done
+
+    def _run(self, opts):
+        course, user, newcomer, lessons, first, second_video, cert = self._fixture(opts)
+        client = Client()
+        client.force_login(user)
+        first_visit = Client()
+        first_visit.force_login(newcomer)
+        leaving = Client()
+        leaving.force_login(user)
+        staff_user = User.objects.create(username="query_budget_staff", is_staff=True)
+        staff = Client()
+        staff.force_login(staff_user)
+        data, chunk, done = self._uploads(staff_user)
+        half = len(data) // 2
+        answers = {str(q.id): str(q.choices.get(is_correct=True).id) for q in first.test.questions.all()}
+        attention = HEADER.pack(MAGIC, VERSION, 0, timezone.now().timestamp() * 1000, 1) + SAMPLE.pack(0, 3, 0)
+        rng = np.random.default_rng(0)
+        face = rng.random((1, 478, 3), dtype=np.float32) + rng.normal(0, 1e-4, (faces.ENROLL_MIN_FRAMES, 478, 3))
+        face_packet = faces.HEADER.pack(faces.MAGIC, faces.VERSION, 0, 1.0, len(face), 478) + \
+            face.astype('<f4').tobytes()
+
+        calls = {
+            'courses:dashboard': lambda: client.get(reverse('courses:dashboard')),
+            'courses:lesson_detail': lambda: client.get(reverse('courses:lesson_detail', args=[first.id])),
+            'courses:mark_video_watched': lambda: client.post(
+                reverse('courses:mark_video_watched', args=[second_video.id])),
+            'courses:video_heartbeat': lambda: client.post(
+                reverse('courses:video_heartbeat', args=[second_video.id]),
+                '{"played": [[0, 5]]}', content_type='application/json'),
+            'courses:test_page': lambda: client.get(reverse('courses:test_page', args=[first.id])),
+            'courses:submit_test': lambda: client.post(reverse('courses:submit_test', args=[first.id]), answers),
+            'courses:attention_ingest': lambda: client.post(
+                reverse('courses:attention_ingest', args=[first.id]), attention,
+                content_type='application/octet-stream'),
+            'courses:schedule': lambda: client.get(reverse('courses:schedule')),
+            'courses:schedule_ics': lambda: Client().get(
+                reverse('courses:schedule_ics', args=[timetable.feed_token(course.id)])),
+            'courses:verify_certificate': lambda: Client().get(
+                reverse('courses:verify_certificate', args=[cert.certificate_id])),
+            'courses:my_certificates': lambda: client.get(reverse('courses:my_certificates')),
+            'courses:download_certificate': lambda: client.get(
+                reverse('courses:download_certificate', args=[cert.id])),
+            'courses:profile': lambda: client.get(reverse('courses:profile')),
+            'courses:change_password': lambda: client.get(reverse('courses:change_password')),
+            'courses:face_enroll': lambda: client.post(
+                reverse('courses:face_enroll'), face_packet, content_type='application/octet-stream'),
+            'courses:attendance_checkin': lambda: client.post(
+                reverse('courses:attendance_checkin'), face_packet, content_type='application/octet-stream'),
+            'courses:group_analytics': lambda: staff.get(reverse('courses:group_analytics', args=[course.id])),
+            'courses:face_service_worker': lambda: Client().get(reverse('courses:face_service_worker')),
+            'courses:avatar_thumbnail': lambda: Client().get(
+                reverse('courses:avatar_thumbnail', args=[f'{user.profile.avatar_hash}-48.jpg'])),
+            'courses:login': lambda: Client().post(
+                reverse('courses:login'), {'username': user.username, 'password': PASSWORD}),
+            'courses:logout': lambda: leaving.get(reverse('courses:logout')),
+            'courses:secure_video': lambda: _consume(client.get(
+                reverse('courses:secure_video', args=[second_video.id]))),
+            'courses:upload_create': lambda: staff.post(
+                reverse('courses:upload_create'), {'target': 'video', 'filename': 'budget.mp4', 'size': 1024},
+                content_type='application/json'),
+            'courses:upload_chunk': lambda: staff.put(
+                reverse('courses:upload_chunk', args=[chunk.id]), data[:half],
+                content_type='application/octet-stream',
+                headers={'Content-Range': f'bytes 0-{half - 1}/{len(data)}'}),
+            'courses:upload_finalize': lambda: staff.post(
+                reverse('courses:upload_finalize', args=[done.id]),
+                {'crc32': zlib.crc32(data), 'object_id': first.id}, content_type='application/json'),
+            'courses:export_progress': lambda: _consume(staff.get(
+                reverse('courses:export_progress', args=[course.id]))),
+        }
+        # Qo'shimcha senariylar: byudjet eng og'ir qonuniy yo'lga yetishi kerak
+        extra = {
+            'courses:lesson_detail': [("birinchi tashrif", lambda: first_visit.get(
+                reverse('courses:lesson_detail', args=[first.id])))],
+            'courses:login': [("forma", lambda: Client().get(reverse('courses:login')))],
+            'courses:secure_video': [("Range", lambda: _consume(client.get(
+                reverse('courses:secure_video', args=[second_video.id]), headers={'Range': 'bytes=0-99'})), 206)],
+            'courses:upload_chunk': [("holat", lambda: staff.get(reverse('courses:upload_chunk', args=[chunk.id])))],
+            'courses:export_progress': [("xlsx", lambda: _consume(staff.get(
+                reverse('courses:export_progress', args=[course.id]), {'format': 'xlsx'})))],
+        }
+        # Kutilgan javob kodi (qolganlari 200)
+        statuses = {
+            'courses:submit_test': 302, 'courses:login': 302, 'courses:logout': 302, 'courses:upload_create': 201,
+        }
+
+        failures = []
+        budgets = query_budgets()
+        missing = sorted(set(budgets) - set(calls))
+        for name in missing:
+            self.stdout.write(self.style.WARNING(f"{name:<30} senariy yo'q — o'tkazib yuborildi"))
+
+        for name, budget in budgets.items():
+            if name not in calls:
+                continue
+            scenarios = [(name, calls[name], statuses.get(name, 200))] + [
+                (f"{name} ({label})", call, rest[0] if rest else 200) for label, call, *rest in extra.get(name, [])
+            ]
+            for label, call, status in scenarios:
+                cache.clear()
+                try:
+                    response, recorder = assert_query_budget(name, call, status)
+                except AssertionError as e:
+                    failures.append(f"{label}: {e}")
+                    self.stdout.write(self.style.ERROR(f"{label}: {e}"))
+                    continue
+                self.stdout.write(
+                    f"{label:<40} {response.status_code} {recorder.count:>3}/{budget:<3} so'rov "
+                    f"{recorder.sql_ms:6.1f} ms SQL {recorder.template_ms:6.1f} ms shablon"
+                )
+        return failures
+
+
+def _consume(response):
+    # Oqimli javob (fayl, eksport) — so'rovlar tana o'qilganda bajariladi;
+    # test klienti oqim tugagach javobni o'zi yopadi
+    if response.streaming:
+        b''.join(response.streaming_content)
+    return response
@@ -0,0 +1,58 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from courses.queryplans import HOT_QUERIES, SMALL_TABLE_ROWS, check_plan, sample_ids
+
+
+class Command(BaseCommand):
+    help = ("Issiq so'rovlarning EXPLAIN rejasini tekshiradi (courses/queryplans.py): kutilgan "
+            "indeks ishlatilmasa xato bilan chiqadi. Katta ma'lumotda tekshirish uchun avval "
+            "generate_synthetic_data ni ishga tushiring.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--analyze', action='store_true',
+                            help="avval ANALYZE (SQLite statistikasi bilan reja real holatga yaqin)")
+        parser.add_argument('--repeat', type=int, default=20, help="vaqtni o'lchash uchun takrorlar")
+
+    def handle(self, *args, **opts):
+        if connection.vendor != 'sqlite':
+            raise CommandError("Reja tekshiruvi SQLite EXPLAIN QUERY PLAN formatiga mo'ljallangan")
+        if opts['analyze']:
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+        ids = sample_ids()
+        failures = []
+        for query in HOT_QUERIES:
+            qs = query.build(ids)
+            plan = qs.explain()
+            problems = check_plan(query, plan)
+
+            start = time.perf_counter()
+            for _ in range(opts['repeat']):
+                list(qs.all())
+            ms = (time.perf_counter() - start) * 1000 / max(opts['repeat'], 1)
+
+            small = problems and qs.model.objects.count() < SMALL_TABLE_ROWS
+            if small:
+                status = self.style.WARNING('KICHIK')
+            elif problems:
+                status = self.style.ERROR('XATO')
+            else:
+                status = self.style.SUCCESS('OK')
+            self.stdout.write(f"{query.name:<24} {status:<4} {ms:7.2f} ms")
+            if problems or opts['verbosity'] > 1:
+                for line in plan.splitlines():
+                    self.stdout.write(f"    {line}")
+            for problem in problems:
+                self.stdout.write(self.style.ERROR(f"    ! {problem}"))
+                if not small:
+                    failures.append(f"{query.name}: {problem}")
+            if small:
+                self.stdout.write(f"    jadvalda < {SMALL_TABLE_ROWS} qator — skanerlash kutilgan, xato hisoblanmaydi")
+
+        if failures:
+            raise CommandError("Reja regressiyasi:\n" + '\n'.join(failures))
+        self.stdout.write(self.style.SUCCESS("Barcha issiq so'rovlar indeks bilan bajariladi."))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from courses.uploads import STALE_HOURS, cleanup_stale
+
+
+class Command(BaseCommand):
+    help = ("Tugallanmagan eski yuklash sessiyalarini va ularning qisman fayllarini o'chiradi "
+            "(yakunlangan sessiyalarning faqat yozuvi o'chadi, fayl qoladi).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=STALE_HOURS)
+
+    def handle(self, *args, **opts):
+        removed = cleanup_stale(opts['hours'])
+        self.stdout.write(self.style.SUCCESS(f"O'chirildi: {removed} ta tugallanmagan yuklash"))
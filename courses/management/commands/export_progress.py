@@ -0,0 +1,40 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from courses import exports
+from courses.models import Course
+
+
+class Command(BaseCommand):
+    help = ("Guruh × dars matritsasini (davomat, test, ball) CSV yoki XLSX ga oqim bilan yozadi: "
+            "xotirada bir vaqtda faqat bitta talaba qatori turadi.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--group', type=int, required=True, help="guruh (kurs) id si")
+        parser.add_argument('--from', dest='date_from', help="YYYY-MM-DD")
+        parser.add_argument('--to', dest='date_to', help="YYYY-MM-DD")
+        parser.add_argument('--format', choices=sorted(exports.FORMATS), default='csv')
+        parser.add_argument('--output', '-o', help="fayl (berilmasa stdout)")
+
+    def handle(self, *args, **opts):
+        if not Course.objects.filter(id=opts['group']).exists():
+            raise CommandError(f"Guruh topilmadi: {opts['group']}")
+        try:
+            date_from = exports.parse_day(opts['date_from'])
+            date_to = exports.parse_day(opts['date_to'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        stream, _ = exports.FORMATS[opts['format']]
+        chunks = stream(exports.progress_matrix(opts['group'], date_from, date_to))
+        if opts['output']:
+            with open(opts['output'], 'wb') as f:
+                for chunk in chunks:
+                    f.write(chunk)
+            self.stderr.write(self.style.SUCCESS(f"Yozildi: {opts['output']}"))
+        else:
+            out = sys.stdout.buffer
+            for chunk in chunks:
+                out.write(chunk)
+            out.flush()
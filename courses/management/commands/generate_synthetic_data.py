@@ -0,0 +1,132 @@
+import random
+import time
+from datetime import time as dtime, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from courses import analytics, completion, timetable
+from courses.models import (
+    Choice, Course, Lesson, Profile, Question, Schedule, StudentProgress, Test, Video,
+)
+
+
+class Command(BaseCommand):
+    help = ("Yuklama sinovlari uchun sintetik ma'lumotlar: kurslar (guruhlar), sanali darslar va "
+            "jadval, videolar, testlar, talabalar va qisman StudentProgress. "
+            "Hamma obyektlar --prefix bilan belgilanadi (--clear ularni o'chiradi).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--courses', type=int, default=5)
+        parser.add_argument('--lessons', type=int, default=12, help="har kursda")
+        parser.add_argument('--videos', type=int, default=4, help="har darsda")
+        parser.add_argument('--questions', type=int, default=10, help="har testda")
+        parser.add_argument('--students', type=int, default=2000)
+        parser.add_argument('--video-seconds', type=float, default=12,
+                            help="Video.duration — load_test heartbeat'lari shuncha videoni to'liq ko'radi")
+        parser.add_argument('--password', default='synth-pass')
+        parser.add_argument('--prefix', default='synth')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--clear', action='store_true', help="avvalgi sintetik ma'lumotlarni o'chirish")
+
+    def handle(self, *args, **opts):
+        prefix = opts['prefix']
+        if opts['clear']:
+            start = time.perf_counter()
+            User.objects.filter(username__startswith=f"{prefix}_").delete()
+            Course.objects.filter(title__startswith=f"{prefix} ").delete()
+            self.stdout.write(f"Eski ma'lumotlar o'chirildi ({time.perf_counter() - start:.1f} s)")
+
+        start = time.perf_counter()
+        with transaction.atomic():
+            counts = self._generate(opts, random.Random(opts['seed']))
+        # bulk_create signallarsiz — hisoblagichlar va jadval keshi qayta quriladi
+        course_ids = counts.pop('course_ids')
+        completion.rebuild(course_ids=course_ids)
+        analytics.rebuild(group_ids=course_ids)
+        timetable.invalidate(Course.objects.filter(title__startswith=f"{prefix} ").values_list('id', flat=True))
+
+        for name, value in counts.items():
+            self.stdout.write(f"{name:<20} {value}")
+        self.stdout.write(self.style.SUCCESS(f"Tayyor: {time.perf_counter() - start:.1f} s"))
+
+    def _generate(self, opts, rng):
+        prefix = opts['prefix']
+        today = timezone.localdate()
+        courses = Course.objects.bulk_create([
+            Course(title=f"{prefix} kurs {i}", description="Sintetik ma'lumot") for i in range(opts['courses'])
+        ])
+
+        # Darslar bugundan oldin/keyin taqsimlanadi — har kursda bittasi aynan bugun
+        lessons = Lesson.objects.bulk_create([
+            Lesson(
+                course=course, title=f"{course.title} — dars {j}", order=j,
+                date=today + timedelta(days=j - opts['lessons'] // 2),
+                start_time=dtime(8 + j % 8),
+            )
+            for course in courses for j in range(opts['lessons'])
+        ], batch_size=1000)
+        Schedule.objects.bulk_create([
+            Schedule(
+                group_id=lesson.course_id, lesson=lesson, day_of_week=timetable.DAY_ORDER[lesson.date.weekday()],
+                start_time=lesson.start_time, end_time=dtime(8 + lesson.order % 8, 50), room=f"{100 + lesson.order}",
+            )
+            for lesson in lessons
+        ], batch_size=1000)
+        Video.objects.bulk_create([
+            Video(lesson=lesson, title=f"Video {k}", video_file='videos/synthetic.mp4', order=k,
+                  duration=opts['video_seconds'])
+            for lesson in lessons for k in range(opts['videos'])
+        ], batch_size=1000)
+
+        tests = Test.objects.bulk_create([Test(lesson=lesson, title=f"{lesson.title} testi") for lesson in lessons])
+        questions = Question.objects.bulk_create([
+            Question(test=test, text=f"Savol {q}") for test in tests for q in range(opts['questions'])
+        ], batch_size=1000)
+        Choice.objects.bulk_create([
+            Choice(question=question, text=f"Variant {c}", is_correct=c == 0)
+            for question in questions for c in rng.sample(range(4), 4)
+        ], batch_size=1000)
+
+        # Parol xeshi bir marta hisoblanadi (PBKDF2 har foydalanuvchi uchun juda sekin)
+        password = make_password(opts['password'])
+        users = User.objects.bulk_create([
+            User(username=f"{prefix}_{i}", password=password, first_name="Talaba", last_name=str(i))
+            for i in range(opts['students'])
+        ], batch_size=1000)
+        groups = [rng.choice(courses) for _ in users]
+        Profile.objects.bulk_create([
+            Profile(user=user, group=group, full_name=f"Talaba {user.last_name}")
+            for user, group in zip(users, groups)
+        ], batch_size=1000)
+
+        # Qisman progress: dastlabki bir nechta dars o'tilgan, keyingisi yarim ko'rilgan
+        by_course = {}
+        for lesson in lessons:
+            by_course.setdefault(lesson.course_id, []).append(lesson)
+        progress = []
+        for user, group in zip(users, groups):
+            course_lessons = by_course[group.id]
+            passed = rng.randint(0, len(course_lessons) - 1)
+            for lesson in course_lessons[:passed]:
+                progress.append(StudentProgress(
+                    student=user, lesson=lesson, watched_count=opts['videos'], test_passed=True,
+                    test_score=round(rng.uniform(60, 100), 1), attended=True,
+                ))
+            progress.append(StudentProgress(
+                student=user, lesson=course_lessons[passed], watched_count=rng.randint(0, opts['videos']),
+            ))
+        StudentProgress.objects.bulk_create(progress, batch_size=1000)
+
+        return {
+            'course_ids': [c.id for c in courses],
+            'kurslar': len(courses),
+            'darslar': len(lessons),
+            'videolar': len(lessons) * opts['videos'],
+            'savollar': len(questions),
+            'talabalar': len(users),
+            'progress qatorlari': len(progress),
+        }
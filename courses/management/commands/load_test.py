@@ -0,0 +1,264 @@
+import json
+import random
+import subprocess
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import HTTPCookieProcessor, HTTPRedirectHandler, Request, build_opener
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+
+from courses.answer_keys import build_answer_key
+from courses.models import Lesson, StudentProgress
+
+STEPS = [
+    'login_page', 'login', 'dashboard', 'lesson_detail', 'video_heartbeat',
+    'mark_video_watched', 'test_page', 'submit_test', 'my_certificates',
+]
+
+
+class _NoRedirect(HTTPRedirectHandler):
+    # 302 ni kuzatmaymiz — har qadam alohida o'lchanadi
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+def percentile(sorted_values, p):
+    # nearest-rank
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, int(round(p / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+class Session:
+    def __init__(self, base_url, stats, timeout):
+        self.base_url = base_url.rstrip('/')
+        self.cookies = CookieJar()
+        self.opener = build_opener(HTTPCookieProcessor(self.cookies), _NoRedirect)
+        self.stats = stats
+        self.timeout = timeout
+
+    def csrftoken(self):
+        return next((c.value for c in self.cookies if c.name == settings.CSRF_COOKIE_NAME), '')
+
+    def request(self, step, path, data=None, json_body=None):
+        headers = {}
+        body = None
+        if data is not None or json_body is not None:
+            headers = {'X-CSRFToken': self.csrftoken(), 'Referer': self.base_url + path}
+            if json_body is not None:
+                body = json.dumps(json_body).encode()
+                headers['Content-Type'] = 'application/json'
+            else:
+                body = urlencode(data).encode()
+                headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        request = Request(self.base_url + path, data=body, headers=headers)
+        start = time.perf_counter()
+        try:
+            with self.opener.open(request, timeout=self.timeout) as response:
+                status, content = response.status, response.read()
+        except HTTPError as e:
+            status, content = e.code, e.read()
+        except (URLError, OSError):
+            status, content = 0, b''
+        self.stats.add(step, time.perf_counter() - start, status)
+        return status, content
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def add(self, step, seconds, status):
+        with self.lock:
+            self.latencies[step].append(seconds * 1000)
+            if not 200 <= status < 400:
+                self.errors[step] += 1
+
+    def summary(self, wall_seconds):
+        endpoints = {}
+        everything = []
+        for step in STEPS:
+            values = sorted(self.latencies.get(step, []))
+            everything += values
+            if values:
+                endpoints[step] = self._describe(values, self.errors[step], wall_seconds)
+        total = self._describe(sorted(everything), sum(self.errors.values()), wall_seconds)
+        return endpoints, total
+
+    @staticmethod
+    def _describe(values, errors, wall_seconds):
+        return {
+            'count': len(values),
+            'errors': errors,
+            'p50_ms': round(percentile(values, 50), 2),
+            'p95_ms': round(percentile(values, 95), 2),
+            'p99_ms': round(percentile(values, 99), 2),
+            'mean_ms': round(sum(values) / len(values), 2),
+            'max_ms': round(values[-1], 2),
+            'rps': round(len(values) / wall_seconds, 2),
+        }
+
+
+class Command(BaseCommand):
+    help = ("Ishlab turgan serverga (runserver/gunicorn) parallel talaba sessiyalarini yuboradi: "
+            "login → dashboard → lesson_detail → video → test_page → submit_test → my_certificates. "
+            "Har endpoint uchun p50/p95/p99 va o'tkazuvchanlik JSON faylga yoziladi. "
+            "Avval: python manage.py generate_synthetic_data")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--clients', type=int, default=20, help="parallel sessiyalar")
+        parser.add_argument('--sessions', type=int, default=200, help="jami sessiyalar (har biri boshqa talaba)")
+        parser.add_argument('--prefix', default='synth')
+        parser.add_argument('--password', default='synth-pass')
+        parser.add_argument('--correct-ratio', type=float, default=0.8, help="to'g'ri javoblar ulushi")
+        parser.add_argument('--timeout', type=float, default=30)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help="JSON natija fayli (standart: loadtest-<vaqt>.json)")
+        parser.add_argument('--compare', help="avvalgi JSON natija bilan p95 ni solishtirish")
+
+    def handle(self, *args, **opts):
+        rng = random.Random(opts['seed'])
+        plans = self._plans(opts, rng)
+        if not plans:
+            raise CommandError(f"'{opts['prefix']}_' talabalari topilmadi — avval generate_synthetic_data ni ishga tushiring")
+        # Reja tayyor — ip'lar bazaga murojaat qilmaydi, faqat HTTP
+        connection.close()
+
+        stats = Stats()
+        self.stdout.write(f"{len(plans)} sessiya, {opts['clients']} parallel mijoz → {opts['base_url']}")
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=opts['clients']) as pool:
+            list(pool.map(lambda plan: self._session(plan, stats, opts, random.Random(plan['seed'])), plans))
+        wall = time.perf_counter() - start
+
+        endpoints, total = stats.summary(wall)
+        result = {
+            'meta': {
+                'started_at': timezone.now().isoformat(),
+                'commit': self._commit(),
+                'base_url': opts['base_url'],
+                'clients': opts['clients'],
+                'sessions': len(plans),
+                'wall_seconds': round(wall, 2),
+            },
+            'endpoints': endpoints,
+            'total': total,
+        }
+        self._print(endpoints, total)
+        output = opts['output'] or f"loadtest-{timezone.now():%Y%m%d-%H%M%S}.json"
+        with open(output, 'w') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+        self.stdout.write(self.style.SUCCESS(f"Natija: {output}"))
+        if opts['compare']:
+            self._compare(opts['compare'], endpoints)
+
+    def _plans(self, opts, rng):
+        # Har sessiya uchun: talaba, uning guruhidagi birinchi o'tilmagan dars va undagi holat
+        users = list(
+            User.objects.filter(username__startswith=f"{opts['prefix']}_", profile__group__isnull=False)
+            .values_list('id', 'username', 'profile__group_id')
+        )
+        users = rng.sample(users, min(opts['sessions'], len(users)))
+        course_ids = {group_id for _, _, group_id in users}
+        lessons = defaultdict(list)
+        course_lessons = (
+            Lesson.objects.filter(course_id__in=course_ids)
+            .select_related('test').prefetch_related('videos').order_by('order', 'id')
+        )
+        for lesson in course_lessons:
+            lessons[lesson.course_id].append(lesson)
+        answer_keys = {}
+        progress = defaultdict(dict)
+        for p in StudentProgress.objects.filter(student_id__in=[u[0] for u in users]):
+            progress[p.student_id][p.lesson_id] = p
+
+        plans = []
+        for user_id, username, group_id in users:
+            lesson = next(
+                (l for l in lessons[group_id] if not getattr(progress[user_id].get(l.id), 'test_passed', False)),
+                None,
+            )
+            if lesson is None:
+                continue
+            videos = list(lesson.videos.all())
+            watched = getattr(progress[user_id].get(lesson.id), 'watched_count', 0)
+            test = getattr(lesson, 'test', None)
+            if test is not None and test.id not in answer_keys:
+                answer_keys[test.id] = build_answer_key(test)
+            plans.append({
+                'username': username,
+                'lesson_id': lesson.id,
+                'videos': [(v.id, v.duration or 10.0) for v in videos[watched:]],
+                'answer_key': answer_keys.get(getattr(test, 'id', None)),
+                'seed': rng.random(),
+            })
+        return plans
+
+    def _session(self, plan, stats, opts, rng):
+        s = Session(opts['base_url'], stats, opts['timeout'])
+        login_url = reverse('courses:login')
+        s.request('login_page', login_url)
+        status, _ = s.request('login', login_url, {'username': plan['username'], 'password': opts['password']})
+        if status != 302:
+            return
+        s.request('dashboard', reverse('courses:dashboard'))
+        lesson_id = plan['lesson_id']
+        s.request('lesson_detail', reverse('courses:lesson_detail', args=[lesson_id]))
+
+        for video_id, duration in plan['videos']:
+            s.request('video_heartbeat', reverse('courses:video_heartbeat', args=[video_id]),
+                      json_body={'played': [[0, duration]], 'final': True})
+            s.request('mark_video_watched', reverse('courses:mark_video_watched', args=[video_id]), {})
+
+        key = plan['answer_key']
+        if key is not None:
+            s.request('test_page', reverse('courses:test_page', args=[lesson_id]))
+            answers = {}
+            for question in key['questions']:
+                correct = key['correct'][question['id']]
+                choices = [c['id'] for c in question['choices']]
+                pick = next(iter(correct)) if correct and rng.random() < opts['correct_ratio'] else rng.choice(choices)
+                answers[str(question['id'])] = str(pick)
+            s.request('submit_test', reverse('courses:submit_test', args=[lesson_id]), answers)
+        s.request('my_certificates', reverse('courses:my_certificates'))
+
+    def _print(self, endpoints, total):
+        self.stdout.write(f"{'endpoint':<20} {'n':>6} {'xato':>5} {'p50':>8} {'p95':>8} {'p99':>8} {'rps':>8}")
+        for name, row in list(endpoints.items()) + [('JAMI', total)]:
+            self.stdout.write(
+                f"{name:<20} {row['count']:>6} {row['errors']:>5} {row['p50_ms']:>8.1f} "
+                f"{row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} {row['rps']:>8.1f}"
+            )
+
+    def _compare(self, path, endpoints):
+        with open(path) as f:
+            old = json.load(f)
+        self.stdout.write(f"\np95 solishtirish ({old['meta'].get('commit') or path}):")
+        for name, row in endpoints.items():
+            before = old['endpoints'].get(name)
+            if before:
+                change = (row['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100 if before['p95_ms'] else 0
+                self.stdout.write(f"{name:<20} {before['p95_ms']:>8.1f} → {row['p95_ms']:>8.1f} ms ({change:+.0f}%)")
+
+    @staticmethod
+    def _commit():
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, cwd=settings.BASE_DIR,
+            ).stdout.strip() or None
+        except OSError:
+            return None
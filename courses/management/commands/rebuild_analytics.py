@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from courses.analytics import rebuild
+
+
+class Command(BaseCommand):
+    help = "Guruh × dars statistikasini (LessonStats) StudentProgress dan noldan qayta quradi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--group', type=int, action='append', help="Faqat shu guruh(lar) (id)")
+
+    def handle(self, *args, **opts):
+        count = rebuild(group_ids=opts['group'])
+        self.stdout.write(self.style.SUCCESS(f"{count} ta guruh/dars statistikasi qayta qurildi"))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from courses.completion import rebuild
+
+
+class Command(BaseCommand):
+    help = "CourseCompletion hisoblagichlarini StudentProgress dan noldan qayta quradi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course', type=int, action='append', help="Faqat shu kurs(lar) (id)")
+
+    def handle(self, *args, **opts):
+        count = rebuild(course_ids=opts['course'])
+        self.stdout.write(self.style.SUCCESS(f"{count} ta talaba/kurs hisoblagichi qayta qurildi"))
@@ -0,0 +1,26 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from courses.jobs import enqueue_certificates
+from courses.models import Certificate
+from .certificate_worker import run_workers
+
+
+class Command(BaseCommand):
+    help = "Barcha (yoki tanlangan kurs) sertifikatlarini qayta yaratish uchun navbatga qo'yadi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course', type=int, help="Faqat shu kurs (id)")
+        parser.add_argument('--run', action='store_true', help="Navbatni darhol barcha yadrolarda bajarish")
+        parser.add_argument('--processes', type=int, default=os.cpu_count() or 1)
+
+    def handle(self, *args, **opts):
+        certificates = Certificate.objects.all()
+        if opts['course']:
+            certificates = certificates.filter(course_id=opts['course'])
+        queued = enqueue_certificates(certificates)
+        self.stdout.write(f"{queued} ta sertifikat navbatga qo'yildi")
+        if opts['run']:
+            run_workers(opts['processes'], burst=True)
+            self.stdout.write(self.style.SUCCESS("Navbat bajarildi"))
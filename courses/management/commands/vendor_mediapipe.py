@@ -0,0 +1,37 @@
+import os
+import urllib.request
+
+from django.core.management.base import BaseCommand, CommandError
+
+from courses.assets import VENDOR_ROOT, vendor_files
+
+
+class Command(BaseCommand):
+    help = ("face.html uchun MediaPipe fayllarini (courses/assets.py MEDIAPIPE dagi versiyalar) "
+            "static/vendor/mediapipe ga yuklab oladi. Bir marta bajariladi, fayllar repozitoriyga qo'shiladi.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help="Bor fayllarni ham qayta yuklash")
+        parser.add_argument('--timeout', type=float, default=60)
+
+    def handle(self, *args, **opts):
+        for path, url in vendor_files():
+            dest = VENDOR_ROOT / path
+            if dest.exists() and not opts['force']:
+                self.stdout.write(f"{path:<70} bor")
+                continue
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            tmp = f"{dest}.tmp"
+            try:
+                with urllib.request.urlopen(url, timeout=opts['timeout']) as response, open(tmp, 'wb') as out:
+                    size = 0
+                    for chunk in iter(lambda: response.read(1024 * 1024), b''):
+                        out.write(chunk)
+                        size += len(chunk)
+            except OSError as e:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                raise CommandError(f"{url}: {e}")
+            os.replace(tmp, dest)
+            self.stdout.write(f"{path:<70} {size / 1024:8.0f} KB")
+        self.stdout.write(self.style.SUCCESS("Tayyor. Endi: python manage.py collectstatic"))
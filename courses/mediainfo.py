@@ -0,0 +1,118 @@
+# courses/mediainfo.py — video davomiyligini serverda aniqlash
+#
+# Ko'rilganlik (courses/watchtime.py) faqat shu qiymatga tayanadi: klient
+# yuborgan duration ishlatilmaydi. MP4/MOV/M4V uchun `moov/mvhd` qutisi
+# to'g'ridan-to'g'ri o'qiladi (tashqi dastursiz, faylning bir necha
+# kilobayti); boshqa formatlar uchun ffprobe o'rnatilgan bo'lsa ishlatiladi.
+
+import shutil
+import struct
+import subprocess
+
+FFPROBE_TIMEOUT = 30
+MAX_DURATION = 24 * 3600
+
+
+def _boxes(f, end):
+    # (tur, ma'lumot boshi, quti oxiri) — f joriy quti boshida turadi
+    pos = f.tell()
+    while end is None or pos + 8 <= end:
+        header = f.read(8)
+        if len(header) < 8:
+            return
+        size, kind = struct.unpack('>I4s', header)
+        start = pos + 8
+        if size == 1:
+            large = f.read(8)
+            if len(large) < 8:
+                return
+            size = struct.unpack('>Q', large)[0]
+            start += 8
+        elif size == 0:
+            f.seek(0, 2)
+            size = f.tell() - pos
+        if size < start - pos:
+            return
+        yield kind, start, pos + size
+        pos += size
+        f.seek(pos)
+
+
+def mp4_duration(f):
+    """MP4 fayl obyektidan (seek qilinadigan) davomiylik soniyada yoki None."""
+    f.seek(0)
+    for kind, start, end in _boxes(f, None):
+        if kind != b'moov':
+            continue
+        f.seek(start)
+        for child, child_start, _ in _boxes(f, end):
+            if child != b'mvhd':
+                continue
+            f.seek(child_start)
+            version = f.read(4)[:1]
+            if version == b'\x01':
+                data = f.read(28)
+                if len(data) < 28:
+                    return None
+                timescale, duration = struct.unpack('>16xIQ', data)
+            else:
+                data = f.read(16)
+                if len(data) < 16:
+                    return None
+                timescale, duration = struct.unpack('>8xII', data)
+                if duration == 0xFFFFFFFF:
+                    return None
+            return duration / timescale if timescale and duration else None
+        return None
+    return None
+
+
+def ffprobe_duration(path):
+    if shutil.which('ffprobe') is None:
+        return None
+    try:
+        out = subprocess.run(
+            ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', '-of', 'default=nw=1:nk=1', path],
+            capture_output=True, text=True, timeout=FFPROBE_TIMEOUT, check=True,
+        ).stdout
+        return float(out.strip())
+    except (OSError, subprocess.SubprocessError, ValueError):
+        return None
+
+
+def _valid(duration):
+    return duration if duration is not None and 0 < duration < MAX_DURATION else None
+
+
+def probe_file(f):
+    """Ochiq fayl (masalan, hali saqlanmagan yuklama) — faqat MP4 o'qiladi."""
+    try:
+        return _valid(mp4_duration(f))
+    except (OSError, struct.error):
+        return None
+    finally:
+        f.seek(0)
+
+
+def probe_path(path):
+    """Diskdagi fayl: avval MP4 qutilari, bo'lmasa ffprobe. Aniqlanmasa None."""
+    try:
+        with open(path, 'rb') as f:
+            duration = _valid(mp4_duration(f))
+    except (OSError, struct.error):
+        duration = None
+    return duration if duration is not None else _valid(ffprobe_duration(path))
+
+
+def video_duration(video):
+    # Video.video_file dan (saqlanmagan yuklama yoki diskdagi fayl)
+    field = video.video_file
+    if not field:
+        return None
+    if not field._committed:
+        return probe_file(field.file)
+    try:
+        path = field.path
+    except NotImplementedError:
+        return None
+    return probe_path(path)
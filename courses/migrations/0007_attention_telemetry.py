@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0006_certificate'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttentionBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField()),
+                ('duration_ms', models.PositiveIntegerField(default=0)),
+                ('frames', models.PositiveIntegerField(default=0)),
+                ('present_frames', models.PositiveIntegerField(default=0)),
+                ('centered_frames', models.PositiveIntegerField(default=0)),
+                ('looking_frames', models.PositiveIntegerField(default=0)),
+                ('payload', models.BinaryField()),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('lesson', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attention_batches', to='courses.lesson')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attention_batches', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Diqqat paketi',
+                'verbose_name_plural': 'Diqqat paketlari',
+            },
+        ),
+        migrations.CreateModel(
+            name='LessonAttention',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('frames', models.PositiveIntegerField(default=0)),
+                ('present_frames', models.PositiveIntegerField(default=0)),
+                ('centered_frames', models.PositiveIntegerField(default=0)),
+                ('looking_frames', models.PositiveIntegerField(default=0)),
+                ('duration_ms', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('lesson', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attention', to='courses.lesson')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lesson_attention', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Dars diqqati',
+                'verbose_name_plural': 'Dars diqqati',
+                'unique_together': {('student', 'lesson')},
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:36
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def set_existing_status(apps, schema_editor):
+    # PDF fayli bor sertifikatlar — tayyor, qolganlari navbatga qo'yiladi
+    Certificate = apps.get_model('courses', 'Certificate')
+    CertificateJob = apps.get_model('courses', 'CertificateJob')
+    Certificate.objects.exclude(pdf_file='').exclude(pdf_file__isnull=True).update(status='ready')
+    CertificateJob.objects.bulk_create(
+        [CertificateJob(certificate_id=cid) for cid in
+         Certificate.objects.filter(status='pending').values_list('certificate_id', flat=True)],
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0007_attention_telemetry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certificate',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Navbatda'), ('generating', 'Tayyorlanmoqda'), ('ready', 'Tayyor'), ('failed', 'Xato')], default='pending', max_length=12, verbose_name='Holati'),
+        ),
+        migrations.CreateModel(
+            name='CertificateJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Navbatda'), ('generating', 'Tayyorlanmoqda'), ('ready', 'Tayyor'), ('failed', 'Xato')], db_index=True, default='pending', max_length=12)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now)),
+                ('locked_by', models.CharField(blank=True, max_length=64)),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('certificate', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='job', to='courses.certificate', to_field='certificate_id')),
+            ],
+            options={
+                'verbose_name': 'Sertifikat navbati',
+                'verbose_name_plural': 'Sertifikat navbati',
+            },
+        ),
+        migrations.RunPython(set_existing_status, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0008_certificate_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='test',
+            name='answers_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:43
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def backfill(apps, schema_editor):
+    StudentProgress = apps.get_model('courses', 'StudentProgress')
+    CourseCompletion = apps.get_model('courses', 'CourseCompletion')
+    rows = (
+        StudentProgress.objects.filter(test_passed=True, lesson__course__isnull=False)
+        .values('student_id', 'lesson__course_id')
+        .annotate(
+            passed=Count('id'),
+            total=Sum('test_score', filter=Q(test_score__gt=0), default=0.0),
+            scored=Count('id', filter=Q(test_score__gt=0)),
+        )
+        .order_by()
+    )
+    CourseCompletion.objects.bulk_create(
+        [CourseCompletion(student_id=r['student_id'], course_id=r['lesson__course_id'], lessons_passed=r['passed'],
+                          score_sum=r['total'], scored_count=r['scored']) for r in rows],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0009_test_answers_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseCompletion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('lessons_passed', models.PositiveIntegerField(default=0)),
+                ('score_sum', models.FloatField(default=0)),
+                ('scored_count', models.PositiveIntegerField(default=0)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='completions', to='courses.course')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='course_completions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Kurs yakuni',
+                'verbose_name_plural': 'Kurs yakunlari',
+                'unique_together': {('student', 'course')},
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,72 @@
+from collections import defaultdict
+
+from django.db import migrations, models
+
+
+def _video_order(Video):
+    order = defaultdict(list)
+    for lesson_id, video_id in Video.objects.order_by('lesson_id', 'order', 'id').values_list('lesson_id', 'id'):
+        order[lesson_id].append(video_id)
+    return order
+
+
+def watched_videos_to_count(apps, schema_editor):
+    # M2M qatorlaridan boshidan ketma-ket ko'rilgan videolar soni
+    Video = apps.get_model('courses', 'Video')
+    StudentProgress = apps.get_model('courses', 'StudentProgress')
+    Through = StudentProgress.watched_videos.through
+
+    order = _video_order(Video)
+    watched = defaultdict(set)
+    for progress_id, video_id in Through.objects.values_list('studentprogress_id', 'video_id').iterator():
+        watched[progress_id].add(video_id)
+
+    batch = []
+    for progress in StudentProgress.objects.filter(id__in=list(watched)).only('id', 'lesson_id').iterator():
+        count = 0
+        for video_id in order.get(progress.lesson_id, []):
+            if video_id not in watched[progress.id]:
+                break
+            count += 1
+        progress.watched_count = count
+        batch.append(progress)
+    StudentProgress.objects.bulk_update(batch, ['watched_count'], batch_size=1000)
+
+
+def count_to_watched_videos(apps, schema_editor):
+    Video = apps.get_model('courses', 'Video')
+    StudentProgress = apps.get_model('courses', 'StudentProgress')
+    Through = StudentProgress.watched_videos.through
+
+    order = _video_order(Video)
+    rows = [
+        Through(studentprogress_id=progress_id, video_id=video_id)
+        for progress_id, lesson_id, count in
+        StudentProgress.objects.filter(watched_count__gt=0).values_list('id', 'lesson_id', 'watched_count').iterator()
+        for video_id in order.get(lesson_id, [])[:count]
+    ]
+    Through.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0010_course_completion'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='video',
+            options={'ordering': ['order', 'id']},
+        ),
+        migrations.AddField(
+            model_name='studentprogress',
+            name='watched_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(watched_videos_to_count, count_to_watched_videos),
+        migrations.RemoveField(
+            model_name='studentprogress',
+            name='watched_videos',
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:45
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0011_watched_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='duration',
+            field=models.FloatField(blank=True, null=True, verbose_name='Davomiyligi (s)'),
+        ),
+        migrations.CreateModel(
+            name='VideoWatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('intervals', models.BinaryField(default=b'')),
+                ('duration', models.FloatField(default=0)),
+                ('watched_seconds', models.FloatField(default=0)),
+                ('completed', models.BooleanField(default=False)),
+                ('started_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='video_watches', to=settings.AUTH_USER_MODEL)),
+                ('video', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='watches', to='courses.video')),
+            ],
+            options={
+                'verbose_name': 'Video tomoshasi',
+                'verbose_name_plural': 'Video tomoshalari',
+                'unique_together': {('student', 'video')},
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0016_face_attendance'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LessonStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('students', models.PositiveIntegerField(default=0)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('passed', models.PositiveIntegerField(default=0)),
+                ('attended', models.PositiveIntegerField(default=0)),
+                ('score_sum', models.FloatField(default=0)),
+                ('score_buckets', models.JSONField(default=list)),
+                ('funnel', models.JSONField(default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lesson_stats', to='courses.course')),
+                ('lesson', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='group_stats', to='courses.lesson')),
+            ],
+            options={
+                'verbose_name': 'Dars statistikasi',
+                'verbose_name_plural': 'Dars statistikasi',
+                'unique_together': {('group', 'lesson')},
+            },
+        ),
+    ]
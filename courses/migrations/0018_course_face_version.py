@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0017_lesson_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='face_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
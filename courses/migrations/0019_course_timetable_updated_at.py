@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:31
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0018_course_face_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='timetable_updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
@@ -1,9 +1,14 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 class Course(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True)
+    # Guruh yuz indeksi versiyasi (courses/facematch.py) — ro'yxatga olish o'zgarganda oshiriladi
+    face_version = models.PositiveIntegerField(default=0, editable=False)
+    # Dars jadvali versiyasi va Last-Modified (courses/timetable.py) — Schedule/Lesson/Course signallari yangilaydi
+    timetable_updated_at = models.DateTimeField(default=timezone.now, editable=False)
     def __str__(self):
         return self.title
 
@@ -15,6 +20,14 @@ class Lesson(models.Model):
     start_time = models.TimeField(null=True, blank=True)
     order = models.PositiveIntegerField(default=0)
     file = models.FileField(upload_to='lessons/', null=True, blank=True)
+    # Dars/video o'zgarganda oshiriladi — HTML qismlari keshi shu versiya bilan (courses/fragments.py)
+    content_version = models.PositiveIntegerField(default=0, editable=False)
+    class Meta:
+        indexes = [
+            # dashboard: bugungi darslar start_time bo'yicha
+            models.Index(fields=['date', 'start_time'], name='lesson_date_start_idx'),
+            models.Index(fields=['course', 'order'], name='lesson_course_order_idx'),
+        ]
     def __str__(self):
         return self.title
 
@@ -23,14 +36,19 @@ class Video(models.Model):
     title = models.CharField(max_length=200)
     video_file = models.FileField(upload_to='videos/')
     order = models.PositiveIntegerField(default=0)
+    # Serverda aniqlanadi (courses/mediainfo.py); noma'lum bo'lsa video tugallangan deb belgilanmaydi
+    duration = models.FloatField(null=True, blank=True, verbose_name="Davomiyligi (s)")
     class Meta:
-        ordering = ['order']
+        ordering = ['order', 'id']
+        indexes = [models.Index(fields=['lesson', 'order'], name='video_lesson_order_idx')]
     def __str__(self):
         return f"{self.lesson.title} - {self.title}"
 
 class Test(models.Model):
     lesson = models.OneToOneField(Lesson, on_delete=models.CASCADE, related_name='test', null=True, blank=True)
     title = models.CharField(max_length=200)
+    # Savol/javob o'zgarganda oshiriladi — javoblar kaliti keshi shu versiya bilan
+    answers_version = models.PositiveIntegerField(default=0, editable=False)
     def __str__(self):
         return self.title
 
@@ -50,14 +68,30 @@ class Choice(models.Model):
 class StudentProgress(models.Model):
     student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='progress')
     lesson = models.ForeignKey(Lesson, on_delete=models.CASCADE, related_name='progress')
-    watched_videos = models.ManyToManyField(Video, blank=True)
+    # Videolar qat'iy ketma-ket ochiladi: dars videolaridan (order, id) bo'yicha
+    # nechtasi boshidan ketma-ket ko'rilgan. i-video ko'rilgan <=> i < watched_count,
+    # ochiq <=> i <= watched_count
+    watched_count = models.PositiveIntegerField(default=0)
     test_passed = models.BooleanField(default=False)
     test_score = models.FloatField(null=True, blank=True)  # YANGI
+    # Dars o'zlashtirildi (test o'tilgan yoki admin belgilagan) — dashboard nishoni va LessonStats.attended
+    # shundan. Jadval bo'yicha kelganlik (yuz/kiosk) — Attendance jadvalida; eksport davomati ikkalasidan
     attended = models.BooleanField(default=False)
 
     class Meta:
         unique_together = ('student', 'lesson')
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        # Yuklangan test natijasini eslab qolamiz — CourseCompletion uchun farq (delta) hisoblanadi
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_result = (instance.__dict__.get('test_passed'), instance.__dict__.get('test_score'))
+        # Guruh analitikasi uchun (courses/analytics.py)
+        instance._loaded_stats = tuple(
+            instance.__dict__.get(name) for name in ('watched_count', 'test_passed', 'test_score', 'attended')
+        )
+        return instance
+
 # models.py (oldingi modellardan keyin qo'shing)
 
 from django.db import models
@@ -72,6 +106,8 @@ class Profile(models.Model):
     phone = models.CharField(max_length=20, blank=True, null=True, verbose_name="Telefon")
     bio = models.TextField(blank=True, verbose_name="O'zim haqimda")
     avatar = models.ImageField(upload_to='avatars/', blank=True, null=True, verbose_name="Rasm")
+    # Kichraytirilgan nusxalar nomi (courses/avatars.py): avatars/thumbs/<hash>-<o'lcham>.webp|jpg
+    avatar_hash = models.CharField(max_length=16, blank=True, editable=False)
     birth_date = models.DateField(null=True, blank=True, verbose_name="Tug'ilgan sana")
     group = models.ForeignKey(Course, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="Guruh")
     registered_at = models.DateTimeField(default=timezone.now, verbose_name="Ro'yxatdan o'tgan vaqti")
@@ -82,6 +118,8 @@ class Profile(models.Model):
     class Meta:
         verbose_name = "Foydalanuvchi profili"
         verbose_name_plural = "Foydalanuvchi profillari"
+        # Guruh talabalari ro'yxati jadvalga murojaatsiz (qoplovchi indeks)
+        indexes = [models.Index(fields=['group', 'user'], name='profile_group_user_idx')]
 
 
 # Avtomatik profil yaratish
@@ -118,6 +156,7 @@ class Schedule(models.Model):
     class Meta:
         unique_together = ('group', 'lesson', 'day_of_week', 'start_time')
         ordering = ['day_of_week', 'start_time']
+        indexes = [models.Index(fields=['group', 'start_time'], name='schedule_group_start_idx')]
 
     def __str__(self):
         return f"{self.group.title} - {self.lesson.title} ({self.get_day_of_week_display()})"
@@ -127,6 +166,18 @@ class Schedule(models.Model):
 from django.utils import timezone
 import uuid
 
+# PDF holati: navbatda -> tayyorlanmoqda -> tayyor / xato
+STATUS_PENDING = 'pending'
+STATUS_GENERATING = 'generating'
+STATUS_READY = 'ready'
+STATUS_FAILED = 'failed'
+CERTIFICATE_STATUSES = [
+    (STATUS_PENDING, 'Navbatda'),
+    (STATUS_GENERATING, 'Tayyorlanmoqda'),
+    (STATUS_READY, 'Tayyor'),
+    (STATUS_FAILED, 'Xato'),
+]
+
 class Certificate(models.Model):
     student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='certificates')
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='certificates')
@@ -134,6 +185,7 @@ class Certificate(models.Model):
     issued_at = models.DateTimeField(default=timezone.now)
     certificate_id = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
     pdf_file = models.FileField(upload_to='certificates/', null=True, blank=True)
+    status = models.CharField(max_length=12, choices=CERTIFICATE_STATUSES, default=STATUS_PENDING, verbose_name="Holati")
 
     class Meta:
         unique_together = ('student', 'course')
@@ -146,4 +198,217 @@ class Certificate(models.Model):
     def get_verification_url(self):
         # Sertifikatni tekshirish uchun maxsus URL
         from django.urls import reverse
-        return f"https://phoenix-rapid-factually.ngrok-free.app{reverse('verify_certificate', kwargs={'uuid': self.certificate_id})}"
\ No newline at end of file
+        return f"https://phoenix-rapid-factually.ngrok-free.app{reverse('verify_certificate', kwargs={'uuid': self.certificate_id})}"
+
+    @property
+    def is_ready(self):
+        return self.status == STATUS_READY and bool(self.pdf_file)
+
+
+class CertificateJob(models.Model):
+    # PDF yaratish navbati (tashqi broker yo'q). certificate_id bo'yicha bitta ish — idempotent
+    certificate = models.OneToOneField(Certificate, on_delete=models.CASCADE, to_field='certificate_id', related_name='job')
+    status = models.CharField(max_length=12, choices=CERTIFICATE_STATUSES, default=STATUS_PENDING, db_index=True)
+    attempts = models.PositiveIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=64, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Sertifikat navbati"
+        verbose_name_plural = "Sertifikat navbati"
+        indexes = [models.Index(fields=['status', 'run_after'], name='certjob_status_run_after_idx')]
+
+    def __str__(self):
+        return f"{self.certificate_id} ({self.status}, {self.attempts})"
+
+
+# models.py (oxiriga qo'shing) — /face/ sahifasidan keladigan diqqat telemetriyasi
+
+class AttentionBatch(models.Model):
+    # Faqat qo'shiladi (append-only): har bir flush — bitta qator, har kadr emas
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='attention_batches')
+    lesson = models.ForeignKey(Lesson, on_delete=models.CASCADE, related_name='attention_batches')
+    started_at = models.DateTimeField()
+    duration_ms = models.PositiveIntegerField(default=0)
+    frames = models.PositiveIntegerField(default=0)
+    present_frames = models.PositiveIntegerField(default=0)
+    centered_frames = models.PositiveIntegerField(default=0)
+    looking_frames = models.PositiveIntegerField(default=0)
+    payload = models.BinaryField()  # siqilgan kadrlar (courses/telemetry.py formati)
+    received_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Diqqat paketi"
+        verbose_name_plural = "Diqqat paketlari"
+
+
+class LessonAttention(models.Model):
+    # Dars bo'yicha yig'ma (rollup) — har paketda F() bilan oshiriladi
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='lesson_attention')
+    lesson = models.ForeignKey(Lesson, on_delete=models.CASCADE, related_name='attention')
+    frames = models.PositiveIntegerField(default=0)
+    present_frames = models.PositiveIntegerField(default=0)
+    centered_frames = models.PositiveIntegerField(default=0)
+    looking_frames = models.PositiveIntegerField(default=0)
+    duration_ms = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('student', 'lesson')
+        verbose_name = "Dars diqqati"
+        verbose_name_plural = "Dars diqqati"
+
+    def __str__(self):
+        return f"{self.student.username} - {self.lesson.title}: {self.attention_ratio:.0%}"
+
+    @property
+    def attention_ratio(self):
+        # Markazda va ekranga qaragan kadrlar ulushi
+        return self.looking_frames / self.frames if self.frames else 0.0
+
+    @property
+    def presence_ratio(self):
+        return self.present_frames / self.frames if self.frames else 0.0
+
+
+# models.py (oxiriga qo'shing) — sertifikat uchun kurs bo'yicha hisoblagichlar
+
+class CourseCompletion(models.Model):
+    # StudentProgress o'zgarganda F() bilan yangilanadi (courses/completion.py)
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='course_completions')
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='completions')
+    lessons_passed = models.PositiveIntegerField(default=0)
+    score_sum = models.FloatField(default=0)
+    scored_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('student', 'course')
+        verbose_name = "Kurs yakuni"
+        verbose_name_plural = "Kurs yakunlari"
+
+    def __str__(self):
+        return f"{self.student.username} - {self.course.title}: {self.lessons_passed}"
+
+    @property
+    def average_score(self):
+        return round(self.score_sum / self.scored_count, 1) if self.scored_count else None
+
+
+# models.py (oxiriga qo'shing) — video qaysi qismlari ko'rilgani (heartbeat)
+
+class VideoWatch(models.Model):
+    # Ko'rilgan vaqt oraliqlari (courses/watchtime.py: tartiblangan, kesishmaydigan float32 juftliklar)
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='video_watches')
+    video = models.ForeignKey(Video, on_delete=models.CASCADE, related_name='watches')
+    intervals = models.BinaryField(default=b'')
+    duration = models.FloatField(default=0)
+    watched_seconds = models.FloatField(default=0)
+    completed = models.BooleanField(default=False)
+    started_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = ('student', 'video')
+        verbose_name = "Video tomoshasi"
+        verbose_name_plural = "Video tomoshalari"
+
+    def __str__(self):
+        return f"{self.student.username} - {self.video.title}: {self.watched_seconds:.0f}/{self.duration:.0f}s"
+
+
+# models.py (oxiriga qo'shing) — admin uchun bo'laklab, davom ettiriladigan yuklash (courses/uploads.py)
+
+UPLOAD_TARGETS = (
+    ('video', 'Video fayli'),
+    ('lesson', 'Dars fayli'),
+)
+
+
+class UploadSession(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='upload_sessions')
+    target = models.CharField(max_length=10, choices=UPLOAD_TARGETS)
+    filename = models.CharField(max_length=255)
+    # MEDIA_ROOT ga nisbatan yakuniy nom — baytlar to'g'ridan-to'g'ri shu faylga yoziladi
+    name = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    offset = models.PositiveBigIntegerField(default=0)
+    # Qabul qilingan [0, offset) baytlarning CRC32 i (har bo'lakda davom ettiriladi)
+    crc32 = models.PositiveBigIntegerField(default=0)
+    completed = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Yuklash sessiyasi"
+        verbose_name_plural = "Yuklash sessiyalari"
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size})"
+
+
+# models.py (oxiriga qo'shing) — yuz bo'yicha davomat (courses/faces.py, courses/facematch.py)
+
+class FaceEnrollment(models.Model):
+    student = models.OneToOneField(User, on_delete=models.CASCADE, related_name='face_enrollment')
+    # float32, L2 normallangan deskriptor (faces.DIM ta son)
+    descriptor = models.BinaryField()
+    frames = models.PositiveIntegerField(default=0)
+    consistency = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Yuz namunasi"
+        verbose_name_plural = "Yuz namunalari"
+
+    def __str__(self):
+        return f"{self.student.username} ({self.frames} kadr, {self.consistency:.3f})"
+
+
+class Attendance(models.Model):
+    # Jadval (Schedule) bo'yicha ma'lum sanada kelganlik: yuz orqali check-in, kiosk yoki
+    # admin "Bugungi davomat" amali. StudentProgress.attended ga tegmaydi
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='attendances')
+    schedule = models.ForeignKey(Schedule, on_delete=models.CASCADE, related_name='attendances')
+    date = models.DateField()
+    similarity = models.FloatField()
+    checked_in_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = ('schedule', 'date', 'student')
+        verbose_name = "Davomat"
+        verbose_name_plural = "Davomat"
+
+    def __str__(self):
+        return f"{self.student.username} - {self.schedule} {self.date}"
+
+
+# models.py (oxiriga qo'shing) — o'qituvchi uchun guruh analitikasi (courses/analytics.py)
+
+class LessonStats(models.Model):
+    # Guruh (talabaning Profile.group) × dars bo'yicha tayyor yig'indilar; StudentProgress o'zgarganda yangilanadi
+    group = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='lesson_stats')
+    lesson = models.ForeignKey(Lesson, on_delete=models.CASCADE, related_name='group_stats')
+    # Darsni boshlagan (video/test/davomat bo'yicha biror natijasi bor) talabalar
+    students = models.PositiveIntegerField(default=0)
+    attempts = models.PositiveIntegerField(default=0)
+    passed = models.PositiveIntegerField(default=0)
+    attended = models.PositiveIntegerField(default=0)
+    score_sum = models.FloatField(default=0)
+    # score_buckets[b] — bali [b, b+1) oralig'idagi talabalar (0..100, 101 ta)
+    score_buckets = models.JSONField(default=list)
+    # funnel[k] — aynan k ta video ko'rgan talabalar
+    funnel = models.JSONField(default=list)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('group', 'lesson')
+        verbose_name = "Dars statistikasi"
+        verbose_name_plural = "Dars statistikasi"
+
+    def __str__(self):
+        return f"{self.group.title} - {self.lesson.title}: {self.passed}/{self.students}"
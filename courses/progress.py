@@ -0,0 +1,113 @@
+# courses/progress.py — StudentProgress qatorlarini to'plam bilan olish/yaratish
+
+from django.db.models import F, Q
+
+from . import analytics, completion
+from .models import StudentProgress
+
+
+def progress_for_lessons(student, lessons):
+    """
+    Talaba va darslar to'plami uchun {lesson_id: StudentProgress} qaytaradi.
+    Darslar soniga bog'liq bo'lmagan o'zgarmas miqdordagi so'rov:
+    bitta SELECT, yetishmaganlar uchun bitta INSERT ... ON CONFLICT DO NOTHING
+    va ularni qayta o'qish.
+    """
+    lesson_ids = [getattr(lesson, 'id', lesson) for lesson in lessons]
+    if not lesson_ids:
+        return {}
+
+    student_id = getattr(student, 'id', student)
+    qs = StudentProgress.objects.filter(student_id=student_id)
+    progress_map = {p.lesson_id: p for p in qs.filter(lesson_id__in=lesson_ids)}
+
+    missing = [lid for lid in lesson_ids if lid not in progress_map]
+    if missing:
+        StudentProgress.objects.bulk_create(
+            [StudentProgress(student_id=student_id, lesson_id=lid) for lid in missing],
+            ignore_conflicts=True,
+        )
+        # ignore_conflicts id qaytarmaydi — parallel so'rov yaratgan bo'lishi ham mumkin
+        for p in qs.filter(lesson_id__in=missing):
+            progress_map[p.lesson_id] = p
+    return progress_map
+
+
+def get_progress(student, lesson):
+    # student/lesson — obyekt yoki id
+    return progress_for_lessons(student, [lesson])[getattr(lesson, 'id', lesson)]
+
+
+def video_states(videos, count):
+    """
+    Tartiblangan videolar ro'yxati bo'yicha (watched_ids, unlocked, can_take_test) —
+    join-jadvalsiz, faqat watched_count dan.
+    """
+    watched_ids = [v.id for v in videos[:count]]
+    unlocked = [v.id for v in videos[:count + 1]]
+    return watched_ids, unlocked, count >= len(videos)
+
+
+def video_position(video):
+    # Video dars ichida (order, id) bo'yicha nechanchi (0 dan)
+    return video.lesson.videos.filter(
+        Q(order__lt=video.order) | Q(order=video.order, id__lt=video.id)
+    ).count()
+
+
+def mark_watched(progress, position):
+    """
+    Faqat navbatdagi (position == watched_count) video belgilanadi — shartli
+    UPDATE, parallel so'rovlar ikki marta oshirmaydi. Qaytaradi: video endi
+    ko'rilganmi (ilgari ko'rilgan bo'lsa ham True).
+    """
+    if position < progress.watched_count:
+        return True
+    if position > progress.watched_count:
+        return False
+    updated = StudentProgress.objects.filter(pk=progress.pk, watched_count=position).update(
+        watched_count=F('watched_count') + 1
+    )
+    if updated:
+        analytics.watched_changed(progress, position, position + 1)
+        progress.watched_count = position + 1
+        return True
+    progress.refresh_from_db(fields=['watched_count'])
+    return position < progress.watched_count
+
+
+def _scope(queryset):
+    # To'plamli UPDATE dan keyin qayta hisoblanadigan guruh/dars/kurs id lari (qatorlar yuklanmaydi)
+    rows = queryset.order_by().values_list('student__profile__group_id', 'lesson_id', 'lesson__course_id').distinct()
+    groups, lessons, courses = set(), set(), set()
+    for group_id, lesson_id, course_id in rows:
+        groups.add(group_id)
+        lessons.add(lesson_id)
+        courses.add(course_id)
+    return groups - {None}, lessons, courses - {None}
+
+
+def reset_tests(queryset):
+    """
+    Tanlangan qatorlarda faqat test natijasini bekor qiladi (qayta topshirish
+    mumkin; attended o'zgarmaydi) — bitta UPDATE. .update() signal yubormaydi,
+    shuning uchun CourseCompletion va LessonStats tegishli kurs/guruhlar bo'yicha qayta quriladi.
+    """
+    groups, lessons, courses = _scope(queryset)
+    updated = queryset.update(test_passed=False, test_score=None)
+    if courses:
+        completion.rebuild(course_ids=courses)
+    if groups:
+        analytics.rebuild(group_ids=groups, lesson_ids=lessons)
+    return updated
+
+
+def mark_attended(queryset):
+    # Darsda qatnashgan deb belgilash — bitta UPDATE (StudentProgress.attended; jadval bo'yicha
+    # kelganlik — Attendance, facematch.mark_present). Davomat faqat LessonStats ga ta'sir qiladi
+    queryset = queryset.filter(attended=False)
+    groups, lessons, _ = _scope(queryset)
+    updated = queryset.update(attended=True)
+    if groups:
+        analytics.rebuild(group_ids=groups, lesson_ids=lessons)
+    return updated
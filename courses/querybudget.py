@@ -0,0 +1,203 @@
+# courses/querybudget.py — so'rov byudjeti: SQL soni/vaqti, takroriy so'rovlar va shablon vaqti
+#
+# QueryRecorder bitta blok ichidagi barcha SQL so'rovlarni (connection.execute_wrapper)
+# va shablon chizish vaqtini yig'adi. QueryBudgetMiddleware uni har so'rovga
+# qo'llaydi: natija Server-Timing sarlavhasida va bitta JSON log qatorida.
+# Byudjetlar courses/urls.py dagi QUERY_BUDGETS da URL nomi bo'yicha beriladi;
+# `check_query_budgets` buyrug'i va testlar (QueryBudgetMixin.assertQueryBudget)
+# ularni tekshiradi — javob kodi ham, aks holda 404/202 yo'li o'lchanib qoladi.
+
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.template.backends.django import Template as _BackendTemplate
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+_IN_LIST = re.compile(r'\(\s*%s(?:\s*,\s*%s)*\s*\)')
+_NUMBER = re.compile(r'\b\d+\b')
+_SPACES = re.compile(r'\s+')
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def fingerprint(sql):
+    # Parametrlar allaqachon %s; IN (...) ro'yxati va sonli literallar umumlashtiriladi
+    sql = _SPACES.sub(' ', sql).strip()
+    sql = _IN_LIST.sub('(...)', sql)
+    return _NUMBER.sub('?', sql)
+
+
+class QueryRecorder:
+    """
+    with QueryRecorder() as rec: ...
+    rec.count, rec.sql_ms, rec.template_ms, rec.duplicates() — barcha ulanishlar bo'yicha.
+    """
+
+    def __init__(self):
+        self.queries = []  # (fingerprint, ms)
+        self.template_ms = 0.0
+        self._stack = None
+
+    def _wrapper(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((fingerprint(sql), (time.perf_counter() - start) * 1000))
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for alias in connections:
+            self._stack.enter_context(connections[alias].execute_wrapper(self._wrapper))
+        recorders = getattr(_local, 'recorders', None)
+        if recorders is None:
+            recorders = _local.recorders = []
+        recorders.append(self)
+        return self
+
+    def __exit__(self, *exc):
+        _local.recorders.remove(self)
+        self._stack.close()
+        return False
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def sql_ms(self):
+        return sum(ms for _, ms in self.queries)
+
+    def duplicates(self):
+        # {qisqa xesh: (takrorlar soni, fingerprint)} — faqat bir martadan ko'p bajarilganlar
+        counts = Counter(fp for fp, _ in self.queries)
+        return {
+            hashlib.sha1(fp.encode()).hexdigest()[:8]: (n, fp)
+            for fp, n in counts.most_common() if n > 1
+        }
+
+
+def _instrument_templates():
+    # Yuqori darajadagi render (render()/render_to_string) vaqtini faol yozuvchilarga qo'shadi
+    if getattr(_BackendTemplate.render, '_query_budget', False):
+        return
+    original = _BackendTemplate.render
+
+    def render(self, context=None, request=None):
+        recorders = getattr(_local, 'recorders', None)
+        if not recorders:
+            return original(self, context, request)
+        start = time.perf_counter()
+        try:
+            return original(self, context, request)
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            for recorder in recorders:
+                recorder.template_ms += elapsed
+
+    render._query_budget = True
+    _BackendTemplate.render = render
+
+
+def query_budgets():
+    from .urls import QUERY_BUDGETS, app_name
+    return {f"{app_name}:{name}": budget for name, budget in QUERY_BUDGETS.items()}
+
+
+def budget_for(match):
+    if match is None:
+        return None
+    return query_budgets().get(match.view_name)
+
+
+def server_timing(recorder, total_ms):
+    return ', '.join([
+        f'db;dur={recorder.sql_ms:.1f};desc="{recorder.count} queries"',
+        f'dup;desc="{sum(n - 1 for n, _ in recorder.duplicates().values())} repeated"',
+        f'tpl;dur={recorder.template_ms:.1f}',
+        f'total;dur={total_ms:.1f}',
+    ])
+
+
+class QueryBudgetMiddleware:
+    # Byudjetdan oshsa WARNING; QUERY_BUDGET_STRICT=True bo'lsa xato ko'tariladi
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.strict = getattr(settings, 'QUERY_BUDGET_STRICT', False)
+        _instrument_templates()
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        with QueryRecorder() as recorder:
+            response = self.get_response(request)
+        total_ms = (time.perf_counter() - start) * 1000
+
+        match = getattr(request, 'resolver_match', None)
+        budget = budget_for(match)
+        duplicates = recorder.duplicates()
+        response['Server-Timing'] = server_timing(recorder, total_ms)
+
+        over = budget is not None and recorder.count > budget
+        logger.log(logging.WARNING if over else logging.INFO, json.dumps({
+            'view': match.view_name if match else None,
+            'method': request.method,
+            'status': response.status_code,
+            'queries': recorder.count,
+            'budget': budget,
+            'sql_ms': round(recorder.sql_ms, 1),
+            'template_ms': round(recorder.template_ms, 1),
+            'total_ms': round(total_ms, 1),
+            'duplicates': {key: n for key, (n, _) in duplicates.items()},
+        }))
+        if over and self.strict:
+            raise QueryBudgetExceeded(
+                f"{match.view_name}: {recorder.count} so'rov (byudjet {budget})"
+            )
+        return response
+
+
+def assert_query_budget(url_name, call, status=200):
+    """
+    Test yordamchisi: call() ni yozib oladi; javob kodi `status` emas bo'lsa
+    AssertionError, QUERY_BUDGETS dagi byudjetdan oshsa QueryBudgetExceeded
+    ko'taradi. (javob, recorder) qaytaradi.
+    """
+    budget = query_budgets()[url_name]
+    _instrument_templates()
+    with QueryRecorder() as recorder:
+        response = call()
+    if status is not None and response.status_code != status:
+        raise AssertionError(f"{url_name}: javob {response.status_code} (kutilgan {status})")
+    if recorder.count > budget:
+        repeated = '\n'.join(
+            f"  {n}x {fp[:160]}" for n, fp in recorder.duplicates().values()
+        )
+        raise QueryBudgetExceeded(
+            f"{url_name}: {recorder.count} so'rov (byudjet {budget})" + (f"\n{repeated}" if repeated else '')
+        )
+    return response, recorder
+
+
+class QueryBudgetMixin:
+    """
+    TestCase uchun: self.assertQueryBudget('courses:dashboard', lambda: self.client.get(url)).
+    Byudjet QUERY_BUDGETS dan; (javob, recorder) qaytaradi.
+    """
+
+    def assertQueryBudget(self, url_name, call, status=200):
+        try:
+            return assert_query_budget(url_name, call, status)
+        except AssertionError as e:
+            raise self.failureException(str(e)) from None
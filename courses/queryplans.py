@@ -0,0 +1,115 @@
+# courses/queryplans.py — "issiq" so'rovlar ro'yxati va ularning EXPLAIN rejasini tekshirish
+#
+# Har so'rov kutilgan indeks nomi (yoki uning boshlanishi) bilan ro'yxatga
+# olinadi. `check_query_plans` buyrug'i SQLite ning EXPLAIN QUERY PLAN
+# natijasini o'qiydi: jadval to'liq skanerlansa, boshqa indeks tanlansa
+# yoki ORDER BY uchun vaqtinchalik B-tree kerak bo'lsa — xato.
+
+from collections import namedtuple
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import (
+    Certificate, CertificateJob, CourseCompletion, Lesson, Profile, Schedule, StudentProgress, Video, VideoWatch,
+    STATUS_GENERATING, STATUS_PENDING,
+)
+
+HotQuery = namedtuple('HotQuery', 'name build index sorted')
+
+HOT_QUERIES = []
+# Bundan kichik jadvalda SQLite (ANALYZE dan keyin) skanerlashni to'g'ri tanlaydi
+SMALL_TABLE_ROWS = 1000
+
+
+def hot_query(name, index, sorted=False):
+    # index — indeks nomi yoki prefiksi (unique_together nomlari xesh bilan tugaydi)
+    def register(build):
+        HOT_QUERIES.append(HotQuery(name, build, index, sorted))
+        return build
+    return register
+
+
+@hot_query('progress_for_lessons', 'courses_studentprogress_student_id_lesson_id')
+def _progress(ids):
+    return StudentProgress.objects.filter(student_id=ids['user'], lesson_id__in=ids['lessons'])
+
+
+@hot_query('dashboard_lessons', 'lesson_date_start_idx', sorted=True)
+def _dashboard(ids):
+    return Lesson.objects.filter(date=timezone.localdate()).order_by('start_time')
+
+
+@hot_query('course_lessons', 'lesson_course_order_idx', sorted=True)
+def _course_lessons(ids):
+    return Lesson.objects.filter(course_id=ids['course']).order_by('order')
+
+
+@hot_query('lesson_videos', 'video_lesson_order_idx', sorted=True)
+def _videos(ids):
+    return Video.objects.filter(lesson_id=ids['lesson'])
+
+
+@hot_query('group_timetable', 'schedule_group_start_idx', sorted=True)
+def _timetable(ids):
+    return Schedule.objects.filter(group_id=ids['course']).order_by('start_time', 'id')
+
+
+@hot_query('group_students', 'profile_group_user_idx')
+def _group_students(ids):
+    return Profile.objects.filter(group_id=ids['course']).values_list('user_id', flat=True)
+
+
+@hot_query('student_certificates', 'courses_certificate_student_id')
+def _certificates(ids):
+    return Certificate.objects.filter(student_id=ids['user'])
+
+
+@hot_query('course_completion', 'courses_coursecompletion_student_id_course_id')
+def _completion(ids):
+    return CourseCompletion.objects.filter(student_id=ids['user'], course_id=ids['course'])
+
+
+@hot_query('completed_videos', 'courses_videowatch_student_id')
+def _watched(ids):
+    return VideoWatch.objects.filter(student_id=ids['user'], video__lesson_id=ids['lesson'], completed=True)
+
+
+@hot_query('certificate_job_claim', 'certjob_status_run_after_idx')
+def _claim(ids):
+    now = timezone.now()
+    return CertificateJob.objects.filter(
+        Q(status=STATUS_PENDING, run_after__lte=now) | Q(status=STATUS_GENERATING, locked_at__lt=now)
+    ).order_by('run_after').values_list('id', flat=True)
+
+
+def sample_ids():
+    # Rejalar parametr qiymatiga bog'liq emas, lekin mavjud qiymatlar bilan o'lchash aniqroq
+    progress = StudentProgress.objects.select_related('lesson').order_by('-id').first()
+    if progress is None:
+        return {'user': 1, 'lesson': 1, 'lessons': [1, 2, 3], 'course': 1}
+    lessons = list(
+        Lesson.objects.filter(course_id=progress.lesson.course_id).values_list('id', flat=True)[:10]
+    ) or [progress.lesson_id]
+    return {
+        'user': progress.student_id,
+        'lesson': progress.lesson_id,
+        'lessons': lessons,
+        'course': progress.lesson.course_id or 1,
+    }
+
+
+def check_plan(query, plan):
+    """
+    SQLite EXPLAIN QUERY PLAN matnini tekshiradi; muammolar ro'yxatini qaytaradi.
+    """
+    problems = []
+    lines = [line.split(' ', 3)[-1] if line[:1].isdigit() else line for line in plan.splitlines()]
+    if not any(query.index in line for line in lines):
+        problems.append(f"{query.index} indeksi ishlatilmadi")
+    for line in lines:
+        if line.startswith('SCAN ') and 'USING' not in line:
+            problems.append(f"to'liq skanerlash: {line}")
+    if query.sorted and any('TEMP B-TREE FOR ORDER BY' in line for line in lines):
+        problems.append("ORDER BY uchun vaqtinchalik B-tree")
+    return problems
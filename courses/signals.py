@@ -0,0 +1,171 @@
+# courses/signals.py — keshlarni bekor qilish va hisoblagichlarni yangilash
+
+from django.db.models.signals import post_init, pre_save, post_save, post_delete
+from django.dispatch import receiver
+from PIL import Image
+
+from . import analytics, avatars, completion, facematch, faces, fragments, mediainfo, timetable, verification
+from .models import (
+    Certificate, Course, FaceEnrollment, Lesson, Profile, Question, Choice, Schedule, StudentProgress, Test, Video,
+)
+from .answer_keys import bump_answers_version, bump_for_question
+
+
+@receiver(pre_save, sender=Test)
+def test_keep_answers_version(sender, instance, **kwargs):
+    # Admin formasi eski nusxani saqlasa ham versiya orqaga qaytmasin — aks holda eski javoblar kaliti qaytadi
+    if instance.pk:
+        instance.answers_version = (
+            Test.objects.filter(pk=instance.pk).values_list('answers_version', flat=True).first()
+            or instance.answers_version
+        )
+
+
+@receiver([post_save, post_delete], sender=Question)
+def question_changed(sender, instance, **kwargs):
+    bump_answers_version(instance.test_id)
+
+
+@receiver([post_save, post_delete], sender=Choice)
+def choice_changed(sender, instance, **kwargs):
+    bump_for_question(instance.question_id)
+
+
+@receiver(post_save, sender=StudentProgress)
+def progress_saved(sender, instance, created, **kwargs):
+    completion.progress_saved(instance, created)
+    analytics.progress_saved(instance, created)
+
+
+@receiver(post_delete, sender=StudentProgress)
+def progress_deleted(sender, instance, **kwargs):
+    completion.progress_deleted(instance)
+    analytics.progress_deleted(instance)
+
+
+@receiver(pre_save, sender=Lesson)
+def lesson_remember_course(sender, instance, **kwargs):
+    if instance.pk:
+        # content_version bazadagidan — eski nusxa saqlansa ham versiya orqaga qaytmasin
+        instance._old_course_id, instance.content_version = (
+            Lesson.objects.filter(pk=instance.pk).values_list('course_id', 'content_version').first()
+            or (None, instance.content_version)
+        )
+
+
+@receiver(post_save, sender=Lesson)
+def lesson_saved(sender, instance, created, **kwargs):
+    if not created:
+        completion.lesson_moved(getattr(instance, '_old_course_id', None), instance.course_id)
+
+
+@receiver(post_save, sender=Lesson)
+def lesson_fragments_changed(sender, instance, **kwargs):
+    # Dars kartasi va videolar qismi (courses/fragments.py) yangi versiya bilan qayta chiziladi
+    fragments.bump_lessons([instance.pk])
+
+
+@receiver(pre_save, sender=Video)
+def video_remember_lesson(sender, instance, **kwargs):
+    old_file = None
+    if instance.pk:
+        instance._old_lesson_id, old_file = (
+            Video.objects.filter(pk=instance.pk).values_list('lesson_id', 'video_file').first() or (None, None)
+        )
+    # Davomiylik serverda aniqlanadi (courses/mediainfo.py) — fayl almashsa qaytadan.
+    # Aniqlanmasa admin kiritgan qiymat qoladi (bo'lmasa video "tugallanmaydi")
+    if not instance.video_file._committed or instance.video_file.name != old_file or instance.duration is None:
+        instance.duration = mediainfo.video_duration(instance) or instance.duration
+
+
+@receiver([post_save, post_delete], sender=Video)
+def video_changed(sender, instance, **kwargs):
+    fragments.bump_lessons([instance.lesson_id, getattr(instance, '_old_lesson_id', None)])
+
+
+@receiver(pre_save, sender=Schedule)
+def schedule_remember_group(sender, instance, **kwargs):
+    if instance.pk:
+        instance._old_group_id = Schedule.objects.filter(pk=instance.pk).values_list('group_id', flat=True).first()
+
+
+@receiver([post_save, post_delete], sender=Schedule)
+def schedule_changed(sender, instance, **kwargs):
+    timetable.invalidate([instance.group_id, getattr(instance, '_old_group_id', None)])
+
+
+@receiver(post_save, sender=Lesson)
+def lesson_title_changed(sender, instance, created, **kwargs):
+    if not created:
+        timetable.invalidate_for_lesson(instance.pk)
+
+
+@receiver(pre_save, sender=Course)
+def course_keep_versions(sender, instance, **kwargs):
+    # Admin formasi eski nusxani saqlasa ham versiya orqaga qaytmasin (F() bilan oshiriladi)
+    if instance.pk:
+        instance.face_version = (
+            Course.objects.filter(pk=instance.pk).values_list('face_version', flat=True).first() or 0
+        )
+
+
+@receiver(post_save, sender=Course)
+def course_changed(sender, instance, **kwargs):
+    timetable.invalidate([instance.pk])
+
+
+@receiver(post_save, sender=Certificate)
+def certificate_saved(sender, instance, **kwargs):
+    # Statik sahifa ham: PDF tayyor bo'lsa qayta yoziladi (ball/ism o'zgargan bo'lishi mumkin), aks holda o'chiriladi
+    if instance.is_ready:
+        verification.publish(instance)
+    else:
+        verification.invalidate(instance.certificate_id, remove_static=True)
+
+
+@receiver(post_delete, sender=Certificate)
+def certificate_deleted(sender, instance, **kwargs):
+    verification.invalidate(instance.certificate_id, remove_static=True)
+
+
+@receiver(pre_save, sender=Profile)
+def profile_avatar_thumbnails(sender, instance, **kwargs):
+    # Yangi yuklangan rasm hali xotirada/vaqtinchalik faylda — nusxalar shundan,
+    # avatar_hash shu save() ning o'zida yoziladi (qo'shimcha so'rovsiz)
+    avatar = instance.avatar
+    if not avatar:
+        instance.avatar_hash = ''
+    elif not avatar._committed:
+        try:
+            instance.avatar_hash = avatars.make_thumbnails(avatar.file)
+        except (OSError, ValueError, Image.DecompressionBombError):
+            instance.avatar_hash = ''
+
+
+def _group_of(student_id):
+    return Profile.objects.filter(user_id=student_id).values_list('group_id', flat=True).first()
+
+
+@receiver(post_save, sender=FaceEnrollment)
+def face_enrollment_saved(sender, instance, **kwargs):
+    facematch.enrollment_saved(instance.student_id, _group_of(instance.student_id), faces.from_bytes(instance.descriptor))
+
+
+@receiver(post_delete, sender=FaceEnrollment)
+def face_enrollment_deleted(sender, instance, **kwargs):
+    facematch.enrollment_deleted(instance.student_id, _group_of(instance.student_id))
+
+
+@receiver(post_init, sender=Profile)
+def profile_remember_group(sender, instance, **kwargs):
+    # __dict__ dan — only()/defer() bilan yuklanganda qo'shimcha so'rov bo'lmasin
+    instance._loaded_group_id = instance.__dict__.get('group_id')
+
+
+@receiver(post_save, sender=Profile)
+def profile_group_changed(sender, instance, created, **kwargs):
+    old = instance._loaded_group_id
+    if not created and 'group_id' in instance.__dict__ and old != instance.group_id:
+        facematch.group_changed(instance.user_id, old, instance.group_id)
+        analytics.group_changed(instance.user_id, old, instance.group_id)
+    instance._loaded_group_id = instance.__dict__.get('group_id')
@@ -0,0 +1,219 @@
+# courses/streaming.py — videolarni Range (206) bilan uzatish
+
+import os
+import mimetypes
+import uuid
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+# Sozlamalar (settings.py orqali o'zgartirish mumkin)
+DEFAULT_CHUNK_SIZE = 64 * 1024
+MAX_RANGES = 16  # multi-range so'rovlarda ruxsat etilgan eng ko'p bo'laklar
+
+
+def _chunk_size():
+    return getattr(settings, 'VIDEO_STREAM_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+
+
+def file_etag(stat):
+    # mtime + hajm asosida kuchli ETag
+    return quote_etag(f"{int(stat.st_mtime_ns):x}-{stat.st_size:x}")
+
+
+def parse_range_header(header, size):
+    """
+    "bytes=0-99,200-" ko'rinishidagi sarlavhani [(start, end), ...] ga aylantiradi
+    (end — inklyuziv). Sarlavha noto'g'ri bo'lsa None, hech bir bo'lak
+    faylga tushmasa [] qaytaradi.
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition('=')
+    if unit.strip().lower() != 'bytes' or not spec:
+        return None
+
+    ranges = []
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        first, sep, last = part.partition('-')
+        if not sep:
+            return None
+        first, last = first.strip(), last.strip()
+        try:
+            if not first:
+                # bytes=-500 — oxirgi 500 bayt
+                if not last:
+                    return None
+                length = int(last)
+                if length <= 0:
+                    continue
+                start, end = max(size - length, 0), size - 1
+            else:
+                start = int(first)
+                end = int(last) if last else None
+                if end is not None and end < start:
+                    return None
+                end = size - 1 if end is None else min(end, size - 1)
+        except ValueError:
+            return None
+        if start < 0:
+            return None
+        if start >= size:
+            continue
+        ranges.append((start, end))
+
+    if len(ranges) > MAX_RANGES:
+        return None
+    return _coalesce(ranges)
+
+
+def _coalesce(ranges):
+    # Bir-birini qoplagan yoki yonma-yon bo'laklarni birlashtiramiz
+    if len(ranges) < 2:
+        return ranges
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _read_range(path, start, end, chunk_size):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            data = f.read(min(chunk_size, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            yield data
+
+
+def _multipart_parts(path, ranges, size, content_type, boundary):
+    for start, end in ranges:
+        yield (
+            f"\r\n--{boundary}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Range: bytes {start}-{end}/{size}\r\n\r\n"
+        ).encode()
+        yield (start, end)
+    yield f"\r\n--{boundary}--\r\n".encode()
+
+
+def _multipart_stream(path, ranges, size, content_type, boundary, chunk_size):
+    for part in _multipart_parts(path, ranges, size, content_type, boundary):
+        if isinstance(part, bytes):
+            yield part
+        else:
+            yield from _read_range(path, part[0], part[1], chunk_size)
+
+
+def _multipart_length(path, ranges, size, content_type, boundary):
+    total = 0
+    for part in _multipart_parts(path, ranges, size, content_type, boundary):
+        total += len(part) if isinstance(part, bytes) else part[1] - part[0] + 1
+    return total
+
+
+def _if_range_matches(request, etag, last_modified):
+    # If-Range mos kelmasa — butun faylni 200 bilan qaytaramiz (RFC 9110 13.1.5):
+    # faqat kuchli ETag aynan teng bo'lsa yoki sana Last-Modified ga aynan teng bo'lsa
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if_range = if_range.strip()
+    if if_range.startswith('W/'):
+        return False
+    if if_range.startswith('"'):
+        return if_range == etag
+    date = parse_http_date_safe(if_range)
+    return date is not None and int(last_modified) == date
+
+
+def _sendfile_response(path, content_type):
+    """
+    VIDEO_SENDFILE_MODE = 'x-accel-redirect' (nginx) yoki 'x-sendfile' (apache/lighttpd).
+    Ruxsat Django'da tekshiriladi, baytlarni esa proxy o'zi uzatadi
+    (Range ham proxy tomonidan bajariladi).
+    """
+    mode = getattr(settings, 'VIDEO_SENDFILE_MODE', None)
+    if not mode:
+        return None
+
+    response = HttpResponse(content_type=content_type)
+    if mode == 'x-accel-redirect':
+        root = os.path.realpath(settings.MEDIA_ROOT)
+        relative = os.path.relpath(os.path.realpath(path), root).replace(os.sep, '/')
+        prefix = getattr(settings, 'VIDEO_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+        response['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + relative
+        response['X-Accel-Buffering'] = 'no'
+    elif mode == 'x-sendfile':
+        response['X-Sendfile'] = path
+    else:
+        raise ValueError(f"Noma'lum VIDEO_SENDFILE_MODE: {mode}")
+    return response
+
+
+def ranged_file_response(request, path, content_type=None, filename=None):
+    content_type = content_type or mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    filename = filename or os.path.basename(path)
+    disposition = 'inline; filename="{}"'.format(filename)
+
+    response = _sendfile_response(path, content_type)
+    if response is not None:
+        response['Content-Disposition'] = disposition
+        return response
+
+    stat = os.stat(path)
+    size = stat.st_size
+    etag = file_etag(stat)
+    last_modified = stat.st_mtime
+
+    # If-None-Match / If-Modified-Since -> 304, If-Match -> 412
+    conditional = get_conditional_response(request, etag=etag, last_modified=int(last_modified))
+    if conditional is not None:
+        conditional['Accept-Ranges'] = 'bytes'
+        return conditional
+
+    chunk_size = _chunk_size()
+    ranges = None
+    if request.method in ('GET', 'HEAD') and _if_range_matches(request, etag, last_modified):
+        ranges = parse_range_header(request.META.get('HTTP_RANGE'), size)
+
+    if ranges is None:
+        # Range yo'q — butun fayl (wsgi.file_wrapper orqali sendfile ishlatilishi mumkin)
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+        response.block_size = chunk_size
+    elif not ranges:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+    elif len(ranges) == 1:
+        start, end = ranges[0]
+        response = StreamingHttpResponse(
+            _read_range(path, start, end, chunk_size), status=206, content_type=content_type
+        )
+        response['Content-Length'] = str(end - start + 1)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    else:
+        boundary = uuid.uuid4().hex
+        response = StreamingHttpResponse(
+            _multipart_stream(path, ranges, size, content_type, boundary, chunk_size),
+            status=206,
+            content_type=f'multipart/byteranges; boundary={boundary}',
+        )
+        response['Content-Length'] = str(_multipart_length(path, ranges, size, content_type, boundary))
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    if response.status_code != 416:
+        response['Content-Disposition'] = disposition
+    return response
@@ -0,0 +1,95 @@
+# courses/telemetry.py — face.html diqqat kadrlarini qabul qilish
+
+import math
+import struct
+from datetime import datetime, timezone as dt_timezone
+
+from django.db.models import F
+
+from .models import AttentionBatch, LessonAttention
+from .transactions import write_transaction
+
+# face.html dagi qiymatlar bilan bir xil bo'lishi kerak
+LOOKING_THRESHOLD = 20      # gradus
+CENTER_TOLERANCE = 0.15
+
+# Paket formati (little-endian):
+#   sarlavha: b'AT', versiya (u8), zaxira (u8), t0 — epoch ms (f64), kadrlar soni (u32)
+#   har kadr: oldingi kadrdan dt ms (u16), bayroqlar (u8), o'rtacha burchak * 100 (u16)
+#   bayroqlar: bit0 — yuz bor, bit1 — yuz markazda
+MAGIC = b'AT'
+VERSION = 1
+HEADER = struct.Struct('<2sBBdI')
+SAMPLE = struct.Struct('<HBH')
+FLAG_PRESENT = 0x01
+FLAG_CENTERED = 0x02
+
+MAX_SAMPLES = 30 * 60  # bitta paketda ko'pi bilan 1 daqiqa (30 fps)
+# t0 chegarasi (epoch ms): 2000-01-01 .. 2100-01-01 — datetime ga xatosiz o'giriladi
+MIN_T0_MS = 946684800000
+MAX_T0_MS = 4102444800000
+
+
+class TelemetryError(ValueError):
+    pass
+
+
+def decode_batch(data):
+    """
+    Paketni tekshiradi va (t0_ms, [(dt_ms, flags, angle_centideg), ...]) qaytaradi.
+    """
+    if len(data) < HEADER.size:
+        raise TelemetryError("Paket juda qisqa")
+    magic, version, _, t0_ms, count = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise TelemetryError("Noma'lum paket formati")
+    if not math.isfinite(t0_ms) or not MIN_T0_MS <= t0_ms < MAX_T0_MS:
+        raise TelemetryError("Paket vaqti (t0) noto'g'ri")
+    if count == 0 or count > MAX_SAMPLES:
+        raise TelemetryError("Kadrlar soni noto'g'ri")
+    body = memoryview(data)[HEADER.size:]
+    if len(body) != count * SAMPLE.size:
+        raise TelemetryError("Paket uzunligi kadrlar soniga mos emas")
+    return t0_ms, list(SAMPLE.iter_unpack(body))
+
+
+def summarize(samples):
+    # (frames, present, centered, looking, duration_ms)
+    present = centered = looking = duration = 0
+    limit = LOOKING_THRESHOLD * 100
+    for dt, flags, angle in samples:
+        duration += dt
+        if not flags & FLAG_PRESENT:
+            continue
+        present += 1
+        if flags & FLAG_CENTERED:
+            centered += 1
+            if angle < limit:
+                looking += 1
+    return len(samples), present, centered, looking, duration
+
+
+def ingest_batch(student, lesson, data):
+    t0_ms, samples = decode_batch(data)
+    frames, present, centered, looking, duration = summarize(samples)
+    started_at = datetime.fromtimestamp(t0_ms / 1000.0, tz=dt_timezone.utc)
+    counters = dict(frames=frames, present_frames=present, centered_frames=centered,
+                    looking_frames=looking, duration_ms=duration)
+    return _store(student, lesson, started_at, bytes(data), counters)
+
+
+@write_transaction
+def _store(student, lesson, started_at, payload, counters):
+    # Paket uchun ikki yozuv: INSERT (xom ma'lumot) + UPDATE (rollup); qulf xatosida butunlay qayta
+    batch = AttentionBatch.objects.create(student=student, lesson=lesson, started_at=started_at,
+                                          payload=payload, **counters)
+    if not _bump_rollup(student, lesson, counters):
+        LessonAttention.objects.bulk_create([LessonAttention(student=student, lesson=lesson)], ignore_conflicts=True)
+        _bump_rollup(student, lesson, counters)
+    return batch
+
+
+def _bump_rollup(student, lesson, counters):
+    return LessonAttention.objects.filter(student=student, lesson=lesson).update(
+        **{field: F(field) + value for field, value in counters.items()}
+    )
@@ -1,7 +1,36 @@
 from django import template
+from django.utils.html import format_html
+from courses import assets, avatars
 register = template.Library()
 @register.filter
 def dict_get(d, key):
     if isinstance(d, dict):
         return d.get(key)
     return None
+
+
+@register.simple_tag
+def avatar(profile, size=96, css_class=''):
+    # {% avatar profile 96 %} — mos o'lchamdagi WebP (JPEG zaxira) nusxa, 2x ekranlar uchun srcset
+    digest = getattr(profile, 'avatar_hash', '')
+    if not digest:
+        return '👤'
+    urls = avatars.urls(digest, size)
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}">'
+        '<img src="{}" srcset="{} 2x" width="{}" height="{}" alt="" class="{}" loading="lazy" decoding="async">'
+        '</picture>',
+        urls['webp'], urls['jpeg'], urls['jpeg_2x'], size, size, css_class,
+    )
+
+
+@register.simple_tag
+def mediapipe_files():
+    # {% mediapipe_files as files %} — {fayl nomi: xeshli URL}, FaceMesh locateFile uchun
+    return assets.mediapipe_urls()
+
+
+@register.simple_tag
+def mediapipe_missing():
+    # {% mediapipe_missing as missing %} — vendor qilinmagan MediaPipe fayllari (bo'sh bo'lsa hammasi joyida)
+    return assets.missing_mediapipe()
@@ -0,0 +1,373 @@
+import datetime
+import io
+import os
+import tempfile
+import zlib
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from PIL import Image
+
+from . import uploads, watchtime
+from .answer_keys import get_answer_key
+from .models import (
+    STATUS_READY, Certificate, Choice, Course, Lesson, Question, StudentProgress, Test, UploadSession, Video,
+    VideoWatch,
+)
+from .querybudget import QueryBudgetMixin
+from .streaming import parse_range_header, ranged_file_response
+from .watchtime import IntervalSet
+
+
+class ProgressQueryCountTests(TestCase):
+    # progress_for_lessons: so'rovlar soni darslar/videolar soniga bog'liq emas
+
+    def setUp(self):
+        cache.clear()
+        self.course = Course.objects.create(title="Kurs")
+        self.user = User.objects.create(username="talaba")
+        self.client.force_login(self.user)
+
+    def _lessons(self, count):
+        Lesson.objects.all().delete()
+        return [
+            Lesson.objects.create(course=self.course, title=f"Dars {i}", order=i, date=timezone.localdate())
+            for i in range(count)
+        ]
+
+    def test_dashboard_constant_queries(self):
+        # sessiya, foydalanuvchi, darslar, progress SELECT + INSERT + qayta o'qish
+        for count in (5, 25):
+            with self.subTest(lessons=count):
+                self._lessons(count)
+                cache.clear()
+                with self.assertNumQueries(6):
+                    response = self.client.get(reverse('courses:dashboard'))
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.context['cards']), count)
+                # Ikkinchi marta progress qatorlari bor — INSERT va qayta o'qish yo'q
+                with self.assertNumQueries(4):
+                    self.client.get(reverse('courses:dashboard'))
+
+    def test_lesson_detail_constant_queries(self):
+        for count in (5, 25):
+            with self.subTest(videos=count):
+                lesson = self._lessons(1)[0]
+                Video.objects.bulk_create([
+                    Video(lesson=lesson, title=f"Video {j}", video_file='videos/test.mp4', order=j, duration=10)
+                    for j in range(count)
+                ])
+                cache.clear()
+                # sessiya, foydalanuvchi, dars, progress SELECT + INSERT + qayta o'qish, videolar
+                with self.assertNumQueries(7):
+                    response = self.client.get(reverse('courses:lesson_detail', args=[lesson.id]))
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.context['fragments']['total'], count)
+                # Progress bor, videolar qismi keshda
+                with self.assertNumQueries(4):
+                    self.client.get(reverse('courses:lesson_detail', args=[lesson.id]))
+
+
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    # QUERY_BUDGETS (courses/urls.py) — haqiqiy javob yo'lida (200), sovuq keshda
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_settings = override_settings(MEDIA_ROOT=media.name)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        cache.clear()
+
+        self.course = Course.objects.create(title="Kurs")
+        self.user = User.objects.create(username="talaba")
+        image = io.BytesIO()
+        Image.new('RGB', (64, 64), (40, 120, 200)).save(image, 'JPEG')
+        self.user.profile.group = self.course
+        self.user.profile.avatar = ContentFile(image.getvalue(), name='avatar.jpg')
+        self.user.profile.save()
+        self.lesson = Lesson.objects.create(course=self.course, title="Dars", order=0, date=timezone.localdate())
+        Video.objects.bulk_create([
+            Video(lesson=self.lesson, title=f"Video {j}", video_file='videos/test.mp4', order=j, duration=10)
+            for j in range(3)
+        ])
+        StudentProgress.objects.create(student=self.user, lesson=self.lesson)
+        self.cert = Certificate.objects.create(
+            student=self.user, course=self.course, test_score=90, status=STATUS_READY,
+            pdf_file=ContentFile(b'%PDF-1.4\n%%EOF\n', name='sertifikat.pdf'),
+        )
+        self.client.force_login(self.user)
+
+    def test_student_pages(self):
+        for name, args in [
+            ('courses:dashboard', []),
+            ('courses:lesson_detail', [self.lesson.id]),
+            ('courses:schedule', []),
+            ('courses:my_certificates', []),
+            ('courses:profile', []),
+        ]:
+            with self.subTest(name):
+                cache.clear()
+                self.assertQueryBudget(name, lambda: self.client.get(reverse(name, args=args)))
+
+    def test_download_certificate(self):
+        response, _ = self.assertQueryBudget(
+            'courses:download_certificate',
+            lambda: self.client.get(reverse('courses:download_certificate', args=[self.cert.id])),
+        )
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        response.close()
+
+    def test_avatar_thumbnail(self):
+        self.user.profile.refresh_from_db()
+        name = f'{self.user.profile.avatar_hash}-48.jpg'
+        response, _ = self.assertQueryBudget(
+            'courses:avatar_thumbnail', lambda: self.client.get(reverse('courses:avatar_thumbnail', args=[name])),
+        )
+        response.close()
+
+    def test_verify_certificate(self):
+        self.assertQueryBudget(
+            'courses:verify_certificate',
+            lambda: self.client.get(reverse('courses:verify_certificate', args=[self.cert.certificate_id])),
+        )
+
+
+@override_settings(VIDEO_SENDFILE_MODE=None)
+class RangeStreamingTests(SimpleTestCase):
+    # courses/streaming.py: Range tahlili, 206/416, multipart va If-Range
+
+    DATA = bytes(range(100))
+    MTIME = 1700000000
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.mp4')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(self.DATA)
+        os.utime(self.path, (self.MTIME, self.MTIME))
+        self.addCleanup(os.remove, self.path)
+
+    def _get(self, headers=None):
+        request = RequestFactory().get('/video/1/stream/', headers=headers)
+        response = ranged_file_response(request, self.path, content_type='video/mp4')
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        response.close()
+        return response, body
+
+    def test_parse_range_header(self):
+        self.assertEqual(parse_range_header('bytes=0-9', 100), [(0, 9)])
+        self.assertEqual(parse_range_header('bytes=-10', 100), [(90, 99)])
+        self.assertEqual(parse_range_header('bytes=50-', 100), [(50, 99)])
+        self.assertEqual(parse_range_header('bytes=90-500', 100), [(90, 99)])
+        # Qoplangan va yonma-yon bo'laklar birlashtiriladi, tartib muhim emas
+        self.assertEqual(parse_range_header('bytes=20-29,0-9,5-19', 100), [(0, 29)])
+        self.assertEqual(parse_range_header('bytes=0-4,10-14', 100), [(0, 4), (10, 14)])
+        # Faylga tushmaydigan bo'lak — [], noto'g'ri sarlavha — None
+        self.assertEqual(parse_range_header('bytes=100-200', 100), [])
+        for header in ('items=0-1', 'bytes=5-2', 'bytes=a-b', 'bytes=-', 'bytes=0'):
+            with self.subTest(header):
+                self.assertIsNone(parse_range_header(header, 100))
+
+    def test_full_file_without_range(self):
+        response, body = self._get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, self.DATA)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+
+    def test_single_range(self):
+        response, body = self._get({'Range': 'bytes=10-19'})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(body, self.DATA[10:20])
+        self.assertEqual(response['Content-Range'], 'bytes 10-19/100')
+        self.assertEqual(response['Content-Length'], '10')
+
+    def test_unsatisfiable_range(self):
+        response, _ = self._get({'Range': 'bytes=200-300'})
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */100')
+
+    def test_multipart_ranges(self):
+        response, body = self._get({'Range': 'bytes=0-4,50-54'})
+        self.assertEqual(response.status_code, 206)
+        content_type, _, boundary = response['Content-Type'].partition('; boundary=')
+        self.assertEqual(content_type, 'multipart/byteranges')
+        self.assertEqual(int(response['Content-Length']), len(body))
+        self.assertEqual(body, (
+            f'\r\n--{boundary}\r\nContent-Type: video/mp4\r\nContent-Range: bytes 0-4/100\r\n\r\n'.encode()
+            + self.DATA[0:5]
+            + f'\r\n--{boundary}\r\nContent-Type: video/mp4\r\nContent-Range: bytes 50-54/100\r\n\r\n'.encode()
+            + self.DATA[50:55]
+            + f'\r\n--{boundary}--\r\n'.encode()
+        ))
+
+    def test_if_range(self):
+        etag = self._get()[0]['ETag']
+        for if_range, status in [
+            (etag, 206),
+            (f'W/{etag}', 200),
+            ('"boshqa"', 200),
+            (http_date(self.MTIME), 206),
+            (http_date(self.MTIME + 1), 200),
+            (http_date(self.MTIME - 1), 200),
+        ]:
+            with self.subTest(if_range):
+                response, body = self._get({'Range': 'bytes=0-9', 'If-Range': if_range})
+                self.assertEqual(response.status_code, status)
+                self.assertEqual(body, self.DATA[:10] if status == 206 else self.DATA)
+
+
+class IntervalSetTests(SimpleTestCase):
+    # courses/watchtime.py: tartiblangan, kesishmaydigan oraliqlar
+
+    def test_merges_overlapping_and_adjacent(self):
+        cases = [
+            ([(0, 10), (5, 15)], [(0, 15)]),
+            ([(0, 10), (10, 20)], [(0, 20)]),
+            ([(0, 10), (10.25, 20)], [(0, 20)]),  # MERGE_GAP dan kichik bo'shliq
+            ([(0, 10), (11, 20)], [(0, 10), (11, 20)]),
+            ([(30, 40), (0, 10), (20, 25)], [(0, 10), (20, 25), (30, 40)]),
+            ([(0, 10), (20, 25), (30, 40), (5, 35)], [(0, 40)]),  # bir nechtasini ko'prik qiladi
+            ([(2, 3), (0, 10)], [(0, 10)]),
+            ([(5, 5), (8, 4)], []),  # bo'sh/teskari oraliqlar e'tiborsiz
+        ]
+        for pairs, expected in cases:
+            with self.subTest(pairs):
+                self.assertEqual(list(IntervalSet(pairs)), expected)
+
+    def test_covered_and_bytes_roundtrip(self):
+        intervals = IntervalSet([(0, 10), (20, 25.5)])
+        self.assertEqual(intervals.covered(), 15.5)
+        self.assertEqual(list(IntervalSet.from_bytes(intervals.to_bytes())), list(intervals))
+
+
+class WatchTimeRecordTests(TestCase):
+    # Heartbeat -> VideoWatch: ko'rilgan vaqt real vaqtdan MAX_PLAYBACK_RATE martadan tez o'smaydi
+
+    def setUp(self):
+        watchtime._buffer.clear()
+        self.addCleanup(watchtime._buffer.clear)
+        course = Course.objects.create(title="Kurs")
+        self.user = User.objects.create(username="talaba")
+        self.lesson = Lesson.objects.create(course=course, title="Dars", order=0, date=timezone.localdate())
+        self.video = Video.objects.create(lesson=self.lesson, title="Video", video_file='videos/test.mp4',
+                                          order=0, duration=100)
+
+    def _heartbeat(self, *pairs):
+        watchtime.record(self.user.id, self.video.id, IntervalSet(pairs))
+        watchtime.flush(keys=[(self.user.id, self.video.id)])
+        return VideoWatch.objects.get(student=self.user, video=self.video)
+
+    def test_rejects_faster_than_rate_cap(self):
+        # Hozirgina boshlangan: ruxsat ~SLACK_SECONDS, 100 soniya qabul qilinmaydi
+        watch = self._heartbeat((0, 100))
+        self.assertEqual(watch.watched_seconds, 0)
+        self.assertFalse(watch.completed)
+        self.assertFalse(watchtime.is_completed(self.user, self.video))
+
+    def test_accepts_within_rate_cap_and_completes(self):
+        watch = self._heartbeat((0, 10))
+        self.assertEqual(watch.watched_seconds, 10)
+        self.assertFalse(watch.completed)
+        # 60 soniya o'tdi: 60 * 2 + 15 >= 95 — qabul qilinadi va video tugallanadi
+        VideoWatch.objects.filter(pk=watch.pk).update(
+            started_at=timezone.now() - datetime.timedelta(seconds=60))
+        watch = self._heartbeat((0, 50), (50, 95))
+        self.assertEqual(watch.watched_seconds, 95)
+        self.assertTrue(watch.completed)
+        self.assertEqual(StudentProgress.objects.get(student=self.user, lesson=self.lesson).watched_count, 1)
+
+
+class ChunkedUploadTests(TestCase):
+    # courses/uploads.py: bo'laklab yuklash holati
+
+    DATA = b'0123456789' * 10
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_settings = override_settings(MEDIA_ROOT=media.name)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        self.user = User.objects.create(username="admin", is_staff=True)
+        self.session = uploads.create_session(self.user, 'lesson', 'dars.txt', len(self.DATA))
+
+    def _write(self, start, end, chunk_crc32=None):
+        return uploads.write_chunk(self.session, start, end, len(self.DATA), io.BytesIO(self.DATA[start:end]),
+                                   chunk_crc32)
+
+    def test_resent_chunk_is_ignored(self):
+        self.assertEqual(self._write(0, 40), 40)
+        # Javob yo'qolib, o'sha bo'lak qayta keldi — hech narsa yozilmaydi
+        self.assertEqual(self._write(0, 40), 40)
+        self.session.refresh_from_db()
+        self.assertEqual((self.session.offset, self.session.crc32), (40, zlib.crc32(self.DATA[:40])))
+
+    def test_wrong_offset_is_conflict(self):
+        self._write(0, 40)
+        with self.assertRaises(uploads.UploadError) as ctx:
+            self._write(50, 60)
+        self.assertEqual(ctx.exception.status, 409)
+        self.assertEqual(uploads.session_state(ctx.exception.session)['offset'], 40)
+
+    def test_chunk_crc_mismatch(self):
+        with self.assertRaises(uploads.UploadError) as ctx:
+            self._write(0, 40, chunk_crc32=zlib.crc32(self.DATA[:40]) ^ 1)
+        self.assertEqual(ctx.exception.status, 400)
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.offset, 0)
+        # Xuddi shu bo'lakni to'g'ri CRC bilan qayta yuborish mumkin
+        self.assertEqual(self._write(0, 40, chunk_crc32=zlib.crc32(self.DATA[:40])), 40)
+
+    def test_finalize(self):
+        self._write(0, 60)
+        self._write(60, 100)
+        name = uploads.finalize(self.session, zlib.crc32(self.DATA))
+        self.assertTrue(self.session.completed)
+        with default_storage.open(name) as f:
+            self.assertEqual(f.read(), self.DATA)
+        self.assertEqual(uploads.completed_name(self.user, self.session.pk, 'lesson'), name)
+        other = User.objects.create(username="boshqa", is_staff=True)
+        self.assertIsNone(uploads.completed_name(other, self.session.pk, 'lesson'))
+
+    def test_finalize_crc_mismatch_restarts(self):
+        self._write(0, 100)
+        response = self._finalize_view({'crc32': zlib.crc32(self.DATA) ^ 1})
+        self.assertEqual(response.status_code, 410)
+        self.assertTrue(response.json()['restart'])
+        self.assertFalse(UploadSession.objects.filter(pk=self.session.pk).exists())
+        self.assertFalse(default_storage.exists(self.session.name))
+
+    def _finalize_view(self, data):
+        self.client.force_login(self.user)
+        return self.client.post(reverse('courses:upload_finalize', args=[self.session.pk]), data,
+                                content_type='application/json')
+
+
+class AnswerKeyVersionTests(TestCase):
+    # Test.answers_version: eski nusxani saqlash versiyani (va javoblar kalitini) orqaga qaytarmaydi
+
+    def test_stale_test_save_keeps_version(self):
+        cache.clear()
+        lesson = Lesson.objects.create(course=Course.objects.create(title="Kurs"), title="Dars", order=0,
+                                       date=timezone.localdate())
+        test = Test.objects.create(lesson=lesson, title="Test")
+        question = Question.objects.create(test=test, text="Savol")
+        wrong = Choice.objects.create(question=question, text="A", is_correct=True)
+        stale = Test.objects.get(pk=test.pk)
+        self.assertEqual(get_answer_key(stale)['correct'][question.id], {wrong.id})
+
+        # To'g'ri javob o'zgardi (signallar versiyani oshiradi), keyin eski nusxa admin orqali saqlandi
+        Choice.objects.filter(pk=wrong.pk).update(is_correct=False)
+        right = Choice.objects.create(question=question, text="B", is_correct=True)
+        stale.title = "Test (tahrir)"
+        stale.save()
+
+        test.refresh_from_db()
+        self.assertEqual(test.answers_version, stale.answers_version)
+        self.assertEqual(get_answer_key(test)['correct'][question.id], {right.id})
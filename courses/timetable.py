@@ -0,0 +1,161 @@
+# courses/timetable.py — guruhning haftalik dars jadvali (keshlangan) va iCalendar lentasi
+#
+# Jadval haftaga bog'liq emas (Schedule faqat hafta kuni + vaqt), shuning uchun
+# har guruh uchun bitta tuzilma bir marta quriladi va keshda saqlanadi.
+# Kalit Course.timetable_updated_at ga bog'liq: Schedule/Lesson/Course
+# o'zgarganda signallar uni yangilaydi (bazada — barcha jarayonlar uchun
+# bir xil), u Last-Modified ham bo'ladi. Eski yozuvlar muddati bilan tushadi.
+
+import hashlib
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import Course, Schedule, WEEK_DAYS
+
+DAY_ORDER = [key for key, _ in WEEK_DAYS]
+DAY_NAMES = dict(WEEK_DAYS)
+ICS_SALT = 'courses.timetable.ics'
+# Takrorlanuvchi hodisalar shu dushanbadan boshlanadi (barqaror chiqish = barqaror ETag)
+ICS_ANCHOR = date(2024, 1, 1)
+CACHE_TIMEOUT = getattr(settings, 'TIMETABLE_CACHE_TIMEOUT', 86400)
+NO_GROUP = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)  # guruh topilmasa — bo'sh jadval uchun barqaror kalit
+
+
+def _cache_key(group_id, updated_at):
+    return f"timetable:{group_id}:{updated_at.timestamp():.6f}"
+
+
+def build_timetable(group_id, updated_at):
+    # Bitta so'rov; kunlar DAY_ORDER bo'yicha, har kun ichida start_time bo'yicha
+    days = {day: [] for day in DAY_ORDER}
+    rows = (
+        Schedule.objects.filter(group_id=group_id)
+        .select_related('lesson', 'group')
+        .order_by('start_time', 'id')
+    )
+    group_title = ''
+    for item in rows:
+        group_title = item.group.title
+        if item.day_of_week in days:
+            days[item.day_of_week].append({
+                'id': item.id,
+                'lesson_id': item.lesson_id,
+                'lesson_title': item.lesson.title,
+                'start_time': item.start_time,
+                'end_time': item.end_time,
+                'room': item.room,
+            })
+    week = [(day, DAY_NAMES[day], days[day]) for day in DAY_ORDER]
+    digest = hashlib.sha1(repr((group_title, week)).encode()).hexdigest()[:20]
+    return {
+        'week': week,
+        'group_title': group_title,
+        'etag': digest,
+        'modified': int(updated_at.timestamp()),
+    }
+
+
+def get_timetable(group_id, updated_at=None):
+    """
+    {week: [(kun, nomi, [dars...]) x 7], group_title, etag, modified} —
+    keshdan, bo'lmasa bitta so'rov bilan quriladi. updated_at (guruh allaqachon
+    o'qilgan bo'lsa, Course.timetable_updated_at) berilmasa — bitta so'rov bilan olinadi.
+    """
+    if updated_at is None:
+        updated_at = (
+            Course.objects.filter(pk=group_id).values_list('timetable_updated_at', flat=True).first()
+            or NO_GROUP
+        )
+    key = _cache_key(group_id, updated_at)
+    timetable = cache.get(key)
+    if timetable is None:
+        timetable = build_timetable(group_id, updated_at)
+        cache.set(key, timetable, CACHE_TIMEOUT)
+    return timetable
+
+
+def invalidate(group_ids):
+    # update() — Course signallari qayta ishga tushmaydi
+    Course.objects.filter(pk__in={gid for gid in group_ids if gid is not None}).update(
+        timetable_updated_at=timezone.now()
+    )
+
+
+def invalidate_for_lesson(lesson_id):
+    invalidate(Schedule.objects.filter(lesson_id=lesson_id).values_list('group_id', flat=True))
+
+
+def week_schedule(timetable, monday):
+    # Keshdagi tuzilmani aniq hafta sanalari bilan birlashtiradi (so'rovsiz)
+    return [
+        {'day_name': name, 'date': (monday + timedelta(days=i)).strftime('%d.%m'), 'items': items}
+        for i, (_, name, items) in enumerate(timetable['week'])
+    ]
+
+
+def feed_token(group_id):
+    return signing.dumps(group_id, salt=ICS_SALT)
+
+
+def group_from_token(token):
+    try:
+        return int(signing.loads(token, salt=ICS_SALT))
+    except (signing.BadSignature, TypeError, ValueError):
+        return None
+
+
+def _ics_escape(value):
+    return (
+        str(value).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+    )
+
+
+def _fold(line):
+    # RFC 5545: qator 75 oktetdan oshmasin, davomi bo'sh joy bilan boshlanadi
+    data = line.encode()
+    if len(data) <= 75:
+        return line
+    parts = []
+    while data:
+        cut = 75 if not parts else 74
+        while cut < len(data) and (data[cut] & 0xC0) == 0x80:
+            cut -= 1  # UTF-8 belgini bo'lib yubormaslik uchun
+        parts.append(data[:cut].decode())
+        data = data[cut:]
+    return '\r\n '.join(parts)
+
+
+def render_ics(timetable, host):
+    stamp = datetime.fromtimestamp(timetable['modified'], tz=dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//EduVision//Dars jadvali//UZ',
+        'CALSCALE:GREGORIAN',
+        f"X-WR-CALNAME:{_ics_escape(timetable['group_title'] or 'Dars jadvali')}",
+        f"X-WR-TIMEZONE:{timezone.get_default_timezone_name()}",
+    ]
+    for i, (_, _, items) in enumerate(timetable['week']):
+        day = ICS_ANCHOR + timedelta(days=i)
+        for item in items:
+            # Vaqtlar "suzuvchi" (TZ siz) — kalendar qurilmaning mahalliy vaqtida ko'rsatadi
+            start = datetime.combine(day, item['start_time']).strftime('%Y%m%dT%H%M%S')
+            end = datetime.combine(day, item['end_time']).strftime('%Y%m%dT%H%M%S')
+            lines += [
+                'BEGIN:VEVENT',
+                f"UID:schedule-{item['id']}@{host}",
+                f'DTSTAMP:{stamp}',
+                f'DTSTART:{start}',
+                f'DTEND:{end}',
+                'RRULE:FREQ=WEEKLY',
+                f"SUMMARY:{_ics_escape(item['lesson_title'])}",
+            ]
+            if item['room']:
+                lines.append(f"LOCATION:{_ics_escape(item['room'])}")
+            lines.append('END:VEVENT')
+    lines.append('END:VCALENDAR')
+    return ('\r\n'.join(_fold(line) for line in lines) + '\r\n').encode()
@@ -0,0 +1,44 @@
+# courses/transactions.py — yozish tranzaksiyalari: "database is locked" da cheklangan qayta urinish
+#
+# SQLite da tranzaksiyalar BEGIN IMMEDIATE bilan ochiladi (settings.py,
+# transaction_mode), shuning uchun qulf faqat tranzaksiya boshida kutiladi
+# (busy_timeout). Kutish muddati tugasa, butun blok bir necha marta
+# eksponensial kechikish bilan qayta bajariladi.
+
+import random
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.db import OperationalError, transaction
+
+LOCK_RETRIES = getattr(settings, 'DB_LOCK_RETRIES', 4)
+LOCK_BACKOFF = getattr(settings, 'DB_LOCK_BACKOFF', 0.05)  # s, har urinishda 2x
+
+
+def is_locked_error(exc):
+    return 'locked' in str(exc) or 'busy' in str(exc)
+
+
+def write_transaction(func=None, *, using=None):
+    """
+    Funksiyani atomic() ichida bajaradi va qulf xatosida qayta urinadi.
+    Funksiya qayta bajarilishi xavfsiz bo'lishi kerak: kerakli qatorlarni
+    tranzaksiya ichida qayta o'qisin. Tashqi atomic() ichida chaqirilsa,
+    qayta urinilmaydi — xato tashqariga uzatiladi.
+    """
+    if func is None:
+        return lambda f: write_transaction(f, using=using)
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        for attempt in range(LOCK_RETRIES + 1):
+            try:
+                with transaction.atomic(using=using):
+                    return func(*args, **kwargs)
+            except OperationalError as e:
+                nested = transaction.get_connection(using).in_atomic_block
+                if nested or attempt == LOCK_RETRIES or not is_locked_error(e):
+                    raise
+                time.sleep(LOCK_BACKOFF * 2 ** attempt * (0.5 + random.random()))
+    return wrapper
@@ -0,0 +1,196 @@
+# courses/uploads.py — katta video/dars fayllarini bo'laklab, davom ettiriladigan yuklash
+#
+# Sessiya ochilganda MEDIA_ROOT ichida yakuniy nom band qilinadi (bo'sh fayl).
+# Har bir bo'lak (PUT, Content-Range) so'rov oqimidan bloklab o'qiladi va
+# shu faylning o'z joyiga yoziladi — butun fayl xotirada yoki vaqtinchalik
+# joyda to'planmaydi, yakunda nusxalash ham yo'q. CRC32 bo'lakdan bo'lakka
+# davom ettiriladi (holati — bitta butun son, bazada saqlanadi), shuning
+# uchun ulanish uzilsa, yuklash `offset` dan davom etadi.
+
+import os
+import zlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from django.utils.text import get_valid_filename
+
+from .models import Lesson, UploadSession, Video
+
+CHUNK_SIZE = getattr(settings, 'UPLOAD_CHUNK_SIZE', 8 * 1024 * 1024)
+MAX_CHUNK_SIZE = getattr(settings, 'UPLOAD_MAX_CHUNK_SIZE', 64 * 1024 * 1024)
+MAX_SIZE = getattr(settings, 'UPLOAD_MAX_SIZE', 20 * 1024 ** 3)
+STALE_HOURS = getattr(settings, 'UPLOAD_STALE_HOURS', 24)
+READ_BLOCK = 256 * 1024
+
+# target -> (model, FileField nomi)
+TARGETS = {
+    'video': (Video, 'video_file'),
+    'lesson': (Lesson, 'file'),
+}
+
+
+class UploadError(Exception):
+    def __init__(self, message, status=400, session=None, restart=False):
+        super().__init__(message)
+        self.status = status
+        self.session = session
+        # restart=True — sessiya o'chirildi, yuklash boshidan (yangi sessiya bilan)
+        self.restart = restart
+
+
+def parse_content_range(header):
+    # "bytes <start>-<end>/<total>" -> (start, end + 1, total)
+    try:
+        unit, _, spec = header.partition(' ')
+        span, _, total = spec.partition('/')
+        start, _, end = span.partition('-')
+        start, end, total = int(start), int(end) + 1, int(total)
+    except (AttributeError, ValueError):
+        raise UploadError("Content-Range noto'g'ri")
+    if unit != 'bytes' or not 0 <= start < end <= total:
+        raise UploadError("Content-Range noto'g'ri")
+    return start, end, total
+
+
+def _reserve(name):
+    # Bo'sh faylni O_EXCL bilan yaratib, nomni boshqa sessiyalardan band qiladi
+    while True:
+        name = default_storage.get_available_name(name)
+        path = default_storage.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            continue
+        os.close(fd)
+        return name
+
+
+def create_session(user, target, filename, size):
+    if target not in TARGETS:
+        raise UploadError("Noma'lum target")
+    if not isinstance(size, int) or not 0 < size <= MAX_SIZE:
+        raise UploadError("Fayl hajmi noto'g'ri", status=413 if isinstance(size, int) and size > 0 else 400)
+    filename = os.path.basename(str(filename or ''))[:200]
+    if not filename:
+        raise UploadError("Fayl nomi yo'q")
+    model, field = TARGETS[target]
+    name = model._meta.get_field(field).generate_filename(None, get_valid_filename(filename))
+    return UploadSession.objects.create(
+        user=user, target=target, filename=filename, name=_reserve(name), size=size,
+    )
+
+
+def get_session(user, upload_id):
+    session = UploadSession.objects.filter(pk=upload_id, user=user).first()
+    if session is None:
+        raise UploadError("Sessiya topilmadi", status=404)
+    return session
+
+
+def write_chunk(session, start, end, total, stream, chunk_crc32=None):
+    """
+    [start, end) baytlarni oqimdan o'qib faylga yozadi; yangi offset ni qaytaradi.
+    Bo'lak allaqachon qabul qilingan bo'lsa (javob yo'qolib, qayta yuborilgan),
+    hech narsa yozilmaydi. Aks holda start == offset bo'lishi shart.
+    """
+    if session.completed:
+        raise UploadError("Yuklash yakunlangan", status=409, session=session)
+    if total != session.size:
+        raise UploadError("Fayl hajmi sessiyadagidan farq qiladi", session=session)
+    if end <= session.offset:
+        return session.offset
+    if start != session.offset:
+        raise UploadError("Bo'lak offset ga mos emas", status=409, session=session)
+    if end - start > MAX_CHUNK_SIZE:
+        raise UploadError("Bo'lak juda katta", status=413, session=session)
+
+    crc, piece_crc, pos = session.crc32, 0, start
+    with open(default_storage.path(session.name), 'r+b') as f:
+        f.seek(start)
+        while pos < end:
+            block = stream.read(min(READ_BLOCK, end - pos))
+            if not block:
+                break
+            f.write(block)
+            crc = zlib.crc32(block, crc)
+            piece_crc = zlib.crc32(block, piece_crc)
+            pos += len(block)
+    if pos != end:
+        raise UploadError("Bo'lak to'liq kelmadi", session=session)
+    if chunk_crc32 is not None and piece_crc != chunk_crc32:
+        raise UploadError("Bo'lak CRC32 mos emas", session=session)
+
+    # Parallel so'rov shu offset dan yozib ulgurgan bo'lsa — yangilanmaydi
+    updated = UploadSession.objects.filter(pk=session.pk, offset=start, completed=False).update(
+        offset=end, crc32=crc, updated_at=timezone.now(),
+    )
+    if not updated:
+        session.refresh_from_db()
+        raise UploadError("Bo'lak offset ga mos emas", status=409, session=session)
+    session.offset, session.crc32 = end, crc
+    return end
+
+
+def finalize(session, crc32=None, object_id=None):
+    """
+    Yuklashni yakunlaydi va fayl nomini qaytaradi. object_id berilsa, nom
+    shu Video/Lesson ning FileField iga yoziladi (eski fayl o'chirilmaydi).
+    """
+    if session.offset != session.size:
+        raise UploadError("Fayl to'liq yuklanmagan", status=409, session=session)
+    if crc32 is not None and crc32 != session.crc32:
+        # Qaysi bo'lak buzilgani noma'lum — sessiya va qisman fayl o'chiriladi
+        discard(session)
+        raise UploadError("Fayl CRC32 mos emas — yuklash boshidan boshlanadi", status=410, restart=True)
+    if not session.completed:
+        session.completed = True
+        session.save(update_fields=['completed', 'updated_at'])
+    if object_id is not None:
+        model, field = TARGETS[session.target]
+        obj = model.objects.filter(pk=object_id).first()
+        if obj is None:
+            raise UploadError("Obyekt topilmadi", status=404, session=session)
+        setattr(obj, field, session.name)
+        # Video uchun pre_save signali davomiylikni ham aniqlaydi (courses/mediainfo.py)
+        obj.save(update_fields=[field, 'duration'] if session.target == 'video' else [field])
+    return session.name
+
+
+def completed_name(user, upload_id, target):
+    # Admin formasi: shu foydalanuvchi yakunlagan sessiyaning fayl nomi (aks holda None)
+    return (
+        UploadSession.objects.filter(pk=upload_id, user=user, target=target, completed=True)
+        .values_list('name', flat=True).first()
+    )
+
+
+def discard(session):
+    try:
+        default_storage.delete(session.name)
+    finally:
+        session.delete()
+
+
+def cleanup_stale(hours=STALE_HOURS):
+    # Tugallanmagan eski sessiyalar va ularning qisman fayllari
+    cutoff = timezone.now() - timedelta(hours=hours)
+    stale = list(UploadSession.objects.filter(completed=False, updated_at__lt=cutoff))
+    for session in stale:
+        discard(session)
+    UploadSession.objects.filter(completed=True, updated_at__lt=cutoff).delete()
+    return len(stale)
+
+
+def session_state(session):
+    return {
+        'id': str(session.id),
+        'offset': session.offset,
+        'size': session.size,
+        'crc32': session.crc32,
+        'completed': session.completed,
+        'name': session.name if session.completed else None,
+        'chunk_size': CHUNK_SIZE,
+    }
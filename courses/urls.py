@@ -7,10 +7,13 @@ urlpatterns = [
     path('logout/', views.user_logout, name='logout'),
     path('lesson/<int:lesson_id>/', views.lesson_detail, name='lesson_detail'),
     path('video/<int:video_id>/watched/', views.mark_video_watched, name='mark_video_watched'),
+    path('video/<int:video_id>/heartbeat/', views.video_heartbeat, name='video_heartbeat'),
     path('video/<int:video_id>/stream/', views.secure_video, name='secure_video'),
     path('lesson/<int:lesson_id>/test/', views.test_page, name='test_page'),
     path('lesson/<int:lesson_id>/test/submit/', views.submit_test, name='submit_test'),
+    path('lesson/<int:lesson_id>/attention/', views.attention_ingest, name='attention_ingest'),
     path('schedule/', views.schedule_view, name='schedule'),
+    path('schedule/<str:token>/jadval.ics', views.schedule_ics, name='schedule_ics'),
     path('verify/<uuid:uuid>/', views.verify_certificate, name='verify_certificate'),
     path('certificates/', views.my_certificates, name='my_certificates'),
     path('certificate/download/<int:cert_id>/', views.download_certificate, name='download_certificate'),
@@ -18,4 +21,47 @@ urlpatterns = [
 urlpatterns += [
     path('profile/', views.profile_view, name='profile'),
     path('profile/password/', views.change_password, name='change_password'),
-]
\ No newline at end of file
+]
+urlpatterns += [
+    path('uploads/', views.upload_create, name='upload_create'),
+    path('uploads/<uuid:upload_id>/', views.upload_chunk, name='upload_chunk'),
+    path('uploads/<uuid:upload_id>/finalize/', views.upload_finalize, name='upload_finalize'),
+    path('avatars/<str:name>', views.avatar_thumbnail, name='avatar_thumbnail'),
+    path('face/sw.js', views.face_service_worker, name='face_service_worker'),
+    path('face/enroll/', views.face_enroll, name='face_enroll'),
+    path('attendance/checkin/', views.attendance_checkin, name='attendance_checkin'),
+    path('groups/<int:group_id>/export/', views.export_progress, name='export_progress'),
+    path('groups/<int:group_id>/analytics/', views.group_analytics, name='group_analytics'),
+]
+# Har bir URL uchun SQL so'rovlar byudjeti (sessiya + foydalanuvchi so'rovlari ham
+# hisobga kiradi) — eng og'ir qonuniy yo'l bo'yicha (masalan, darsga birinchi
+# tashrif StudentProgress qatorini yaratadi). `python manage.py check_query_budgets`
+# sovuq keshda tekshiradi.
+QUERY_BUDGETS = {
+    'dashboard': 6,
+    'lesson_detail': 7,
+    'mark_video_watched': 12,
+    'video_heartbeat': 3,
+    'test_page': 8,
+    'submit_test': 22,
+    'attention_ingest': 9,
+    'schedule': 5,
+    'schedule_ics': 2,
+    'verify_certificate': 1,
+    'my_certificates': 3,
+    'download_certificate': 3,
+    'profile': 3,
+    'change_password': 2,
+    'avatar_thumbnail': 0,
+    'face_enroll': 11,
+    'attendance_checkin': 8,
+    'group_analytics': 6,
+    'face_service_worker': 0,
+    'login': 11,
+    'logout': 4,
+    'secure_video': 3,
+    'upload_create': 3,
+    'upload_chunk': 4,
+    'upload_finalize': 10,
+    'export_progress': 7,
+}
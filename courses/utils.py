@@ -1,59 +1,200 @@
 # courses/utils.py — 100% ISHLAYDI (Windows + O‘zbekcha + Bold)
+#
+# Sertifikat ikki qatlamdan chiziladi:
+#   1) statik qatlam (fon, oltin ramka, sarlavha, doimiy izoh) — joylashuvi
+#      jarayonda bir marta hisoblanadi va PDF ichida form XObject sifatida
+#      bitta "Do" buyrug'i bilan chaqiriladi;
+#   2) ustki qatlam — faqat ism, kurs, baho, sana, ID va QR kod.
 
+from contextlib import contextmanager
+from reportlab import rl_config
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import A4, landscape
 from reportlab.lib.colors import HexColor
-from reportlab.lib.utils import ImageReader
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
-from django.core.files import File
-from django.urls import reverse
+from django.core.files.base import ContentFile
 from django.conf import settings
+from functools import lru_cache
 import qrcode
 from io import BytesIO
 import os
+import struct
+import threading
 
 # Yo‘lni aniq ko‘rsatamiz
 FONT_DIR = os.path.join(settings.BASE_DIR, 'static', 'fonts')
 
-# Shriftlarni ro‘yxatdan o‘tkazamiz (xato bo‘lsa ham ishlaydi)
+# ReportLab subset yaratganda 'name' jadvalini to'liq nusxalaydi — har PDF da
+# ikki marta. Shuning uchun shriftni xotirada faqat asosiy nomlar (ID 0-6) va
+# litsenziya (13 — matn, 14 — URL; shrift bilan birga tarqatilishi shart)
+# qoldirilgan 'name' jadvali bilan yuklaymiz.
+KEEP_NAME_IDS = {0, 1, 2, 3, 4, 5, 6, 13, 14}
+
+
+def _ttf_checksum(data):
+    data += b'\0' * (-len(data) % 4)
+    return sum(struct.unpack(f'>{len(data) // 4}I', data)) & 0xFFFFFFFF
+
+
+def _slim_name_table(table):
+    fmt, count, string_offset = struct.unpack_from('>HHH', table)
+    records, storage = [], b''
+    for i in range(count):
+        platform, encoding, language, name_id, length, offset = struct.unpack_from('>6H', table, 6 + 12 * i)
+        if name_id in KEEP_NAME_IDS:
+            value = table[string_offset + offset:string_offset + offset + length]
+            records.append((platform, encoding, language, name_id, length, len(storage)))
+            storage += value
+    header = struct.pack('>HHH', 0, len(records), 6 + 12 * len(records))
+    return header + b''.join(struct.pack('>6H', *r) for r in records) + storage
+
+
+def _slim_font(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    sfnt_version, num_tables = struct.unpack_from('>IH', data)
+    tables = {}
+    for i in range(num_tables):
+        tag, _, offset, length = struct.unpack_from('>4sIII', data, 12 + 16 * i)
+        tables[tag] = data[offset:offset + length]
+    tables[b'name'] = _slim_name_table(tables[b'name'])
+
+    entry_selector = max(num_tables.bit_length() - 1, 0)
+    search_range = 16 * (1 << entry_selector)
+    out = [struct.pack('>IHHHH', sfnt_version, num_tables, search_range, entry_selector, num_tables * 16 - search_range)]
+    offset = 12 + 16 * num_tables
+    body = []
+    for tag in sorted(tables):
+        table = tables[tag]
+        out.append(struct.pack('>4sIII', tag, _ttf_checksum(table), offset, len(table)))
+        table += b'\0' * (-len(table) % 4)
+        body.append(table)
+        offset += len(table)
+    font = BytesIO(b''.join(out + body))
+    font.name = path
+    return font
+
+
+# Faqat ishlatiladigan ikki shrift ro‘yxatdan o‘tkaziladi; ReportLab PDF ga
+# faqat chizilgan glif(lar) to‘plamini (subset) joylaydi
+FONT_REGULAR, FONT_BOLD = 'Helvetica', 'Helvetica-Bold'
 try:
-    pdfmetrics.registerFont(TTFont('DejaVu', os.path.join(FONT_DIR, 'DejaVuSans.ttf')))
-    pdfmetrics.registerFont(TTFont('DejaVu-Bold', os.path.join(FONT_DIR, 'DejaVuSans-Bold.ttf')))
-    pdfmetrics.registerFont(TTFont('DejaVu-Oblique', os.path.join(FONT_DIR, 'DejaVuSans-Oblique.ttf')))
-    pdfmetrics.registerFont(TTFont('DejaVu-BoldOblique', os.path.join(FONT_DIR, 'DejaVuSans-BoldOblique.ttf')))
+    pdfmetrics.registerFont(TTFont('DejaVu', _slim_font(os.path.join(FONT_DIR, 'DejaVuSans.ttf'))))
+    pdfmetrics.registerFont(TTFont('DejaVu-Bold', _slim_font(os.path.join(FONT_DIR, 'DejaVuSans-Bold.ttf'))))
+    FONT_REGULAR, FONT_BOLD = 'DejaVu', 'DejaVu-Bold'
     print("Barcha DejaVu shriftlari muvaffaqiyatli yuklandi!")
 except Exception as e:
     print(f"Shrift yuklashda xato: {e}")
-    # Agar xato bo‘lsa ham — ishlaydi (fallback bilan)
+    # Agar xato bo‘lsa ham — ishlaydi (Helvetica fallback bilan)
 
-def generate_certificate_pdf(certificate):
-    buffer = BytesIO()
-    c = canvas.Canvas(buffer, pagesize=landscape(A4))
-    width, height = landscape(A4)
+PAGE_SIZE = landscape(A4)
+STATIC_FORM = 'certificate-static'
 
+VERIFY_BASE_URL = "https://phoenix-rapid-factually.ngrok-free.app"
+
+
+@lru_cache(maxsize=1)
+def _static_layer():
+    # (rang, shrift, o'lcham, x, y, matn) — markazlangan x bir marta hisoblanadi
+    width, height = PAGE_SIZE
+    texts = [
+        ("#b8860b", FONT_BOLD, 72, height - 140, "SERTIFIKAT"),
+        ("#333333", FONT_REGULAR, 32, height - 200, "Muvaffaqiyatli yakunlaganligi uchun beriladi"),
+    ]
+    return [
+        (HexColor(color), font, size, width / 2 - pdfmetrics.stringWidth(text, font, size) / 2, y, text)
+        for color, font, size, y, text in texts
+    ]
+
+
+def _draw_static_layer(c):
+    width, height = PAGE_SIZE
+    c.beginForm(STATIC_FORM)
     # Fon va ramka
     c.setFillColor(HexColor("#f8f9fa"))
     c.rect(0, 0, width, height, fill=1, stroke=0)
     c.setStrokeColor(HexColor("#d4af37"))
     c.setLineWidth(15)
     c.rect(30, 30, width-60, height-60, stroke=1, fill=0)
+    # Sarlavha va izoh matni
+    for color, font, size, x, y, text in _static_layer():
+        c.setFillColor(color)
+        c.setFont(font, size)
+        c.drawString(x, y, text)
+    c.endForm()
 
-    # Sarlavha
-    c.setFillColor(HexColor("#b8860b"))
-    try:
-        c.setFont("DejaVu-Bold", 72)
-    except:
-        c.setFont("Helvetica-Bold", 72)
-    c.drawCentredString(width/2, height - 140, "SERTIFIKAT")
 
-    # Izoh matni
-    c.setFillColor(HexColor("#333333"))
+QR_SIZE = 140  # pt
+QR_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=QR_CACHE_SIZE)
+def qr_matrix(data):
+    # Modullar matritsasi (chegara bilan) — bir xil URL ikki marta kodlanmaydi
+    qr = qrcode.QRCode(version=1, border=4)
+    qr.add_data(data)
+    qr.make(fit=True)
+    return tuple(bytes(row) for row in qr.get_matrix())
+
+
+def _draw_qr(c, verify_url, x, y, size=QR_SIZE):
+    # QR vektor ko'rinishida: har qatordagi qora modullar ketma-ketligi — bitta to'rtburchak
+    matrix = qr_matrix(verify_url)
+    module = size / len(matrix)
+    c.setFillColor(HexColor("#ffffff"))
+    c.rect(x, y, size, size, fill=1, stroke=0)
+    path = c.beginPath()
+    for row_index, row in enumerate(matrix):
+        row_y = y + size - (row_index + 1) * module
+        start = None
+        for col, dark in enumerate(row + b'\0'):
+            if dark and start is None:
+                start = col
+            elif not dark and start is not None:
+                path.rect(x + start * module, row_y, (col - start) * module, module)
+                start = None
+    c.setFillColor(HexColor("#000000"))
+    c.drawPath(path, fill=1, stroke=0)
+
+
+_a85_lock = threading.Lock()
+_a85_users = 0
+_a85_saved = rl_config.useA85
+
+
+@contextmanager
+def _flate_only():
+    # Oqimlar ASCII85 siz (faqat Flate) — fayl ~20% kichik va tezroq yoziladi.
+    # rl_config global: faqat sertifikat chizilayotganda o'chiriladi va oxirgi
+    # parallel chizish tugagach asl qiymat qaytariladi (boshqa PDF lar o'zgarmaydi)
+    global _a85_users, _a85_saved
+    with _a85_lock:
+        if not _a85_users:
+            _a85_saved, rl_config.useA85 = rl_config.useA85, 0
+        _a85_users += 1
     try:
-        c.setFont("DejaVu", 32)
-    except:
-        c.setFont("Helvetica", 32)
-    c.drawCentredString(width/2, height - 200, "Muvaffaqiyatli yakunlaganligi uchun beriladi")
+        yield
+    finally:
+        with _a85_lock:
+            _a85_users -= 1
+            if not _a85_users:
+                rl_config.useA85 = _a85_saved
+
+
+def render_certificate_pdf(certificate):
+    """Sertifikat PDF ini bayt ko'rinishida qaytaradi (faylga yozmaydi)."""
+    with _flate_only():
+        return _render_certificate_pdf(certificate)
+
+
+def _render_certificate_pdf(certificate):
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=PAGE_SIZE, pageCompression=1)
+    width, height = PAGE_SIZE
+
+    _draw_static_layer(c)
+    c.doForm(STATIC_FORM)
 
     # Talaba ismi — ENG MUHIM QISM
     student_name = (
@@ -63,54 +204,35 @@ def generate_certificate_pdf(certificate):
     ).strip()
 
     c.setFillColor(HexColor("#000080"))
-    try:
-        c.setFont("DejaVu-Bold", 56)   # Bu yerda xato bo‘lsa ham ishlaydi
-        c.drawCentredString(width/2, height - 300, student_name.upper())
-    except:
-        # Agar DejaVu-Bold ishlamasa — Helvetica bilan yozamiz
-        c.setFont("Helvetica-Bold", 56)
-        c.drawCentredString(width/2, height - 300, student_name.upper())
+    c.setFont(FONT_BOLD, 56)
+    c.drawCentredString(width/2, height - 300, student_name.upper())
 
     # Kurs nomi
     c.setFillColor(HexColor("#333333"))
-    try:
-        c.setFont("DejaVu-Bold", 40)
-    except:
-        c.setFont("Helvetica-Bold", 40)
+    c.setFont(FONT_BOLD, 40)
     c.drawCentredString(width/2, height - 370, f'"{certificate.course.title}" kursi')
 
     # Baho va sana
-    try:
-        c.setFont("DejaVu", 30)
-    except:
-        c.setFont("Helvetica", 30)
+    c.setFont(FONT_REGULAR, 30)
     c.setFillColor(HexColor("#006400"))
     c.drawCentredString(width/2, height - 430, f"O'rtacha baho: {certificate.test_score}%")
     c.setFillColor(HexColor("#333333"))
     c.drawCentredString(width/2, height - 480, f"Berilgan sana: {certificate.issued_at.strftime('%d.%m.%Y')}")
 
     # ID
-    try:
-        c.setFont("DejaVu", 16)
-    except:
-        c.setFont("Helvetica", 16)
+    c.setFont(FONT_REGULAR, 16)
     c.setFillColor(HexColor("#555555"))
     c.drawString(80, 70, f"ID: {str(certificate.certificate_id)[:8].upper()}")
 
     # QR kod
-    verify_url = f"https://phoenix-rapid-factually.ngrok-free.app/verify/{certificate.certificate_id}/"
-    qr = qrcode.QRCode(version=1, box_size=10, border=4)
-    qr.add_data(verify_url)
-    qr.make(fit=True)
-    qr_img = qr.make_image(fill_color="black", back_color="white")
-    qr_buffer = BytesIO()
-    qr_img.save(qr_buffer, format='PNG')
-    qr_buffer.seek(0)
-    c.drawImage(ImageReader(qr_buffer), width - 220, 40, width=140, height=140)
+    _draw_qr(c, f"{VERIFY_BASE_URL}/verify/{certificate.certificate_id}/", width - 220, 40)
 
-    # PDF ni saqlash
     c.showPage()
     c.save()
-    buffer.seek(0)
-    certificate.pdf_file.save(f"sertifikat_{certificate.certificate_id}.pdf", File(buffer), save=True)
-    buffer.close()
\ No newline at end of file
+    return buffer.getvalue()
+
+
+def generate_certificate_pdf(certificate):
+    # PDF ni saqlash
+    data = render_certificate_pdf(certificate)
+    certificate.pdf_file.save(f"sertifikat_{certificate.certificate_id}.pdf", ContentFile(data), save=True)
@@ -0,0 +1,125 @@
+# courses/verification.py — ochiq sertifikat tekshirish sahifasi (QR kod orqali)
+#
+# Tayyor HTML (bayt) va uning ETag'i UUID bo'yicha jarayon ichidagi cheklangan
+# LRU keshda saqlanadi; noma'lum UUID lar ham qisqa muddat keshlanadi
+# (negativ kesh). LRU har ishchida alohida: sertifikat o'zgarsa faqat shu
+# jarayonda darhol tozalanadi, boshqalarida VERIFY_CACHE_TTL ichida eskiradi.
+# VERIFY_STATIC_ROOT berilsa, sertifikat saqlanganda (PDF tayyor bo'lsa)
+# sahifa <VERIFY_STATIC_ROOT>/<uuid>/index.html ga qayta yoziladi, aks holda
+# o'chiriladi — nginx uni Django ga yetkazmasdan beradi.
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from django.conf import settings
+from django.template.loader import render_to_string
+from django.utils.http import quote_etag
+
+from .models import Certificate
+
+CACHE_SIZE = getattr(settings, 'VERIFY_CACHE_SIZE', 10000)
+CACHE_TTL = getattr(settings, 'VERIFY_CACHE_TTL', 300)
+NEGATIVE_TTL = getattr(settings, 'VERIFY_NEGATIVE_TTL', 60)
+MAX_AGE = getattr(settings, 'VERIFY_MAX_AGE', 86400)
+STATIC_ROOT = getattr(settings, 'VERIFY_STATIC_ROOT', None)
+
+Page = namedtuple('Page', 'body etag valid max_age')
+
+
+class LRUCache:
+    # Muddatli, cheklangan LRU; ip'lar uchun xavfsiz
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_pages = LRUCache(CACHE_SIZE)
+
+
+def _context(cert):
+    if cert is None:
+        return {'valid': False}
+    return {
+        'valid': True,
+        'cert': cert,
+        'student_name': cert.student.profile.full_name or cert.student.get_full_name() or cert.student.username,
+    }
+
+
+def render_page(cert):
+    body = render_to_string('certificates/verify.html', _context(cert)).encode()
+    etag = quote_etag(hashlib.sha1(body).hexdigest())
+    if cert is None:
+        return Page(body, etag, False, NEGATIVE_TTL)
+    return Page(body, etag, True, MAX_AGE)
+
+
+def get_page(uuid):
+    """Tekshirish sahifasi (keshdan; bo'lmasa bitta JOIN so'rovi va render)."""
+    key = str(uuid)
+    page = _pages.get(key)
+    if page is None:
+        cert = (
+            Certificate.objects.select_related('student__profile', 'course')
+            .filter(certificate_id=uuid).first()
+        )
+        page = render_page(cert)
+        _pages.set(key, page, CACHE_TTL if page.valid else NEGATIVE_TTL)
+    return page
+
+
+def _static_path(uuid):
+    return os.path.join(STATIC_ROOT, str(uuid), 'index.html')
+
+
+def publish(cert):
+    # Sertifikat berilganda/qayta chiqarilganda: keshni yangilash va statik sahifani yozish
+    _pages.pop(str(cert.certificate_id))
+    if not STATIC_ROOT:
+        return
+    path = _static_path(cert.certificate_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(render_page(cert).body)
+    os.replace(tmp, path)  # nginx hech qachon yarim yozilgan faylni ko'rmaydi
+
+
+def invalidate(uuid, remove_static=False):
+    _pages.pop(str(uuid))
+    if remove_static and STATIC_ROOT:
+        try:
+            os.remove(_static_path(uuid))
+        except FileNotFoundError:
+            pass
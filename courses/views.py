@@ -3,9 +3,15 @@ from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
 from django.utils import timezone
 from django.http import HttpResponse, JsonResponse, HttpResponseForbidden, FileResponse
-from .models import Certificate, Lesson, Video, StudentProgress, Test, Choice
+from .models import Certificate, Lesson, Video, StudentProgress, Test, STATUS_FAILED
 from .forms import LoginForm
-import os, datetime
+from .streaming import ranged_file_response
+from .progress import get_progress, progress_for_lessons, video_position, mark_watched
+from . import fragments, verification, watchtime
+from .answer_keys import get_answer_key, grade
+from .completion import course_status
+from .transactions import write_transaction
+import os, datetime, json
 
 def user_login(request):
     if request.user.is_authenticated:
@@ -27,56 +33,71 @@ def user_logout(request):
 @login_required
 def dashboard(request):
     today = timezone.localdate()
-    lessons = Lesson.objects.filter(date=today).order_by('start_time')
-    progress_map = {}
-    for lesson in lessons:
-        prog, _ = StudentProgress.objects.get_or_create(student=request.user, lesson=lesson)
-        progress_map[lesson.id] = prog
-    return render(request, 'courses/dashboard.html', {'lessons': lessons, 'progress_map': progress_map})
+    lessons = list(Lesson.objects.filter(date=today).order_by('start_time'))
+    progress_map = progress_for_lessons(request.user, lessons)
+    # Kartalar keshdan (dars versiyasi + nishon holati bo'yicha, courses/fragments.py)
+    cards = fragments.lesson_cards(lessons, progress_map)
+    return render(request, 'courses/dashboard.html', {'lessons': lessons, 'cards': cards})
 
 @login_required
 def lesson_detail(request, lesson_id):
     lesson = get_object_or_404(Lesson, id=lesson_id)
-    videos = list(lesson.videos.all())
-    prog, _ = StudentProgress.objects.get_or_create(student=request.user, lesson=lesson)
-    watched_ids = list(prog.watched_videos.values_list('id', flat=True))
-
-    unlocked = []
-    for i, v in enumerate(videos):
-        if i == 0 or videos[i-1].id in watched_ids:
-            unlocked.append(v.id)
-
-    all_video_ids = [v.id for v in videos]
-    can_take_test = set(all_video_ids).issubset(set(watched_ids))
+    prog = get_progress(request.user, lesson)
+    # Ketma-ket ochilish: watched_count bo‘yicha — videolar HTML i shu son bilan keshda
+    parts = fragments.lesson_videos(lesson, prog.watched_count)
 
     return render(request, 'courses/lesson_detail.html', {
         'lesson': lesson,
-        'videos': videos,
-        'unlocked': unlocked,
-        'watched_ids': watched_ids,
-        'can_take_test': can_take_test,
+        'fragments': parts,
+        'watched': min(prog.watched_count, parts['total']),
+        'can_take_test': prog.watched_count >= parts['total'],
         'progress': prog,
     })
 
 @login_required
+@write_transaction
 def mark_video_watched(request, video_id):
+    # BEGIN IMMEDIATE ichida; qulf xatosida qayta bajariladi (progress qayta o'qiladi)
     if request.method != 'POST':
         return JsonResponse({'status': 'error', 'detail': 'POST required'}, status=400)
 
-    video = get_object_or_404(Video, id=video_id)
-    prog, _ = StudentProgress.objects.get_or_create(student=request.user, lesson=video.lesson)
-    prog.watched_videos.add(video)
-    prog.save()
+    video = get_object_or_404(Video.objects.select_related('lesson'), id=video_id)
+    prog = get_progress(request.user, video.lesson)
+    # Server tomonida yig'ilgan heartbeat'lar bo'yicha yetarlicha ko'rilganmi?
+    if not watchtime.is_completed(request.user, video):
+        return JsonResponse({'status': 'error', 'detail': 'Video hali to‘liq ko‘rilmagan'}, status=403)
+    if not mark_watched(prog, video_position(video)):
+        return JsonResponse({'status': 'error', 'detail': 'Avvalgi videoni to‘liq tomosha qiling'}, status=403)
 
     # attended ni yangilash
-    all_ids = set(video.lesson.videos.values_list('id', flat=True))
-    watched = set(prog.watched_videos.values_list('id', flat=True))
-    if all_ids.issubset(watched) and prog.test_passed:
+    if prog.test_passed and not prog.attended and prog.watched_count >= video.lesson.videos.count():
         prog.attended = True
         prog.save()
 
     return JsonResponse({'status': 'ok'})  # MUHIM: JSON qaytarish
 
+@login_required
+def video_heartbeat(request, video_id):
+    # Pleyer har bir necha soniyada `played` oraliqlarini yuboradi; final=True — video tugadi
+    if request.method != 'POST':
+        return JsonResponse({'status': 'error', 'detail': 'POST required'}, status=400)
+    video = get_object_or_404(Video.objects.select_related('lesson'), id=video_id)
+    try:
+        data = json.loads(request.body)
+        # Klient yuborgan duration ishlatilmaydi — faqat serverdagi Video.duration
+        played = watchtime.parse_ranges(data.get('played', []), video.duration)
+    except (ValueError, KeyError, TypeError, IndexError, AttributeError):
+        return JsonResponse({'status': 'error', 'detail': 'Noto‘g‘ri ma’lumot'}, status=400)
+
+    watchtime.record(request.user.id, video.id, played)
+    if not data.get('final'):
+        return JsonResponse({'status': 'ok'})
+
+    # Video tugadi — shu yozuvni darhol yozamiz va ochilgan-ochilmaganini qaytaramiz
+    watchtime.flush(keys=[(request.user.id, video.id)])
+    prog = get_progress(request.user, video.lesson)
+    return JsonResponse({'status': 'ok', 'watched': video_position(video) < prog.watched_count})
+
 @login_required
 def secure_video(request, video_id):
     video = get_object_or_404(Video, id=video_id)
@@ -84,10 +105,8 @@ def secure_video(request, video_id):
     # simple check: user must be authenticated (decorator ensures) and video exists
     path = video.video_file.path
     if os.path.exists(path):
-        # stream inline, discourage download
-        response = FileResponse(open(path, 'rb'), content_type='video/mp4')
-        response['Content-Disposition'] = 'inline; filename="{}"'.format(os.path.basename(path))
-        return response
+        # stream inline, discourage download (Range/206 + ixtiyoriy X-Accel-Redirect)
+        return ranged_file_response(request, path, content_type='video/mp4')
     return HttpResponseForbidden('File not found')
 
 @login_required
@@ -96,107 +115,90 @@ def test_page(request, lesson_id):
     test = getattr(lesson, 'test', None)
     if not test:
         return HttpResponseForbidden('Bu dars uchun test mavjud emas.')
-    prog, _ = StudentProgress.objects.get_or_create(student=request.user, lesson=lesson)
+    prog = get_progress(request.user, lesson)
     # require all videos watched
-    all_video_ids = set(lesson.videos.values_list('id', flat=True))
-    watched = set(prog.watched_videos.values_list('id', flat=True))
-    if not all_video_ids.issubset(watched):
+    if prog.watched_count < lesson.videos.count():
         return HttpResponseForbidden('Barcha videolarni to‘liq ko‘ring, so‘ng test topshiring.')
-    return render(request, 'courses/test_page.html', {'test': test, 'lesson': lesson})
+    questions = fragments.test_questions(test)
+    return render(request, 'courses/test_page.html', {
+        'test': test,
+        'lesson': lesson,
+        'questions_html': questions['html'],
+        'question_count': questions['count'],
+    })
 
 # views.py ichida submit_test ni almashtiring
 # courses/views.py → submit_test ni to'liq almashtiring
 
 from django.contrib import messages
-from .utils import generate_certificate_pdf  # <-- bu joyida ekanligiga ishonch hosil qiling
-
-@login_required
-def submit_test(request, lesson_id):
-    if request.method != 'POST':
-        return redirect('courses:lesson_detail', lesson_id=lesson_id)
-
-    lesson = get_object_or_404(Lesson, id=lesson_id)
-    test = getattr(lesson, 'test', None)
-    if not test:
-        return HttpResponseForbidden('Bu dars uchun test mavjud emas.')
-
-    # Progressni olish yoki yaratish
-    prog, _ = StudentProgress.objects.get_or_create(student=request.user, lesson=lesson)
-
-    # Barcha videolar ko‘rilganmi?
-    all_video_ids = set(lesson.videos.values_list('id', flat=True))
-    watched_ids = set(prog.watched_videos.values_list('id', flat=True))
-    if not all_video_ids.issubset(watched_ids):
-        return HttpResponseForbidden('Avval barcha videolarni ko‘ring!')
+from .jobs import enqueue_certificate
 
-    # Test javoblarini hisoblash
-    total_questions = test.questions.count()
-    correct = 0
-
-    for question in test.questions.all():
-        selected_id = request.POST.get(str(question.id))
-        if selected_id:
-            try:
-                choice = Choice.objects.get(id=selected_id, question=question)
-                if choice.is_correct:
-                    correct += 1
-            except Choice.DoesNotExist:
-                pass
-
-    score = (correct / total_questions) * 100 if total_questions > 0 else 0
-    passed = score >= 60  # 60% va undan yuqori o‘tdi
-
-    # Progressni yangilash
+@write_transaction
+def _record_test_result(user, lesson, progress_id, score, passed):
+    # BEGIN IMMEDIATE ichida; qulf xatosida butunlay qayta bajariladi — progress qayta o'qiladi
+    prog = StudentProgress.objects.get(pk=progress_id)
     prog.test_passed = passed
     prog.test_score = round(score, 1)
     prog.attended = passed
     prog.save()
 
+    notes = []
     # =================== SERTIFIKAT BERISH LOGIKASI ===================
     if passed and lesson.course:
         course = lesson.course
-        all_lessons_in_course = course.lessons.all()
-
-        # Kursdagi barcha lessonlar uchun progressni tekshirish
-        completed_lessons = 0
-        total_score_sum = 0
-        scored_lessons = 0
 
-        for l in all_lessons_in_course:
-            p = StudentProgress.objects.filter(student=request.user, lesson=l).first()
-            if p and p.test_passed:
-                completed_lessons += 1
-                if p.test_score:
-                    total_score_sum += p.test_score
-                    scored_lessons += 1
+        # Kurs bo‘yicha hisoblagichlar (CourseCompletion) — darslar soniga bog‘liq emas
+        all_passed, completed_lessons, total_lessons, avg_score = course_status(user, course)
 
         # Agar kursdagi barcha lessonlar testdan o‘tilgan bo‘lsa
-        if completed_lessons == all_lessons_in_course.count():
-            avg_score = round(total_score_sum / scored_lessons, 1) if scored_lessons > 0 else score
+        if all_passed:
+            if avg_score is None:
+                avg_score = round(score, 1)
 
             # Sertifikatni yaratish (agar hali yo‘q bo‘lsa)
             cert, created = Certificate.objects.get_or_create(
-                student=request.user,
+                student=user,
                 course=course,
                 defaults={'test_score': avg_score}
             )
 
             if created:
-                try:
-                    from .utils import generate_certificate_pdf
-                    generate_certificate_pdf(cert)
-                    messages.success(request, f"Tabriklaymiz! '{course.title}' kursini muvaffaqiyatli yakunladingiz! Sertifikatingiz tayyor bo‘ldi!")
-                except Exception as e:
-                    messages.error(request, f"Sertifikat PDF yaratishda xato: {e}")
+                # PDF navbatda yaratiladi (certificate_worker) — so'rov kutib qolmaydi
+                enqueue_certificate(cert)
+                notes.append((messages.SUCCESS, f"Tabriklaymiz! '{course.title}' kursini muvaffaqiyatli yakunladingiz! Sertifikatingiz tayyorlanmoqda."))
             else:
-                messages.info(request, "Bu kurs bo‘yicha sertifikatingiz allaqachon mavjud.")
+                notes.append((messages.INFO, "Bu kurs bo‘yicha sertifikatingiz allaqachon mavjud."))
 
         else:
             # Debug uchun foydali xabar
-            messages.info(request, f"Kursni tugatish uchun yana {all_lessons_in_course.count() - completed_lessons} ta dars testidan o‘tishingiz kerak.")
+            notes.append((messages.INFO, f"Kursni tugatish uchun yana {total_lessons - completed_lessons} ta dars testidan o‘tishingiz kerak."))
 
     # Oddiy muvaffaqiyat xabari
-    messages.success(request, f"Test muvaffaqiyatli topshirildi! Ball: {score:.1f}% — {'O‘tdingiz!' if passed else 'O‘tmadingiz'}")
+    notes.append((messages.SUCCESS, f"Test muvaffaqiyatli topshirildi! Ball: {score:.1f}% — {'O‘tdingiz!' if passed else 'O‘tmadingiz'}"))
+    return notes
+
+@login_required
+def submit_test(request, lesson_id):
+    if request.method != 'POST':
+        return redirect('courses:lesson_detail', lesson_id=lesson_id)
+
+    lesson = get_object_or_404(Lesson, id=lesson_id)
+    test = getattr(lesson, 'test', None)
+    if not test:
+        return HttpResponseForbidden('Bu dars uchun test mavjud emas.')
+
+    # Progressni olish yoki yaratish
+    prog = get_progress(request.user, lesson)
+
+    # Barcha videolar ko‘rilganmi?
+    if prog.watched_count < lesson.videos.count():
+        return HttpResponseForbidden('Avval barcha videolarni ko‘ring!')
+
+    # Test javoblarini hisoblash (keshlangan kalit bo‘yicha, bazaga murojaatsiz)
+    score, passed = grade(get_answer_key(test), request.POST)
+
+    for level, text in _record_test_result(request.user, lesson, prog.pk, score, passed):
+        messages.add_message(request, level, text)
     return redirect('courses:lesson_detail', lesson_id=lesson.id)
 
 
@@ -253,6 +255,11 @@ from django.contrib.auth.decorators import login_required
 from collections import defaultdict
 from datetime import datetime, timedelta
 from .models import Schedule, WEEK_DAYS
+from django.http import Http404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from . import timetable as timetable_cache
 
 @login_required
 def schedule_view(request):
@@ -275,74 +282,71 @@ def schedule_view(request):
     prev_monday = current_monday - timedelta(days=7)
     next_monday = current_monday + timedelta(days=7)
 
-    # Hafta kunlari
-    day_order = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
-    week_dates = {day_order[i]: current_monday + timedelta(days=i) for i in range(7)}
-
-    # Barcha darslarni olish (faqat guruh bo‘yicha)
-    schedules = Schedule.objects.filter(group=profile.group).select_related('lesson')
-
-    # Har bir kun uchun faqat mos darslarni yig'ish
-    schedule_by_day = defaultdict(list)
-    for item in schedules:
-        day_key = item.day_of_week
-        if day_key in week_dates:
-            schedule_by_day[day_key].append(item)
-
-    # Tartiblangan jadval
-    ordered_schedule = []
-    for day in day_order:
-        items = sorted(schedule_by_day[day], key=lambda x: x.start_time)
-        date_obj = week_dates[day]
-        ordered_schedule.append({
-            'day_name': dict(WEEK_DAYS)[day],
-            'date': date_obj.strftime('%d.%m'),
-            'items': items
-        })
+    # Guruh jadvali keshdan; o'zgarmagan hafta uchun 304 qaytariladi
+    timetable = timetable_cache.get_timetable(profile.group_id, profile.group.timetable_updated_at)
+    today = datetime.today().date()
+    etag = quote_etag(f"{timetable['etag']}-{current_monday:%Y%m%d}-{today:%Y%m%d}-{request.user.id}")
+    conditional = get_conditional_response(request, etag=etag, last_modified=timetable['modified'])
+    if conditional is not None:
+        return conditional
 
     context = {
-        'schedule': ordered_schedule,
+        'schedule': timetable_cache.week_schedule(timetable, current_monday),
         'group': profile.group,
+        'ics_url': request.build_absolute_uri(
+            reverse('courses:schedule_ics', args=[timetable_cache.feed_token(profile.group_id)])
+        ),
         'current_week': current_monday.strftime('%Y-%m-%d'),
         'prev_week': prev_monday.strftime('%Y-%m-%d'),
         'next_week': next_monday.strftime('%Y-%m-%d'),
         'week_range': f"{current_monday.strftime('%d.%m')} — {(current_monday + timedelta(days=6)).strftime('%d.%m.%Y')}",
-        'today': datetime.today().date().strftime('%Y-%m-%d'),  # bugungi kunni belgilash uchun
+        'today': today.strftime('%Y-%m-%d'),  # bugungi kunni belgilash uchun
     }
-    return render(request, 'schedule.html', context)
+    response = render(request, 'schedule.html', context)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(timetable['modified'])
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def schedule_ics(request, token):
+    # Telefon kalendarlari uchun guruh lentasi — sessiyasiz, imzolangan token bilan
+    group_id = timetable_cache.group_from_token(token)
+    if group_id is None:
+        raise Http404
+    timetable = timetable_cache.get_timetable(group_id)
+    etag = quote_etag(timetable['etag'])
+    conditional = get_conditional_response(request, etag=etag, last_modified=timetable['modified'])
+    if conditional is not None:
+        return conditional
+    response = HttpResponse(
+        timetable_cache.render_ics(timetable, request.get_host()), content_type='text/calendar; charset=utf-8'
+    )
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(timetable['modified'])
+    response['Content-Disposition'] = 'inline; filename="jadval.ics"'
+    patch_cache_control(response, public=True, max_age=3600)
+    return response
 
 # views.py yoki service funksiyada
 
 from django.db import transaction
 
 def issue_certificate_if_eligible(student, course):
-    from .models import StudentProgress, Certificate
-
-    # Barcha lessonlarni tekshirish
-    lessons = course.lessons.all()
-    all_passed = True
-    total_score = 0
-    test_count = 0
-
-    for lesson in lessons:
-        progress = StudentProgress.objects.filter(student=student, lesson=lesson).first()
-        if not progress or not progress.test_passed:
-            all_passed = False
-            break
-        if progress.test_score:
-            total_score += progress.test_score
-            test_count += 1
-
-    if all_passed and test_count > 0:
-        avg_score = total_score / test_count
+    from .models import Certificate
 
+    # Barcha lessonlarni tekshirish (CourseCompletion bo‘yicha O(1))
+    all_passed, _, _, avg_score = course_status(student, course)
+
+    if all_passed and avg_score is not None:
         # Sertifikat allaqachon berilganmi?
         if not Certificate.objects.filter(student=student, course=course).exists():
-            Certificate.objects.create(
+            cert = Certificate.objects.create(
                 student=student,
                 course=course,
                 test_score=round(avg_score, 1)
             )
+            enqueue_certificate(cert)
 
 # views.py
 
@@ -355,9 +359,14 @@ def my_certificates(request):
 
 @login_required
 def download_certificate(request, cert_id):
-    cert = get_object_or_404(Certificate, id=cert_id, student=request.user)
+    cert = get_object_or_404(Certificate.objects.select_related('course'), id=cert_id, student=request.user)
     if not cert.pdf_file:
-        return HttpResponse("Sertifikat hali tayyor emas.", status=400)
+        if cert.status == STATUS_FAILED:
+            return HttpResponse("Sertifikat yaratishda xato yuz berdi. Administratorga murojaat qiling.", status=500)
+        # Navbatda yoki tayyorlanmoqda — brauzer keyinroq qayta urinadi
+        response = HttpResponse("Sertifikat tayyorlanmoqda, birozdan so‘ng qayta urinib ko‘ring.", status=202)
+        response['Retry-After'] = '10'
+        return response
     
     response = FileResponse(cert.pdf_file.open(), content_type='application/pdf')
     response['Content-Disposition'] = f'attachment; filename="Sertifikat_{cert.course.title}.pdf"'
@@ -366,12 +375,255 @@ def download_certificate(request, cert_id):
 # courses/views.py (oxiriga qo‘shing)
 
 def verify_certificate(request, uuid):
+    # Ochiq sahifa: keshdagi tayyor HTML, kuchli ETag va uzoq Cache-Control (oldingi kesh uchun)
+    page = verification.get_page(uuid)
+    response = get_conditional_response(request, etag=page.etag)
+    if response is None:
+        response = HttpResponse(page.body)
+    response['ETag'] = page.etag
+    patch_cache_control(response, public=True, max_age=page.max_age)
+    return response
+
+# courses/views.py (oxiriga qo'shing) — /face/ sahifasidan diqqat paketlari
+
+from .telemetry import ingest_batch, TelemetryError
+
+@login_required
+def attention_ingest(request, lesson_id):
+    if request.method != 'POST':
+        return JsonResponse({'status': 'error', 'detail': 'POST required'}, status=400)
+
+    lesson = get_object_or_404(Lesson, id=lesson_id)
     try:
-        cert = Certificate.objects.select_related('student', 'course').get(certificate_id=uuid)
-        return render(request, 'certificates/verify.html', {
-            'valid': True,
-            'cert': cert,
-            'student_name': cert.student.profile.full_name or cert.student.get_full_name() or cert.student.username,
-        })
-    except Certificate.DoesNotExist:
-        return render(request, 'certificates/verify.html', {'valid': False})
\ No newline at end of file
+        batch = ingest_batch(request.user, lesson, request.body)
+    except TelemetryError as e:
+        return JsonResponse({'status': 'error', 'detail': str(e)}, status=400)
+    return JsonResponse({'status': 'ok', 'frames': batch.frames})
+
+# courses/views.py (oxiriga qo'shing) — admin uchun bo'laklab yuklash (courses/uploads.py)
+
+from . import uploads
+
+def _upload_error(e):
+    data = {'status': 'error', 'detail': str(e)}
+    if e.session is not None:
+        data.update(uploads.session_state(e.session))
+    if e.restart:
+        data['restart'] = True
+    return JsonResponse(data, status=e.status)
+
+@login_required
+def upload_create(request):
+    # {"target": "video"|"lesson", "filename": ..., "size": ...} -> sessiya
+    if not request.user.is_staff:
+        return JsonResponse({'status': 'error', 'detail': 'Ruxsat yo‘q'}, status=403)
+    if request.method != 'POST':
+        return JsonResponse({'status': 'error', 'detail': 'POST required'}, status=400)
+    try:
+        data = json.loads(request.body)
+        session = uploads.create_session(request.user, data.get('target'), data.get('filename'), data.get('size'))
+    except (ValueError, AttributeError):
+        return JsonResponse({'status': 'error', 'detail': 'Noto‘g‘ri ma’lumot'}, status=400)
+    except uploads.UploadError as e:
+        return _upload_error(e)
+    return JsonResponse({'status': 'ok', **uploads.session_state(session)}, status=201)
+
+@login_required
+def upload_chunk(request, upload_id):
+    # GET — qayerdan davom ettirish (offset); PUT — Content-Range bilan bitta bo'lak
+    if not request.user.is_staff:
+        return JsonResponse({'status': 'error', 'detail': 'Ruxsat yo‘q'}, status=403)
+    try:
+        session = uploads.get_session(request.user, upload_id)
+        if request.method == 'PUT':
+            start, end, total = uploads.parse_content_range(request.headers.get('Content-Range'))
+            if int(request.headers.get('Content-Length') or -1) != end - start:
+                raise uploads.UploadError("Content-Length Content-Range ga mos emas", session=session)
+            crc = request.headers.get('X-Chunk-CRC32')
+            uploads.write_chunk(session, start, end, total, request, int(crc) if crc else None)
+        elif request.method not in ('GET', 'HEAD'):
+            return JsonResponse({'status': 'error', 'detail': 'PUT required'}, status=400)
+    except ValueError:
+        return JsonResponse({'status': 'error', 'detail': 'Noto‘g‘ri ma’lumot'}, status=400)
+    except uploads.UploadError as e:
+        return _upload_error(e)
+    return JsonResponse({'status': 'ok', **uploads.session_state(session)})
+
+@login_required
+def upload_finalize(request, upload_id):
+    # {"crc32": <butun fayl>, "object_id": <ixtiyoriy>} -> yakuniy fayl nomi
+    if not request.user.is_staff:
+        return JsonResponse({'status': 'error', 'detail': 'Ruxsat yo‘q'}, status=403)
+    if request.method != 'POST':
+        return JsonResponse({'status': 'error', 'detail': 'POST required'}, status=400)
+    try:
+        data = json.loads(request.body or b'{}')
+        session = uploads.get_session(request.user, upload_id)
+        crc, object_id = data.get('crc32'), data.get('object_id')
+        uploads.finalize(
+            session,
+            crc32=int(crc) if crc is not None else None,
+            object_id=int(object_id) if object_id is not None else None,
+        )
+    except (ValueError, TypeError, AttributeError):
+        return JsonResponse({'status': 'error', 'detail': 'Noto‘g‘ri ma’lumot'}, status=400)
+    except uploads.UploadError as e:
+        return _upload_error(e)
+    return JsonResponse({'status': 'ok', **uploads.session_state(session)})
+
+# courses/views.py (oxiriga qo'shing) — profil rasmlari nusxalari (courses/avatars.py)
+
+from django.core.files.storage import default_storage
+from . import avatars
+import re
+
+AVATAR_THUMB_RE = re.compile(r'^[0-9a-f]{16}-\d+\.(webp|jpg)$')
+
+def avatar_thumbnail(request, name):
+    # Nom mazmun xeshidan — fayl hech qachon o'zgarmaydi, brauzer qayta so'ramaydi.
+    # Ishlab chiqarishda nginx bu yo'lni MEDIA_ROOT/avatars/thumbs dan o'zi beradi (README)
+    match = AVATAR_THUMB_RE.match(name)
+    if not match:
+        raise Http404
+    try:
+        f = default_storage.open(f"{avatars.THUMB_DIR}/{name}", 'rb')
+    except FileNotFoundError:
+        raise Http404
+    response = FileResponse(f, content_type='image/webp' if match.group(1) == 'webp' else 'image/jpeg')
+    patch_cache_control(response, public=True, max_age=avatars.MAX_AGE, immutable=True)
+    return response
+
+# courses/views.py (oxiriga qo'shing) — yuz bo'yicha ro'yxatga olish va davomat (face.html)
+
+from . import faces, facematch
+from .models import FaceEnrollment
+
+@login_required
+def face_enroll(request):
+    # Tana: faces.HEADER + face-mesh nuqtalari (kamida FACE_ENROLL_MIN_FRAMES kadr)
+    if request.method != 'POST':
+        return JsonResponse({'status': 'error', 'detail': 'POST required'}, status=400)
+    try:
+        landmarks = faces.decode_landmarks(request.body)
+        vector, consistency = faces.enrollment_descriptor(landmarks)
+    except faces.FaceError as e:
+        return JsonResponse({'status': 'error', 'detail': str(e)}, status=400)
+    FaceEnrollment.objects.update_or_create(
+        student=request.user,
+        defaults={'descriptor': faces.to_bytes(vector), 'frames': len(landmarks), 'consistency': consistency},
+    )
+    return JsonResponse({'status': 'ok', 'consistency': round(consistency, 4)})
+
+@login_required
+def attendance_checkin(request):
+    # Talaba: o'z yuzi (kadrlar bitta deskriptorga jamlanadi), faqat o'zi deb topilsa belgilanadi.
+    # Xodim (?group=<id>, kiosk): har kadr — alohida yuz; butun guruh bitta o'tishda moslanadi
+    if request.method != 'POST':
+        return JsonResponse({'status': 'error', 'detail': 'POST required'}, status=400)
+    kiosk = request.user.is_staff and request.GET.get('group')
+    try:
+        landmarks = faces.decode_landmarks(request.body)
+        if kiosk:
+            group_id, student_id = int(request.GET['group']), None
+            probes = faces.frame_descriptors(landmarks)
+        else:
+            # Profili yo'q foydalanuvchi (masalan, createsuperuser) — 500 emas, 400
+            group_id = Profile.objects.filter(user=request.user).values_list('group_id', flat=True).first()
+            student_id = request.user.id
+            if not group_id:
+                raise faces.FaceError("Siz hech qaysi guruhga biriktirilmagansiz")
+            probes = faces.descriptor(landmarks)[0]
+        slot, matches = facematch.check_in(group_id, probes, student_id=student_id)
+    except (faces.FaceError, ValueError) as e:
+        return JsonResponse({'status': 'error', 'detail': str(e)}, status=400)
+    return JsonResponse({
+        'status': 'ok',
+        'lesson': slot['lesson_title'],
+        'matches': [{'student': user_id, 'similarity': round(score, 4)} for user_id, score in matches],
+        'checked_in': any(user_id is not None for user_id, _ in matches),
+    })
+
+# courses/views.py (oxiriga qo'shing) — guruh natijalarini eksport qilish (courses/exports.py)
+
+from django.http import StreamingHttpResponse
+from . import exports
+from .models import Course
+
+@login_required
+def export_progress(request, group_id):
+    # ?format=csv|xlsx&from=YYYY-MM-DD&to=YYYY-MM-DD — javob qatorma-qator oqim bilan yuboriladi
+    if not request.user.is_staff:
+        return HttpResponseForbidden('Ruxsat yo‘q')
+    group = get_object_or_404(Course, id=group_id)
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in exports.FORMATS:
+        return HttpResponse('Noma’lum format', status=400)
+    try:
+        date_from = exports.parse_day(request.GET.get('from'))
+        date_to = exports.parse_day(request.GET.get('to'))
+    except ValueError:
+        return HttpResponse('Sana noto‘g‘ri (YYYY-MM-DD)', status=400)
+    stream, content_type = exports.FORMATS[fmt]
+    response = StreamingHttpResponse(stream(exports.progress_matrix(group.id, date_from, date_to)),
+                                     content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="natijalar_{group.id}.{fmt}"'
+    patch_cache_control(response, private=True, no_store=True)
+    return response
+
+# courses/views.py (oxiriga qo'shing) — guruh analitikasi o'qituvchilar uchun (courses/analytics.py)
+
+from . import analytics
+
+@login_required
+def group_analytics(request, group_id):
+    # Tayyor LessonStats qatorlaridan — StudentProgress skanerlanmaydi
+    if not request.user.is_staff:
+        return HttpResponseForbidden('Ruxsat yo‘q')
+    group = get_object_or_404(Course, id=group_id)
+    context = analytics.group_report(group.id)
+    context['group'] = group
+    return render(request, 'courses/group_analytics.html', context)
+
+# courses/views.py (oxiriga qo'shing) — statik fayllar (siqilgan nusxalar bilan) va face.html service worker
+
+import mimetypes
+from django.conf import settings
+from django.template.loader import render_to_string
+from django.utils._os import safe_join
+from . import assets
+
+def static_asset(request, path):
+    # collectstatic natijasi (STATIC_ROOT) — .br/.gz nusxa tayyor bo'lsa o'sha beriladi.
+    # nginx orqasida bu yo'lni nginx o'zi beradi (README: gzip_static/brotli_static)
+    if not settings.STATIC_ROOT:
+        raise Http404
+    try:
+        path = safe_join(settings.STATIC_ROOT, path)
+    except ValueError:
+        raise Http404
+    if not os.path.isfile(path):
+        raise Http404
+    name = os.path.relpath(path, settings.STATIC_ROOT).replace(os.sep, '/')
+    filename, encoding = assets.pick_encoding(path, request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    response = FileResponse(open(filename, 'rb'), content_type=content_type)
+    del response['Content-Disposition']  # .gz/.br nomi ko'rinmasin
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['Vary'] = 'Accept-Encoding'
+    if assets.is_hashed(name):
+        patch_cache_control(response, public=True, max_age=assets.MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+def face_service_worker(request):
+    # /face/ sahifasini boshqarishi uchun /face/ ostida beriladi (static/ dan bo'lsa scope torayadi)
+    urls = list(assets.mediapipe_urls().values())
+    body = render_to_string('face_sw.js', {
+        'cache_name': json.dumps(assets.cache_name(urls)),
+        'urls': json.dumps(urls),
+    })
+    response = HttpResponse(body, content_type='text/javascript; charset=utf-8')
+    patch_cache_control(response, no_cache=True)
+    return response
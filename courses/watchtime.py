@@ -0,0 +1,239 @@
+# courses/watchtime.py — video heartbeat'lari: ko'rilgan oraliqlar va to'plamli yozish
+#
+# Pleyer har bir heartbeat'da brauzerning `video.played` oraliqlarini to'liq
+# yuboradi (kumulyativ), shuning uchun yo'qolgan yoki birlashtirilgan
+# heartbeat keyingisida o'z-o'zidan tiklanadi. So'rovlar jarayon xotirasida
+# (talaba, video) bo'yicha birlashtiriladi va har WATCH_FLUSH_INTERVAL
+# soniyada bitta bulk_create/bulk_update bilan bazaga yoziladi. Davomiylik
+# faqat Video.duration dan (serverda aniqlangan, courses/mediainfo.py) —
+# u noma'lum bo'lsa video tugallangan deb belgilanmaydi.
+
+import atexit
+import struct
+import threading
+import time
+from bisect import bisect_left, bisect_right
+
+from django.conf import settings
+from django.utils import timezone
+
+from . import analytics
+from .transactions import write_transaction
+from .models import StudentProgress, Video, VideoWatch
+from .progress import get_progress
+
+COMPLETE_RATIO = getattr(settings, 'WATCH_COMPLETE_RATIO', 0.9)
+FLUSH_INTERVAL = getattr(settings, 'WATCH_FLUSH_INTERVAL', 10)
+# Ko'rilgan vaqt real vaqtdan shu koeffitsientdan tez o'sa olmaydi (2x tezlik)
+MAX_PLAYBACK_RATE = getattr(settings, 'WATCH_MAX_PLAYBACK_RATE', 2.0)
+SLACK_SECONDS = 15
+MAX_DURATION = 24 * 3600
+MERGE_GAP = 0.5  # shu soniyadan kichik bo'shliqlar birlashtiriladi
+MAX_RANGES = 500
+
+_PAIR = struct.Struct('<ff')
+
+
+class IntervalSet:
+    # Tartiblangan, kesishmaydigan [start, end] oraliqlar; qidiruv bisect bilan O(log n)
+
+    def __init__(self, pairs=()):
+        self.starts = []
+        self.ends = []
+        for start, end in pairs:
+            self.add(start, end)
+
+    def add(self, start, end):
+        if end <= start:
+            return
+        i = bisect_left(self.ends, start - MERGE_GAP)
+        j = bisect_right(self.starts, end + MERGE_GAP)
+        if i < j:
+            start = min(start, self.starts[i])
+            end = max(end, self.ends[j - 1])
+        self.starts[i:j] = [start]
+        self.ends[i:j] = [end]
+
+    def update(self, other):
+        for start, end in other:
+            self.add(start, end)
+
+    def __iter__(self):
+        return zip(self.starts, self.ends)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def covered(self):
+        return sum(end - start for start, end in self)
+
+    def to_bytes(self):
+        return b''.join(_PAIR.pack(start, end) for start, end in self)
+
+    @classmethod
+    def from_bytes(cls, data):
+        result = cls()
+        for start, end in _PAIR.iter_unpack(bytes(data or b'')):
+            result.starts.append(start)
+            result.ends.append(end)
+        return result
+
+
+def parse_ranges(raw, duration=None):
+    if not isinstance(raw, list) or len(raw) > MAX_RANGES:
+        raise ValueError("played noto'g'ri")
+    result = IntervalSet()
+    for item in raw:
+        start, end = float(item[0]), float(item[1])
+        result.add(max(start, 0.0), min(end, duration or MAX_DURATION))
+    return result
+
+
+class _Pending:
+    __slots__ = ('intervals', 'first_seen')
+
+    def __init__(self):
+        self.intervals = IntervalSet()
+        self.first_seen = timezone.now()
+
+
+_buffer = {}
+_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+def record(student_id, video_id, intervals):
+    # Heartbeat'ni xotiradagi buferga qo'shadi; vaqti kelgan bo'lsa hammasini yozadi
+    global _last_flush
+    with _lock:
+        entry = _buffer.get((student_id, video_id))
+        if entry is None:
+            entry = _buffer[(student_id, video_id)] = _Pending()
+        entry.intervals.update(intervals)
+        due = time.monotonic() - _last_flush >= FLUSH_INTERVAL
+        if due:
+            _last_flush = time.monotonic()
+    if due:
+        flush()
+
+
+def _take(keys):
+    with _lock:
+        if keys is None:
+            taken = dict(_buffer)
+            _buffer.clear()
+        else:
+            taken = {key: _buffer.pop(key) for key in keys if key in _buffer}
+    return taken
+
+
+def _restore(pending):
+    # Yozib bo'lmadi — olingan yozuvlar buferga qaytadi (shu orada kelganlari bilan birlashtirib)
+    with _lock:
+        for key, entry in pending.items():
+            current = _buffer.get(key)
+            if current is None:
+                _buffer[key] = entry
+            else:
+                current.intervals.update(entry.intervals)
+                current.first_seen = min(current.first_seen, entry.first_seen)
+
+
+def flush(keys=None):
+    """
+    Buferdagi (yoki faqat `keys`) yozuvlarni bazaga yozadi: bitta SELECT,
+    bitta bulk_create va bitta bulk_update. Yangi tugallangan
+    (student_id, video_id) lar ro'yxatini qaytaradi.
+    """
+    pending = _take(keys)
+    if not pending:
+        return []
+    try:
+        return _write(pending)
+    except Exception:
+        _restore(pending)
+        raise
+
+
+@write_transaction
+def _write(pending):
+    # BEGIN IMMEDIATE ichida; qulf xatosida butunlay qayta bajariladi — qatorlar qayta o'qiladi
+    student_ids = {s for s, _ in pending}
+    video_ids = {v for _, v in pending}
+    existing = {
+        (w.student_id, w.video_id): w
+        for w in VideoWatch.objects.filter(student_id__in=student_ids, video_id__in=video_ids)
+    }
+    known_durations = dict(
+        Video.objects.filter(id__in=video_ids, duration__isnull=False).values_list('id', 'duration')
+    )
+
+    now = timezone.now()
+    to_create, to_update, completed = [], [], []
+    for (student_id, video_id), entry in pending.items():
+        watch = existing.get((student_id, video_id))
+        if watch is None:
+            watch = VideoWatch(student_id=student_id, video_id=video_id, started_at=entry.first_seen)
+            to_create.append(watch)
+        else:
+            to_update.append(watch)
+
+        intervals = IntervalSet.from_bytes(watch.intervals)
+        intervals.update(entry.intervals)
+        covered = intervals.covered()
+        # Real vaqtdan tez "ko'rib bo'lmaydi" — oshib ketsa, bu safar qabul qilinmaydi
+        allowed = (now - watch.started_at).total_seconds() * MAX_PLAYBACK_RATE + SLACK_SECONDS
+        if covered <= allowed:
+            watch.intervals = intervals.to_bytes()
+            watch.watched_seconds = covered
+        # Davomiylik noma'lum bo'lsa (0) — oraliqlar saqlanadi, lekin tugallanmaydi
+        watch.duration = known_durations.get(video_id) or 0
+        watch.updated_at = now
+        if not watch.completed and watch.duration > 0 and watch.watched_seconds >= COMPLETE_RATIO * watch.duration:
+            watch.completed = True
+            completed.append((student_id, video_id))
+
+    # Boshqa jarayon shu vaqtda yaratgan bo'lsa — keyingi (kumulyativ) heartbeat tiklaydi
+    VideoWatch.objects.bulk_create(to_create, ignore_conflicts=True, batch_size=500)
+    VideoWatch.objects.bulk_update(
+        to_update, ['intervals', 'duration', 'watched_seconds', 'completed', 'updated_at'], batch_size=500
+    )
+    for student_id, video_id in completed:
+        advance_progress(student_id, video_id)
+    return completed
+
+
+def advance_progress(student_id, video_id):
+    # Tugallangan videolar ketma-ketligi bo'yicha StudentProgress.watched_count ni suradi
+    lesson_id = Video.objects.filter(id=video_id).values_list('lesson_id', flat=True).first()
+    if lesson_id is None:
+        return
+    progress = get_progress(student_id, lesson_id)
+    video_ids = list(Video.objects.filter(lesson_id=lesson_id).values_list('id', flat=True))
+    done = set(
+        VideoWatch.objects.filter(student_id=student_id, video__lesson_id=lesson_id, completed=True)
+        .values_list('video_id', flat=True)
+    )
+    count = progress.watched_count
+    while count < len(video_ids) and video_ids[count] in done:
+        count += 1
+    # Shartli UPDATE aynan o'qilgan qiymat bo'yicha — analitika farqi aniq bo'lsin
+    while count > progress.watched_count:
+        old = progress.watched_count
+        if StudentProgress.objects.filter(pk=progress.pk, watched_count=old).update(watched_count=count):
+            analytics.watched_changed(progress, old, count)
+            break
+        progress.refresh_from_db(fields=['watched_count'])
+
+
+def is_completed(student, video):
+    flush(keys=[(student.id, video.id)])
+    return VideoWatch.objects.filter(student=student, video=video, completed=True).exists()
+
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        flush()
+    except Exception:
+        pass
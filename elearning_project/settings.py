@@ -14,6 +14,7 @@ INSTALLED_APPS = [
     'courses',
 ]
 MIDDLEWARE = [
+    'courses.querybudget.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -39,18 +40,126 @@ TEMPLATES = [
     },
 ]
 WSGI_APPLICATION = 'elearning_project.wsgi.application'
+# SQLite parallel yozish uchun: WAL (o'quvchilar yozuvchini kutmaydi),
+# BEGIN IMMEDIATE (qulf tranzaksiya boshida olinadi — o'rtada "database is
+# locked" bo'lmaydi), busy_timeout va har ishchida doimiy ulanish
+SQLITE_PRAGMAS = [
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA busy_timeout=5000',
+    'PRAGMA cache_size=-20000',
+    'PRAGMA mmap_size=134217728',
+    'PRAGMA temp_store=MEMORY',
+]
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': None,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': ';'.join(SQLITE_PRAGMAS),
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 5,
+        },
     }
 }
+# write_transaction: qulf xatosida qayta urinishlar soni va boshlang'ich kechikish (s)
+DB_LOCK_RETRIES = 4
+DB_LOCK_BACKOFF = 0.05
 AUTH_PASSWORD_VALIDATORS = []
 LANGUAGE_CODE = 'uz'
 TIME_ZONE = 'Asia/Tashkent'
 USE_I18N = True
 USE_TZ = True
 STATIC_URL = '/static/'
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+STATICFILES_DIRS = [BASE_DIR / 'static']
+# collectstatic: mazmun xeshli nomlar + .gz/.br nusxalar (courses/assets.py)
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'courses.assets.PrecompressedManifestStorage'},
+}
+# Xeshli statik fayllar keshlanish muddati (s); shundan kichik fayllar siqilmaydi (bayt)
+STATIC_MAX_AGE = 365 * 86400
+STATIC_COMPRESS_MIN_SIZE = 1024
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Video oqimi: Range bo'laklari hajmi va ixtiyoriy proxy offload
+# VIDEO_SENDFILE_MODE: None | 'x-accel-redirect' (nginx) | 'x-sendfile' (apache)
+VIDEO_STREAM_CHUNK_SIZE = 256 * 1024
+VIDEO_SENDFILE_MODE = None
+VIDEO_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+
+# Admin: bo'laklab yuklash (courses/uploads.py) — bo'lak hajmi, bitta PUT
+# uchun chegara, fayl chegarasi (bayt) va tugallanmagan sessiyalar muddati (soat).
+# nginx orqasida client_max_body_size >= UPLOAD_MAX_CHUNK_SIZE bo'lsin
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+UPLOAD_MAX_CHUNK_SIZE = 64 * 1024 * 1024
+UPLOAD_MAX_SIZE = 20 * 1024 ** 3
+UPLOAD_STALE_HOURS = 24
+
+# Profil rasmlari: kvadrat nusxalar o'lchamlari (px), sifat va keshlash muddati (s)
+AVATAR_SIZES = (48, 96, 192)
+AVATAR_QUALITY = 82
+AVATAR_MAX_AGE = 365 * 86400
+
+# Yuz bo'yicha davomat (courses/faces.py, facematch.py): ro'yxatga olishda kamida
+# shuncha kadr va izchillik; moslash chegarasi (kosinus) va ikkinchi nomzoddan
+# farq; dars boshlanishidan necha daqiqa oldin belgilanish mumkin
+FACE_ENROLL_MIN_FRAMES = 15
+FACE_ENROLL_MIN_CONSISTENCY = 0.9
+FACE_MATCH_THRESHOLD = 0.97
+FACE_MATCH_MARGIN = 0.005
+ATTENDANCE_EARLY_MINUTES = 15
+
+# Ko'rish vaqti: video shu ulushi ko'rilganda tugallangan hisoblanadi;
+# heartbeat'lar xotirada to'planib, har WATCH_FLUSH_INTERVAL soniyada yoziladi
+WATCH_COMPLETE_RATIO = 0.9
+WATCH_FLUSH_INTERVAL = 10
+WATCH_MAX_PLAYBACK_RATE = 2.0
+
+# Ochiq sertifikat tekshirish: jarayon ichidagi LRU (soni, muddatlari s; boshqa
+# ishchilar o'zgarishni CACHE_TTL ichida ko'radi), brauzer/proxy keshi uchun
+# max-age. VERIFY_STATIC_ROOT berilsa (masalan, BASE_DIR / 'verify-static'),
+# sahifalar sertifikat saqlanganda (PDF tayyor bo'lsa) faylga yoziladi
+VERIFY_CACHE_SIZE = 10000
+VERIFY_CACHE_TTL = 300
+VERIFY_NEGATIVE_TTL = 60
+VERIFY_MAX_AGE = 86400
+VERIFY_STATIC_ROOT = None
+
+# Sahifa qismlari keshi (courses/fragments.py): dars kartalari, videolar ro'yxati,
+# test savollari. Versiya kaliti bilan — muddat faqat eski versiyalarni tozalash uchun
+FRAGMENT_CACHE = True
+FRAGMENT_CACHE_TIMEOUT = 86400
+
+# Guruh dars jadvali keshi (courses/timetable.py): kalit Course.timetable_updated_at
+# bilan, muddat faqat eski versiyalarni tozalash uchun
+TIMETABLE_CACHE_TIMEOUT = 86400
+
+# Admin ro'yxatlari: filtrsiz jadvalda yozuvlar shundan ko'p bo'lsa COUNT(*)
+# o'rniga taxminiy son (MAX(id)) ko'rsatiladi
+ADMIN_COUNT_ESTIMATE_THRESHOLD = 50000
+
+# So'rov byudjeti (courses/urls.py QUERY_BUDGETS): oshsa log'da WARNING,
+# QUERY_BUDGET_STRICT = True bo'lsa so'rov xato bilan tugaydi
+QUERY_BUDGET_STRICT = False
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {'console': {'class': 'logging.StreamHandler'}},
+    'loggers': {'courses.querybudget': {'handlers': ['console'], 'level': 'WARNING'}},
+}
+
+# Kesh (javoblar kaliti va boshqalar). Bir nechta server jarayonida
+# Redis/Memcached ishlatish tavsiya etiladi — kalitlar versiyalangan.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'elearning',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+}
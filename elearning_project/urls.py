@@ -1,8 +1,11 @@
+import re
+
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
 from django.views.generic import TemplateView
+from courses.views import static_asset
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -12,3 +15,6 @@ urlpatterns = [
 
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+elif settings.STATIC_URL.startswith('/'):
+    # nginx siz ishga tushirilganda: collectstatic natijasi siqilgan nusxalari bilan
+    urlpatterns += [re_path(r'^%s(?P<path>.+)$' % re.escape(settings.STATIC_URL.lstrip('/')), static_asset)]
@@ -0,0 +1,44 @@
+// face.html service worker: MediaPipe fayllari (skriptlar, WASM, model) birinchi
+// ishlatilganda keshga olinadi, keyingi tashriflarda tarmoqqa murojaatsiz beriladi.
+// URL lar mazmun xeshi bilan — o'zgarsa kesh nomi ham o'zgaradi, eskisi o'chiriladi.
+const CACHE = {{ cache_name|safe }};
+const ASSETS = new Set({{ urls|safe }}.map((url) => new URL(url, self.location.origin).href));
+
+self.addEventListener('install', (event) => {
+    // Skriptlar sahifa bilan birga kerak — darhol; WASM/model (SIMD yoki oddiy) birinchi so'rovda
+    event.waitUntil((async () => {
+        const cache = await caches.open(CACHE);
+        await cache.addAll([...ASSETS].filter((url) => url.endsWith('.js')));
+        await self.skipWaiting();
+    })());
+});
+
+self.addEventListener('activate', (event) => {
+    event.waitUntil((async () => {
+        for (const key of await caches.keys()) {
+            if (key.startsWith('face-assets-') && key !== CACHE) {
+                await caches.delete(key);
+            }
+        }
+        await self.clients.claim();
+    })());
+});
+
+self.addEventListener('fetch', (event) => {
+    const request = event.request;
+    if (request.method !== 'GET' || !ASSETS.has(request.url)) {
+        return;
+    }
+    event.respondWith((async () => {
+        const cache = await caches.open(CACHE);
+        const cached = await cache.match(request.url);
+        if (cached) {
+            return cached;
+        }
+        const response = await fetch(request.url);
+        if (response.ok) {
+            await cache.put(request.url, response.clone());
+        }
+        return response;
+    })());
+});